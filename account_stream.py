@@ -0,0 +1,287 @@
+import json
+import logging
+import queue
+import threading
+import time
+import uuid
+from collections import deque
+from typing import Callable, Dict, List, Optional
+from config import Config
+
+# Canaux privés KuCoin Futures : solde, positions et ordres/exécutions
+PRIVATE_TOPICS = ['/contractAccount/wallet', '/contract/positionAll', '/contractMarket/tradeOrders']
+
+
+class AccountState:
+    """État du compte tenu en mémoire (solde, positions, exécutions).
+
+    Alimenté par le flux privé ; les lectures ne coûtent aucun appel réseau.
+    """
+
+    def __init__(self, fills_history: int = None):
+        self._lock = threading.Lock()
+        self.balance = {'free': 0.0, 'used': 0.0, 'total': 0.0}
+        self.positions: Dict[str, Dict] = {}
+        self.orders: Dict[str, Dict] = {}
+        self.fills = deque(maxlen=fills_history or Config.ACCOUNT_FILLS_HISTORY)
+        self.ready = False  # Vrai après l'instantané REST initial
+        self.connected = False
+        self.last_update: Optional[float] = None
+        self.messages = 0
+
+    def seed(self, exchange) -> bool:
+        """Instantané REST initial (puis après chaque reconnexion)"""
+        try:
+            balance = exchange.fetch_balance().get('USDT', {})
+            positions = exchange.fetch_positions()
+        except Exception as e:
+            logging.error(f"Erreur instantané du compte: {e}")
+            return False
+        with self._lock:
+            self.balance = {key: balance.get(key) or 0.0 for key in ('free', 'used', 'total')}
+            self.positions = {}
+            for position in positions:
+                size = position.get('contracts') or position.get('size') or 0
+                if size:
+                    self.positions[position['symbol']] = dict(position)
+            self.ready = True
+            self.last_update = time.time()
+        return True
+
+    def apply_wallet(self, data: Dict):
+        with self._lock:
+            if data.get('currency', 'USDT') != 'USDT':
+                return
+            if data.get('availableBalance') is not None:
+                self.balance['free'] = float(data['availableBalance'])
+            if data.get('holdBalance') is not None:
+                self.balance['used'] = float(data['holdBalance'])
+            self.balance['total'] = self.balance['free'] + self.balance['used']
+            self._touch()
+
+    def apply_position(self, symbol: str, data: Dict):
+        with self._lock:
+            position = self.positions.get(symbol, {'symbol': symbol})
+            if data.get('currentQty') is not None:
+                qty = float(data['currentQty'])
+                if qty == 0:
+                    self.positions.pop(symbol, None)
+                    self._touch()
+                    return
+                position.update({'side': 'long' if qty > 0 else 'short', 'contracts': abs(qty), 'size': abs(qty)})
+            for source, target in (('avgEntryPrice', 'entryPrice'), ('markPrice', 'markPrice'),
+                                   ('unrealisedPnl', 'unrealizedPnl'), ('realisedPnl', 'realizedPnl'),
+                                   ('posMargin', 'initialMargin')):
+                if data.get(source) is not None:
+                    position[target] = float(data[source])
+            if position.get('markPrice') and position.get('size'):
+                position['notional'] = position['size'] * position['markPrice']
+            self.positions[symbol] = position
+            self._touch()
+
+    def apply_order(self, symbol: str, data: Dict):
+        with self._lock:
+            order_id = data.get('orderId')
+            order = self.orders.setdefault(order_id, {'id': order_id, 'symbol': symbol})
+            order.update({
+                'side': data.get('side'), 'status': 'open' if data.get('status') == 'open' else data.get('type'),
+                'filled': data.get('filledSize'), 'amount': data.get('size'),
+            })
+            if data.get('type') == 'match':
+                self.fills.append({
+                    'order_id': order_id, 'symbol': symbol, 'side': data.get('side'),
+                    'price': float(data['matchPrice']), 'amount': float(data['matchSize']),
+                    'timestamp': (data.get('ts') or 0) // 1_000_000,
+                })
+            if data.get('status') == 'done':
+                self.orders.pop(order_id, None)  # Seuls les ordres ouverts sont conservés
+            self._touch()
+
+    def _touch(self):
+        self.last_update = time.time()
+        self.messages += 1
+
+    def get_balance(self) -> Dict:
+        with self._lock:
+            return dict(self.balance)
+
+    def get_positions(self) -> List[Dict]:
+        with self._lock:
+            return [dict(position) for position in self.positions.values()]
+
+    def get_position(self, symbol: str) -> Optional[Dict]:
+        with self._lock:
+            position = self.positions.get(symbol)
+            return dict(position) if position else None
+
+    def recent_fills(self, limit: Optional[int] = None) -> List[Dict]:
+        with self._lock:
+            fills = list(reversed(self.fills))
+        return fills[:limit] if limit else fills
+
+    def is_live(self) -> bool:
+        """Vrai si l'état est initialisé et le flux connecté"""
+        return self.ready and self.connected
+
+
+class KuCoinPrivateTransport:
+    """Transport WebSocket vers le canal privé KuCoin Futures"""
+
+    def __init__(self, exchange):
+        self.exchange = exchange
+        self._ws = None
+        self.ping_interval = 18.0
+        self._last_ping = 0.0
+
+    def connect(self, topics: List[str]):
+        import websocket
+        token = self.exchange.futuresPrivatePostBulletPrivate()['data']
+        server = token['instanceServers'][0]
+        self.ping_interval = server.get('pingInterval', 18000) / 1000
+        url = f"{server['endpoint']}?token={token['token']}&connectId={uuid.uuid4().hex}"
+        self._ws = websocket.create_connection(url, timeout=10)
+        welcome = json.loads(self._ws.recv())
+        if welcome.get('type') != 'welcome':
+            raise ConnectionError(f"Réponse inattendue du WebSocket: {welcome}")
+        for topic in topics:
+            self._ws.send(json.dumps({
+                'id': uuid.uuid4().hex, 'type': 'subscribe', 'topic': topic,
+                'privateChannel': True, 'response': True,
+            }))
+        self._last_ping = time.monotonic()
+
+    def recv(self, timeout: float) -> Optional[Dict]:
+        import websocket
+        if time.monotonic() - self._last_ping > self.ping_interval:
+            self._ws.send(json.dumps({'id': uuid.uuid4().hex, 'type': 'ping'}))
+            self._last_ping = time.monotonic()
+        self._ws.settimeout(min(timeout, self.ping_interval))
+        try:
+            message = json.loads(self._ws.recv())
+        except websocket.WebSocketTimeoutException:
+            return None
+        return message if message.get('type') == 'message' else None
+
+    def close(self):
+        if self._ws is not None:
+            self._ws.close()
+            self._ws = None
+
+
+class MockAccountTransport:
+    """Transport local branché sur MockKuCoinFutures (mêmes messages, sans réseau)"""
+
+    def __init__(self, exchange):
+        self.exchange = exchange
+        self._queue: queue.Queue = queue.Queue()
+
+    def connect(self, topics: List[str]):
+        self._topics = set(topics)
+        self.exchange.account_listeners.append(self._queue.put)
+
+    def recv(self, timeout: float) -> Optional[Dict]:
+        try:
+            message = self._queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+        return message if message['topic'].split(':')[0] in self._topics else None
+
+    def close(self):
+        if self._queue.put in self.exchange.account_listeners:
+            self.exchange.account_listeners.remove(self._queue.put)
+
+
+class AccountStream:
+    """Abonné au canal privé : maintient un AccountState à jour en continu.
+
+    Le transport est interchangeable (WebSocket KuCoin ou simulateur local).
+    À chaque (re)connexion, l'état est réinitialisé par un instantané REST
+    pour couvrir les messages éventuellement perdus.
+    """
+
+    _shared = None
+
+    def __init__(self, exchange, transport=None, state: AccountState = None,
+                 symbol_resolver: Callable[[str], str] = None):
+        self.exchange = exchange
+        self.transport = transport or self._default_transport(exchange)
+        self.state = state or AccountState()
+        self.symbol_resolver = symbol_resolver or self._resolve_symbol
+        self._thread = None
+        self._running = False
+        self.reconnects = 0
+
+    @classmethod
+    def shared(cls, exchange) -> 'AccountStream':
+        """Flux unique par processus, démarré à la première demande"""
+        if cls._shared is None:
+            cls._shared = cls(exchange)
+            cls._shared.start()
+        return cls._shared
+
+    @staticmethod
+    def _default_transport(exchange):
+        if getattr(exchange, 'account_listeners', None) is not None:
+            return MockAccountTransport(exchange)
+        return KuCoinPrivateTransport(exchange)
+
+    def _resolve_symbol(self, market_id: str) -> str:
+        # Identifiant KuCoin (XBTUSDTM) -> symbol unifié ccxt
+        markets_by_id = getattr(self.exchange, 'markets_by_id', None) or {}
+        market = markets_by_id.get(market_id)
+        if isinstance(market, list):
+            market = market[0] if market else None
+        if market:
+            return market['symbol']
+        for symbol, market in (getattr(self.exchange, 'markets', None) or {}).items():
+            if market.get('id') == market_id:
+                return symbol
+        return market_id
+
+    def start(self):
+        """Démarre l'abonnement dans un thread dédié"""
+        if self._running:
+            return
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="account-stream", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Arrête l'abonnement"""
+        self._running = False
+        if self._thread:
+            self._thread.join(timeout=5)
+        self.transport.close()
+        self.state.connected = False
+
+    def _run(self):
+        delay = Config.ACCOUNT_STREAM_RECONNECT_DELAY
+        while self._running:
+            try:
+                self.transport.connect(PRIVATE_TOPICS)
+                self.state.connected = True
+                self.state.seed(self.exchange)
+                logging.info("Flux privé du compte connecté")
+                delay = Config.ACCOUNT_STREAM_RECONNECT_DELAY
+                while self._running:
+                    message = self.transport.recv(timeout=1.0)
+                    if message is not None:
+                        self.handle(message)
+            except Exception as e:
+                self.state.connected = False
+                self.reconnects += 1
+                logging.error(f"Flux privé du compte interrompu: {e}, reconnexion dans {delay:.0f}s")
+                self.transport.close()
+                time.sleep(delay)
+                delay = min(delay * 2, 60)
+
+    def handle(self, message: Dict):
+        """Applique un message du canal privé à l'état"""
+        topic = message.get('topic', '').split(':')[0]
+        data = message.get('data') or {}
+        if topic == '/contractAccount/wallet':
+            self.state.apply_wallet(data)
+        elif topic in ('/contract/positionAll', '/contract/position'):
+            self.state.apply_position(self.symbol_resolver(data.get('symbol', '')), data)
+        elif topic == '/contractMarket/tradeOrders':
+            self.state.apply_order(self.symbol_resolver(data.get('symbol', '')), data)
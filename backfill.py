@@ -0,0 +1,208 @@
+import json
+import logging
+import os
+import re
+import threading
+import time
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from config import Config
+from rate_limit import RateLimitGovernor
+from timeframes import timeframe_to_seconds
+
+# Format binaire compact : une ligne par bougie, lisible en mmap par numpy
+CANDLE_DTYPE = np.dtype([
+    ('timestamp', '<i8'), ('open', '<f8'), ('high', '<f8'),
+    ('low', '<f8'), ('close', '<f8'), ('volume', '<f8'),
+])
+
+
+def validate_candles(candles: np.ndarray, timeframe_ms: int) -> Tuple[np.ndarray, Dict]:
+    """Trie, dédoublonne et contrôle l'alignement et la continuité d'une série"""
+    report = {'rows': int(len(candles)), 'duplicates': 0, 'misaligned': 0, 'gaps': 0, 'missing_bars': 0}
+    if len(candles) == 0:
+        return candles, report
+    candles = candles[np.argsort(candles['timestamp'], kind='stable')]
+    # En cas de doublon, la dernière version reçue de la bougie est conservée
+    keep = np.append(candles['timestamp'][1:] != candles['timestamp'][:-1], True)
+    report['duplicates'] = int((~keep).sum())
+    candles = candles[keep]
+    misaligned = candles['timestamp'] % timeframe_ms != 0
+    report['misaligned'] = int(misaligned.sum())
+    candles = candles[~misaligned]
+    steps = np.diff(candles['timestamp'])
+    report['gaps'] = int((steps > timeframe_ms).sum())
+    report['missing_bars'] = int((steps[steps > timeframe_ms] // timeframe_ms - 1).sum())
+    report['rows'] = int(len(candles))
+    return candles, report
+
+
+class HistoryStore:
+    """Stockage local des bougies historiques (un fichier .npy par symbol et timeframe)"""
+
+    def __init__(self, root: str = None):
+        self.root = Path(root or Config.HISTORY_DIR)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._locks: Dict[Tuple[str, str], threading.Lock] = {}
+        self._guard = threading.Lock()
+
+    def path(self, symbol: str, timeframe: str) -> Path:
+        name = re.sub(r'[^A-Za-z0-9]+', '_', symbol).strip('_')
+        return self.root / timeframe / f"{name}.npy"
+
+    def _lock(self, symbol: str, timeframe: str) -> threading.Lock:
+        with self._guard:
+            return self._locks.setdefault((symbol, timeframe), threading.Lock())
+
+    def load(self, symbol: str, timeframe: str, mmap: bool = False) -> np.ndarray:
+        """Charge la série complète (vide si absente)"""
+        path = self.path(symbol, timeframe)
+        if not path.exists():
+            return np.empty(0, dtype=CANDLE_DTYPE)
+        return np.load(path, mmap_mode='r' if mmap else None)
+
+    def merge(self, symbol: str, timeframe: str, rows: List[list]) -> Dict:
+        """Fusionne de nouvelles bougies avec la série stockée et l'écrit de façon atomique"""
+        timeframe_ms = timeframe_to_seconds(timeframe) * 1000
+        with self._lock(symbol, timeframe):
+            new = np.array([tuple(row[:6]) for row in rows], dtype=CANDLE_DTYPE)
+            merged, report = validate_candles(np.concatenate([self.load(symbol, timeframe), new]), timeframe_ms)
+            path = self.path(symbol, timeframe)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_name(path.name + '.tmp')
+            with open(tmp, 'wb') as f:
+                np.save(f, merged)
+            os.replace(tmp, path)
+            return report
+
+
+class Checkpoint:
+    """Progression du backfill, persistée après chaque lot pour permettre la reprise"""
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self.state: Dict[str, Dict] = {}
+        if self.path.exists():
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self.state = json.load(f)
+
+    @staticmethod
+    def key(symbol: str, timeframe: str) -> str:
+        return f"{symbol}|{timeframe}"
+
+    def get(self, symbol: str, timeframe: str) -> Dict:
+        with self._lock:
+            return dict(self.state.get(self.key(symbol, timeframe), {}))
+
+    def update(self, symbol: str, timeframe: str, **values):
+        with self._lock:
+            self.state.setdefault(self.key(symbol, timeframe), {}).update(values)
+            tmp = self.path.with_name(self.path.name + '.tmp')
+            with open(tmp, 'w', encoding='utf-8') as f:
+                json.dump(self.state, f)
+            os.replace(tmp, self.path)
+
+
+class Backfiller:
+    """Téléchargement parallèle et reprenable de l'historique de tout l'univers.
+
+    Chaque couple (symbol, timeframe) est rempli vers l'arrière depuis la plus
+    ancienne bougie connue jusqu'à la date de début, puis complété vers
+    l'avant jusqu'à maintenant. Toutes les requêtes passent par un même
+    régulateur de débit ; la progression est enregistrée après chaque lot.
+    """
+
+    def __init__(self, exchange, store: HistoryStore = None, timeframes: List[str] = None,
+                 days: int = None, workers: int = None, governor: RateLimitGovernor = None):
+        self.exchange = exchange
+        self.store = store or HistoryStore()
+        self.timeframes = timeframes or Config.BACKFILL_TIMEFRAMES
+        self.days = days or Config.BACKFILL_DAYS
+        self.workers = workers or Config.SCAN_MAX_CONCURRENCY
+        self.governor = governor or RateLimitGovernor(exchange)
+        self.checkpoint = Checkpoint(self.store.root / 'checkpoint.json')
+        self.page_limit = Config.OHLCV_PAGE_LIMIT
+        self.reports: Dict[str, Dict] = {}
+
+    def _fetch(self, symbol: str, timeframe: str, since: int) -> List[list]:
+        return self.governor.call(self.exchange.fetch_ohlcv, symbol, timeframe, since=since, limit=self.page_limit)
+
+    def backfill_symbol(self, symbol: str, timeframe: str) -> Dict:
+        """Remplit un couple (symbol, timeframe) ; reprend là où le checkpoint s'est arrêté"""
+        timeframe_ms = timeframe_to_seconds(timeframe) * 1000
+        now = self.exchange.milliseconds()
+        current_bar = now // timeframe_ms * timeframe_ms  # Bougie en cours, jamais stockée
+        start = (now - self.days * 86_400_000) // timeframe_ms * timeframe_ms
+        progress = self.checkpoint.get(symbol, timeframe)
+        oldest, newest = progress.get('oldest'), progress.get('newest')
+        pages, rows = 0, []
+
+        def flush(**values):
+            nonlocal rows
+            report = self.store.merge(symbol, timeframe, rows) if rows else None
+            self.checkpoint.update(symbol, timeframe, **values)
+            rows = []
+            return report
+
+        # Vers l'arrière : de la plus ancienne bougie connue jusqu'à la date de début
+        # (repris si une profondeur plus grande est demandée)
+        if not progress.get('history_complete') or progress.get('start', start) > start:
+            cursor = oldest if oldest is not None else current_bar
+            while cursor > start:
+                since = max(start, cursor - self.page_limit * timeframe_ms)
+                batch = [row for row in self._fetch(symbol, timeframe, since) if row[0] < cursor]
+                pages += 1
+                if not batch:
+                    break  # Début de l'historique disponible sur l'exchange
+                rows.extend(batch)
+                cursor = batch[0][0]
+                newest = max(newest or 0, batch[-1][0])
+                if pages % Config.BACKFILL_FLUSH_PAGES == 0:
+                    flush(oldest=cursor, newest=newest)
+            flush(oldest=cursor, newest=newest, start=start, history_complete=True)
+
+        # Vers l'avant : de la plus récente bougie connue jusqu'à maintenant
+        progress = self.checkpoint.get(symbol, timeframe)
+        cursor = (progress.get('newest') or start - timeframe_ms) + timeframe_ms
+        while cursor < current_bar:
+            batch = self._fetch(symbol, timeframe, cursor)
+            pages += 1
+            batch = [row for row in batch if cursor <= row[0] < current_bar]
+            if not batch:
+                break
+            rows.extend(batch)
+            cursor = batch[-1][0] + timeframe_ms
+        flush(newest=cursor - timeframe_ms)
+
+        candles, report = validate_candles(self.store.load(symbol, timeframe), timeframe_ms)
+        report.update({'pages': pages, 'first': int(candles['timestamp'][0]) if len(candles) else None,
+                       'last': int(candles['timestamp'][-1]) if len(candles) else None})
+        return report
+
+    def run(self, symbols: List[str]) -> Dict[str, Dict]:
+        """Backfill parallèle de tous les symbols et timeframes"""
+        jobs = [(symbol, timeframe) for symbol in symbols for timeframe in self.timeframes]
+        start = time.time()
+        done = 0
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            futures = {executor.submit(self._run_job, symbol, timeframe): (symbol, timeframe)
+                       for symbol, timeframe in jobs}
+            for future in as_completed(futures):
+                symbol, timeframe = futures[future]
+                done += 1
+                self.reports[Checkpoint.key(symbol, timeframe)] = future.result()
+                if done % 10 == 0 or done == len(jobs):
+                    logging.info(f"Backfill: {done}/{len(jobs)} séries ({time.time() - start:.0f}s)")
+        return self.reports
+
+    def _run_job(self, symbol: str, timeframe: str) -> Dict:
+        for attempt in range(Config.SCAN_MAX_RETRIES):
+            try:
+                return self.backfill_symbol(symbol, timeframe)
+            except Exception as e:
+                logging.warning(f"Backfill {symbol} {timeframe} interrompu (tentative {attempt + 1}): {e}")
+                time.sleep(Config.RATE_LIMIT_BACKOFF * (attempt + 1))
+        return {'error': f"échec après {Config.SCAN_MAX_RETRIES} tentatives"}
@@ -0,0 +1,299 @@
+#!/usr/bin/env python3
+"""
+Suite de benchmarks
+===================
+
+Mesure les chemins critiques sur des données synthétiques déterministes
+(exchange simulé) : temps de démarrage, débit du scan, coût des indicateurs,
+latence d'exécution d'un ordre avec SL/TP et temps de rendu des vues Streamlit.
+
+Les résultats sont ajoutés à `benchmark_results.jsonl` avec le commit
+courant afin de comparer les performances d'un commit à l'autre :
+
+    python benchmark.py                 # exécute et enregistre
+    python benchmark.py --compare       # compare au run précédent
+    python benchmark.py --compare abc12 # compare au dernier run du commit abc12
+"""
+
+import argparse
+import json
+import logging
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from config import Config
+from mock_exchange import MockKuCoinFutures
+
+RESULTS_FILE = Path(__file__).parent / 'benchmark_results.jsonl'
+REGRESSION_THRESHOLD = 10.0  # % de dégradation signalée
+
+
+def timed(func, repeat: int = 5, warmup: int = 1) -> float:
+    """Temps médian d'exécution de `func` en millisecondes"""
+    for _ in range(warmup):
+        func()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def bench_scan(n_symbols: int, seed: int) -> dict:
+    """Débit de scan_symbol sur tout l'univers (bougies déjà en cache puis à froid)"""
+    from scanner import KuCoinScanner
+
+    exchange = MockKuCoinFutures(n_symbols=n_symbols, seed=seed)
+    scanner = KuCoinScanner(exchange=exchange)
+    scanner.load_markets()
+    symbols = sorted(scanner.futures_symbols)
+
+    start = time.perf_counter()
+    for symbol in symbols:
+        scanner.scan_symbol(symbol)
+    cold = time.perf_counter() - start
+
+    exchange.advance(60)
+    start = time.perf_counter()
+    for symbol in symbols:
+        scanner.scan_symbol(symbol)
+    warm = time.perf_counter() - start
+
+    return {
+        'scan_cold_symbols_per_s': round(len(symbols) / cold, 1),
+        'scan_warm_symbols_per_s': round(len(symbols) / warm, 1),
+        'scan_api_calls': sum(exchange.calls.values()),
+    }
+
+
+def bench_indicators(n_symbols: int, seed: int, repeat: int) -> dict:
+    """Temps par passe d'indicateur sur une série 4h et sur tout l'univers"""
+    from scanner import KuCoinScanner
+    from indicators import INDICATORS
+    from swings import fibonacci_levels_batch
+
+    exchange = MockKuCoinFutures(n_symbols=n_symbols, seed=seed)
+    scanner = KuCoinScanner(exchange=exchange)
+    scanner.load_markets()
+    symbol = exchange.symbols[0]
+    data_4h = scanner.get_timeframe_data(symbol, Config.TIMEFRAME_MAIN, 50)
+
+    results = {}
+    for name, func in INDICATORS.items():
+        results[f"indicator_{name}_ms"] = round(timed(lambda: func(data_4h), repeat * 20), 4)
+
+    def fibonacci_single():
+        scanner.swing_detectors.clear()
+        scanner.calculate_fibonacci_levels(symbol)
+    results['fibonacci_single_ms'] = round(timed(fibonacci_single, repeat * 20), 4)
+
+    frames = {}
+    for s in exchange.symbols:
+        scanner.refresh_base_candles(s)
+        frames[s] = scanner.get_timeframe_data(s, Config.TIMEFRAME_FIBONACCI, 50).iloc[:-1]
+    results['fibonacci_batch_universe_ms'] = round(timed(lambda: fibonacci_levels_batch(frames), repeat), 3)
+
+    def refill_universe():
+        scanner.candle_store.clear()
+        for s in exchange.symbols:
+            scanner.refresh_base_candles(s)
+    results['candle_refill_universe_ms'] = round(timed(refill_universe, 1, 0), 3)
+    return results
+
+
+def bench_execution(latency: float, seed: int, trades: int = 20) -> dict:
+    """Latence d'un ordre principal + SL + 3 TP contre l'exchange simulé"""
+    from trading import KuCoinTrader
+
+    exchange = MockKuCoinFutures(n_symbols=max(trades, 5), seed=seed, latency=latency)
+    trader = KuCoinTrader(exchange=exchange)
+    latencies = []
+    for symbol in exchange.symbols[:trades]:
+        signal = {'symbol': symbol, 'price': exchange._last_price(symbol), 'fibonacci_levels': {}}
+        start = time.perf_counter()
+        trader.execute_signal(signal, Config.DEFAULT_POSITION_SIZE)
+        latencies.append((time.perf_counter() - start) * 1000)
+    latencies.sort()
+    return {
+        'bracket_order_p50_ms': round(latencies[len(latencies) // 2], 3),
+        'bracket_order_max_ms': round(latencies[-1], 3),
+    }
+
+
+GUI_SCRIPT = """
+import sys
+sys.path.insert(0, {root!r})
+from config import Config
+Config.KUCOIN_MOCK = True
+from datetime import datetime
+from gui import TradingGUI
+gui = TradingGUI()
+exchange = gui.trader.exchange
+gui.trader.orders_history.clear()
+ledger = gui.trader.ledger
+for i in range({trades}):
+    symbol = exchange.symbols[i % len(exchange.symbols)]
+    price = exchange._last_price(symbol)
+    trade = {{
+        'trade_id': i, 'timestamp': datetime.now(), 'symbol': symbol, 'signal': {{}},
+        'entry_order': {{'id': f"bench-entry-{{i}}"}}, 'stop_loss_order': None,
+        'take_profit_orders': [{{'id': f"bench-tp-{{i}}"}}],
+        'position_info': {{'size': 1.0, 'value_usdt': price}},
+        'levels': {{'entry_price': price, 'stop_loss': price * 0.98, 'take_profits': [price * 1.02]}},
+        'status': 'active',
+    }}
+    gui.trader.orders_history.append(trade)
+    # Exécutions passées par le registre P&L, comme en production : entrée, puis TP pour un trade sur deux
+    ledger.register(trade)
+    fills = [('entry', 'buy', price)] + ([('tp', 'sell', price * (1.02 if i % 3 else 0.99))] if i % 2 else [])
+    for kind, side, fill_price in fills:
+        ledger.on_fill({{'id': f"bench-fill-{{kind}}-{{i}}", 'order': f"bench-{{kind}}-{{i}}", 'symbol': symbol,
+                        'side': side, 'price': fill_price, 'amount': 1.0, 'timestamp': exchange.milliseconds(),
+                        'fee': {{'cost': fill_price * 0.0006, 'currency': 'USDT'}}}})
+gui.{view}()
+"""
+
+
+STARTUP_COMMANDS = {
+    'help': [sys.executable, 'main.py', '--help'],
+    'daemon_imports': [sys.executable, '-c', "import sys, scanner, trading, pipeline, exits; "
+                       "sys.exit('streamlit' in sys.modules or 'plotly' in sys.modules)"],
+    'gui_imports': [sys.executable, '-c', "import gui"],
+}
+
+
+def bench_startup(repeat: int) -> dict:
+    """Temps de démarrage à froid (processus neuf) de l'aide, des modules du daemon et de l'interface"""
+    results = {}
+    root = str(Path(__file__).parent)
+    for name, command in STARTUP_COMMANDS.items():
+        samples = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            code = subprocess.call(command, cwd=root, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            samples.append((time.perf_counter() - start) * 1000)
+            if code:
+                print(f"⚠️  Démarrage {name}: code de sortie {code}")
+                break
+        results[f"startup_{name}_ms"] = round(statistics.median(samples), 1)
+
+    # Premier scan complet et premier signal sur l'exchange simulé
+    from scanner import KuCoinScanner
+    scanner = KuCoinScanner(exchange=MockKuCoinFutures(n_symbols=50, latency=0.0, seed=42))
+    scanner.scan_all_symbols()
+    for key in ['first_scan_s', 'first_signal_s']:
+        if key in scanner.startup_metrics:
+            results[f"startup_{key}"] = scanner.startup_metrics[key]
+    return results
+
+
+def bench_gui(trades: int) -> dict:
+    """Temps de rendu des vues Trades Actifs et Performance (AppTest Streamlit)"""
+    try:
+        from streamlit.testing.v1 import AppTest
+    except ImportError:
+        return {}
+    results = {}
+    root = str(Path(__file__).parent)
+    for view in ['display_active_trades', 'display_performance_chart']:
+        app = AppTest.from_string(GUI_SCRIPT.format(root=root, trades=trades, view=view), default_timeout=600)
+        start = time.perf_counter()
+        app.run()
+        results[f"gui_{view}_{trades}_ms"] = round((time.perf_counter() - start) * 1000, 1)
+    return results
+
+
+def current_commit() -> str:
+    """Hash court du commit courant (suffixé de + si l'arbre est modifié)"""
+    try:
+        commit = subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], text=True).strip()
+        dirty = subprocess.call(['git', 'diff', '--quiet', 'HEAD'])
+        return commit + ('+' if dirty else '')
+    except Exception:
+        return 'unknown'
+
+
+def load_results() -> list:
+    """Charge l'historique des runs"""
+    if not RESULTS_FILE.exists():
+        return []
+    with open(RESULTS_FILE, 'r', encoding='utf-8') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def compare(current: dict, reference: dict):
+    """Affiche l'évolution de chaque métrique par rapport à un run de référence"""
+    print(f"\n📊 Comparaison avec {reference['commit']} ({reference['date']}):")
+    for key, value in current['metrics'].items():
+        previous = reference['metrics'].get(key)
+        if not previous:
+            continue
+        change = (value - previous) / previous * 100
+        # Les débits (/s) s'améliorent en augmentant, les temps en diminuant
+        worse = -change if key.endswith('_per_s') else change
+        flag = "⚠️ " if worse > REGRESSION_THRESHOLD else "   "
+        print(f"{flag}{key:45s} {previous:>12.3f} -> {value:>12.3f} ({change:+.1f}%)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks KuCoin EMA Scanner")
+    parser.add_argument('--symbols', type=int, default=100, help="Taille de l'univers simulé")
+    parser.add_argument('--repeat', type=int, default=5, help="Répétitions par mesure")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--latency', type=float, default=0.005, help="Latence simulée des ordres (s)")
+    parser.add_argument('--gui-trades', type=int, default=500, help="Taille de orders_history pour le rendu")
+    parser.add_argument('--no-gui', action='store_true', help="Ignorer les benchmarks Streamlit")
+    parser.add_argument('--no-save', action='store_true', help="Ne pas enregistrer le run")
+    parser.add_argument('--compare', nargs='?', const='previous', help="Comparer au run précédent ou à un commit")
+    args = parser.parse_args()
+
+    # Le logging fichier/console fausserait les mesures
+    logging.basicConfig(level=logging.WARNING)
+
+    metrics = {}
+    print("⏱️  Démarrage...")
+    metrics.update(bench_startup(args.repeat))
+    print(f"⏱️  Scan ({args.symbols} symbols)...")
+    metrics.update(bench_scan(args.symbols, args.seed))
+    print("⏱️  Indicateurs...")
+    metrics.update(bench_indicators(args.symbols, args.seed, args.repeat))
+    print("⏱️  Exécution...")
+    metrics.update(bench_execution(args.latency, args.seed))
+    if not args.no_gui:
+        print(f"⏱️  Rendu GUI ({args.gui_trades} trades)...")
+        metrics.update(bench_gui(args.gui_trades))
+
+    run = {
+        'commit': current_commit(),
+        'date': datetime.now().isoformat(timespec='seconds'),
+        'params': {'symbols': args.symbols, 'seed': args.seed, 'latency': args.latency,
+                   'gui_trades': args.gui_trades},
+        'metrics': metrics,
+    }
+    for key, value in metrics.items():
+        print(f"   {key:45s} {value:>12}")
+
+    if args.compare:
+        history = [r for r in load_results() if r['params'] == run['params']]
+        if args.compare != 'previous':
+            history = [r for r in history if r['commit'].startswith(args.compare)]
+        if history:
+            compare(run, history[-1])
+        else:
+            print("\nAucun run de référence comparable.")
+
+    if not args.no_save:
+        with open(RESULTS_FILE, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(run) + '\n')
+        print(f"\n💾 Résultats enregistrés dans {RESULTS_FILE.name}")
+
+
+if __name__ == "__main__":
+    main()
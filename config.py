@@ -10,23 +10,169 @@ class Config:
     KUCOIN_API_SECRET = os.getenv('KUCOIN_API_SECRET', '')
     KUCOIN_PASSPHRASE = os.getenv('KUCOIN_PASSPHRASE', '')
     KUCOIN_SANDBOX = os.getenv('KUCOIN_SANDBOX', 'False').lower() == 'False'
+    KUCOIN_MOCK = os.getenv('KUCOIN_MOCK', 'false').lower() == 'true'  # Exchange simulé hors ligne
     
     # Configuration du scanner
     SCAN_INTERVAL = 60  # Intervalle de scan en secondes
+    SCAN_MAX_CONCURRENCY = 8  # Requêtes simultanées max pendant un scan
+    SCAN_MAX_RETRIES = 3  # Nouvelles tentatives des symbols en erreur transitoire
+    SIGNAL_COOLDOWN = 4 * 3600  # Délai min entre deux signaux d'un même symbol (secondes)
+    SIGNAL_EXPIRY = 8 * 3600  # Durée de mémorisation d'un signal déjà vu (secondes)
+    SIGNAL_HISTORY_SIZE = 500  # Taille max de l'historique des signaux
+    
+    # Régulation adaptative du débit REST (en-têtes gw-ratelimit-* de KuCoin)
+    RATE_LIMIT_INITIAL = 10.0  # Débit initial en requêtes/s
+    RATE_LIMIT_MIN = 1.0
+    RATE_LIMIT_MAX = 30.0
+    RATE_LIMIT_INCREASE_STEP = 0.2  # Hausse additive par requête réussie
+    RATE_LIMIT_LOW_WATERMARK = 0.2  # Part du quota restant sous laquelle on ralentit
+    RATE_LIMIT_BACKOFF = 2.0  # Pause par défaut après un 429 (secondes)
+    
+    # Scan réparti sur plusieurs processus
+    SHARD_COUNT = int(os.getenv('SHARD_COUNT', os.cpu_count() or 1))
+    SHARD_SWEEP_TIMEOUT = 300  # Attente max des résultats d'un sweep (secondes)
+    # Identifiants API par shard : [{"apiKey": ..., "secret": ..., "password": ...}, ...]
+    SHARD_CREDENTIALS = os.getenv('KUCOIN_SHARD_CREDENTIALS', '')  # JSON, lu au démarrage du scan réparti
     VOLUME_THRESHOLD = 150  # Seuil d'augmentation du volume en %
     EMA_PERIOD = 20  # Période EMA
     TIMEFRAME_MAIN = '4h'  # Timeframe principal pour EMA
     TIMEFRAME_FIBONACCI = '15m'  # Timeframe pour Fibonacci
+    TIMEFRAME_BASE = '15m'  # Seule timeframe récupérée, les autres sont agrégées localement
+    MTF_BASE_BARS = 1200  # Historique de base conservé par symbol (~12 jours en 15m)
+    MTF_CONFIRMATION_TIMEFRAMES = ['1h', '1d']  # Confirmations EMA inférieure / supérieure
+    MTF_CONFIRMATION_EMA_PERIOD = 9  # Période EMA des confirmations
+    MTF_REQUIRE_CONFIRMATION = False  # Rejeter les signaux non confirmés
+    OHLCV_PAGE_LIMIT = 200  # Nombre max de bougies par requête KuCoin Futures
+    
+    # État persistant (redémarrage à chaud)
+    STATE_ENABLED = True  # Instantanés + journal des trades, signaux et bougies
+    STATE_DIR = 'data/state'  # Un sous-répertoire par mode (mock, sandbox, live)
+    STATE_SNAPSHOT_INTERVAL = 60  # Secondes entre deux instantanés complets
+    
+    # Historique local (backfill)
+    MARKETS_SNAPSHOT_FILE = 'data/markets.json'  # Instantané des marchés pour un démarrage sans requête
+    MARKETS_SNAPSHOT_MAX_AGE = 6 * 3600  # Au-delà (secondes), les marchés sont rechargés depuis l'exchange
+    HISTORY_DIR = 'data/history'  # Un fichier .npy par symbol et timeframe + checkpoint.json
+    BACKFILL_TIMEFRAMES = ['4h', '15m']
+    BACKFILL_DAYS = 730  # Profondeur d'historique demandée
+    BACKFILL_FLUSH_PAGES = 20  # Pages téléchargées entre deux écritures du checkpoint
+    
+    # Règle de signal : filtres combinés par ET logique, nom ou (nom, paramètres)
+    # Filtres disponibles : ema_crossover, volume_increase, rsi_below, above_vwap,
+    # volume_zscore_above, atr_percent_below
+    SIGNAL_FILTERS = ['ema_crossover', 'volume_increase']
     
     # Configuration des ordres
     DEFAULT_POSITION_SIZE = 100  # Taille de position par défaut en USDT
     RISK_REWARD_RATIO = 2.0  # Ratio risque/rendement
     
+    # Trading automatique (pipeline scan -> risque -> exécution)
+    AUTO_TRADING = os.getenv('AUTO_TRADING', 'false').lower() == 'true'
+    PIPELINE_QUEUE_SIZE = 100  # Capacité des files du pipeline
+    PIPELINE_WORKERS = 4  # Exécuteurs parallèles (ordre préservé par symbol)
+    PIPELINE_SUBMIT_TIMEOUT = 5.0  # Attente max d'une place en file (secondes)
+    PIPELINE_MAX_SIGNAL_AGE = 300  # Âge max d'un signal au moment de l'exécution (secondes)
+    PIPELINE_MAX_OPEN_TRADES = 10  # Nombre max de trades actifs
+    
+    # Algorithmes d'exécution des entrées
+    EXEC_ALGO = 'auto'  # market, chase, twap ou auto (choix selon la valeur de la position)
+    EXEC_CHASE_MIN_NOTIONAL = 1000  # Mode auto : limite post-only poursuivie au-delà (USDT)
+    EXEC_TWAP_MIN_NOTIONAL = 10000  # Mode auto : découpage TWAP au-delà (USDT)
+    EXEC_CHASE_INTERVAL = 2.0  # Secondes entre deux vérifications de l'ordre limite
+    EXEC_CHASE_TIMEOUT = 30  # Durée max de poursuite d'un ordre limite (secondes)
+    EXEC_MARKET_FALLBACK = True  # Reliquat non exécuté envoyé au marché à l'échéance
+    EXEC_TWAP_SLICES = 5  # Nombre de tranches TWAP
+    EXEC_TWAP_DURATION = 300  # Durée totale d'un TWAP (secondes)
+    EXEC_ICEBERG_JITTER = 0.2  # Variation aléatoire de taille des tranches (0 = TWAP régulier)
+    
+    # Registre P&L (exécutions, frais et funding)
+    LEDGER_POLL_INTERVAL = 10  # Secondes entre deux lectures des exécutions
+    LEDGER_FUNDING_INTERVAL = 600  # Secondes entre deux lectures du funding
+    LEDGER_PAGE_SIZE = 200  # Exécutions par requête
+    LEDGER_FILLS_WINDOW = 7 * 86400  # Période couverte par une requête d'exécutions KuCoin à partir de `since` (s)
+    
+    # Filtre de liquidité (carnet d'ordres)
+    LIQUIDITY_FILTER_ENABLED = True
+    LIQUIDITY_BOOK_DEPTH = 50  # Niveaux demandés par carnet
+    LIQUIDITY_CACHE_TTL = 5  # Durée de validité d'un carnet (secondes)
+    LIQUIDITY_MAX_SLIPPAGE_PERCENT = 0.3  # Slippage max estimé d'un ordre au marché (vs prix médian)
+    LIQUIDITY_MIN_FILL_RATIO = 0.25  # En dessous de cette part exécutable, le trade est abandonné
+    LIQUIDITY_BATCH_TIMEOUT = 2.0  # Attente max d'un lot de carnets (secondes)
+    LIQUIDITY_WORKERS = 8  # Requêtes de carnet en parallèle
+    
+    # Contrôle qualité des bougies (quarantaine des séries douteuses avant la détection)
+    QUALITY_GUARD_ENABLED = True
+    QUALITY_WINDOW = 192  # Bougies de base contrôlées (2 jours en 15m)
+    QUALITY_MAX_MISSING_BARS = 2  # Bougies manquantes tolérées dans la fenêtre
+    QUALITY_MAX_ZERO_VOLUME_BARS = 3  # Suite de bougies sans volume entraînant la quarantaine
+    QUALITY_SPIKE_MAD = 12  # Écart à la médiane (en MAD) d'une variation aberrante
+    QUALITY_SPIKE_MIN_PERCENT = 3.0  # Variation minimale d'une bougie pour être aberrante
+    QUALITY_SPIKE_BARS = 16  # Dernières bougies terminées testées pour les prix aberrants (4h en 15m)
+    
+    # Classement transversal des signaux
+    RANKING_ENABLED = True  # Signaux publiés en fin de scan, du meilleur au moins bon
+    RANKING_TOP_K = 5  # Seuls les K meilleurs signaux d'un scan sont exécutés
+    RANKING_WINDOW = 50  # Bougies (TIMEFRAME_MAIN) utilisées par symbol
+    RANKING_LOOKBACK_BARS = 6  # Horizon de la performance relative et de la liquidité (6 x 4h = 24h)
+    RANKING_VOLUME_BARS = 20  # Moyenne de volume de référence
+    RANKING_ATR_PERIOD = 14
+    RANKING_BENCHMARK = 'BTC/USDT:USDT'  # Référence de la force relative (médiane de l'univers si absent)
+    RANKING_WEIGHTS = {'volume_ratio': 1.0, 'ema_distance_atr': 1.0, 'relative_strength': 1.0, 'liquidity': 1.0}
+    
+    # Risque portefeuille (en % de la valeur du compte)
+    RISK_MAX_MARGIN_PERCENT = 50.0  # Marge totale utilisée
+    RISK_MAX_SYMBOL_EXPOSURE_PERCENT = 20.0  # Exposition par symbol
+    RISK_MAX_SECTOR_EXPOSURE_PERCENT = 40.0  # Exposition par secteur
+    RISK_MAX_DAILY_LOSS_PERCENT = 5.0  # Perte journalière avant blocage des entrées
+    RISK_RESYNC_INTERVAL = 300  # Resynchronisation complète avec l'exchange (secondes)
+    RISK_SECTORS = {  # Regroupement des actifs corrélés (défaut: 'other')
+        'BTC': 'majors', 'ETH': 'majors',
+        'SOL': 'layer1', 'AVAX': 'layer1', 'ADA': 'layer1', 'DOT': 'layer1', 'NEAR': 'layer1', 'APT': 'layer1', 'SUI': 'layer1',
+        'ARB': 'layer2', 'OP': 'layer2', 'MATIC': 'layer2', 'STRK': 'layer2',
+        'DOGE': 'meme', 'SHIB': 'meme', 'PEPE': 'meme', 'WIF': 'meme', 'BONK': 'meme', 'FLOKI': 'meme',
+        'UNI': 'defi', 'AAVE': 'defi', 'LINK': 'defi', 'MKR': 'defi', 'CRV': 'defi',
+    }
+    
+    # Gestion des sorties (stop suiveur côté client)
+    EXIT_MANAGEMENT_ENABLED = True
+    EXIT_TRAIL_MODE = 'atr'  # 'atr' ou 'fibonacci'
+    EXIT_ATR_MULTIPLIER = 2.0  # Distance du stop suiveur en ATR
+    EXIT_FIB_BUFFER_PERCENT = 0.2  # Marge sous le niveau de Fibonacci retenu
+    EXIT_MIN_STOP_STEP_PERCENT = 0.1  # Déplacement minimal avant de remplacer un stop
+    EXIT_CHECK_INTERVAL = 5  # Secondes entre deux passages
+    EXIT_BATCH_SIZE = 20  # Ordres par requête groupée
+    
+    # Interface (rafraîchissement partiel et caches)
+    GUI_REFRESH_INTERVAL = 10  # Rafraîchissement des zones dynamiques (secondes)
+    GUI_ACCOUNT_TTL = 10  # Durée de cache du solde et des positions (secondes)
+    GUI_PERFORMANCE_TTL = 30  # Durée de cache du P&L par trade (secondes)
+    GUI_PAGE_SIZES = [25, 50, 100, 250]  # Tailles de page des tableaux
+    
+    # Flux privé du compte (WebSocket)
+    ACCOUNT_STREAM_ENABLED = os.getenv('ACCOUNT_STREAM_ENABLED', 'true').lower() == 'true'
+    ACCOUNT_STREAM_RECONNECT_DELAY = 5  # Délai initial de reconnexion (secondes)
+    ACCOUNT_FILLS_HISTORY = 500  # Exécutions conservées en mémoire
+    
+    # Enregistrement et rejeu des échanges avec l'exchange (profilage hors ligne)
+    EXCHANGE_RECORD_FILE = os.getenv('EXCHANGE_RECORD_FILE', '')  # Ex: data/session.rec.gz
+    EXCHANGE_REPLAY_FILE = os.getenv('EXCHANGE_REPLAY_FILE', '')  # Session rejouée à la place de KuCoin
+    EXCHANGE_REPLAY_SPEED = float(os.getenv('EXCHANGE_REPLAY_SPEED', '1.0'))  # Accélération (0 = sans attente)
+
+    # API de contrôle à distance (pilotage sans navigateur, métriques, flux de signaux)
+    API_ENABLED = os.getenv('API_ENABLED', 'false').lower() == 'true'
+    API_HOST = os.getenv('API_HOST', '127.0.0.1')  # 0.0.0.0 pour un tableau de bord distant
+    API_PORT = int(os.getenv('API_PORT', '8765'))
+    API_TOKEN = os.getenv('API_TOKEN', '')  # Jeton Bearer exigé s'il est défini
+    API_SSE_QUEUE_SIZE = 100  # Événements en attente par client ; au-delà ils sont abandonnés
+    API_SSE_HEARTBEAT = 15  # Commentaire de maintien de connexion (secondes)
+    
     # Niveaux Fibonacci
     FIBONACCI_LEVELS = {
         'retracement': [0.236, 0.382, 0.5, 0.618, 0.786],
         'extension': [1.272, 1.414, 1.618, 2.0, 2.618]
     }
+    FIBONACCI_SWING_STRENGTH = 3  # Barres de part et d'autre pour confirmer un pivot
+    FIBONACCI_SWING_PAIRS = 3  # Nombre de paires de swings récentes exposées
     
     # Configuration Stop Loss / Take Profit
     DEFAULT_SL_PERCENT = 2.0  # Stop Loss en %
@@ -36,5 +182,9 @@ class Config:
     TP3_PERCENT = 5.0  # Take Profit 3 en %
     
     # Configuration logging
-    LOG_LEVEL = 'NOTSET'
-    LOG_FILE = 'trading.log'
\ No newline at end of file
+    LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO')
+    LOG_FILE = 'trading.log'  # Un événement JSON par ligne
+    LOG_MAX_BYTES = 10 * 1024 * 1024  # Rotation du fichier de log au-delà de cette taille
+    LOG_BACKUP_COUNT = 5  # Fichiers trading.log.1 ... conservés
+    LOG_QUEUE_SIZE = 10000  # File en mémoire ; au-delà les messages sont abandonnés plutôt que d'attendre
+    LOG_SAMPLING = {'scanner': 10, 'rate_limit': 10}  # Un message DEBUG sur N conservé par module
\ No newline at end of file
@@ -0,0 +1,354 @@
+import asyncio
+import hmac
+import json
+import logging
+import re
+import threading
+import time
+from collections import deque
+from datetime import date, datetime
+from typing import Dict, List, Optional, Set
+import numpy as np
+from config import Config
+
+# Paramètres modifiables à distance : ceux de la barre latérale, avec les mêmes bornes
+CONFIG_FIELDS = {
+    'SCAN_INTERVAL': (int, 30, 300),
+    'VOLUME_THRESHOLD': (int, 50, 2000),
+    'EMA_PERIOD': (int, 10, 50),
+    'DEFAULT_POSITION_SIZE': (int, 1, 10000),
+    'DEFAULT_LEVERAGE': (float, 1.0, 20.0),
+    'DEFAULT_SL_PERCENT': (float, 0.5, 10.0),
+    'TP1_PERCENT': (float, 0.5, 5.0),
+    'TP2_PERCENT': (float, 1.0, 10.0),
+    'TP3_PERCENT': (float, 2.0, 15.0),
+}
+CONFIG_LOCK = threading.Lock()
+STREAM_FIELDS = ['symbol', 'timestamp', 'bar_timestamp', 'price', 'volume_increase', 'ema_value',
+                 'signal_strength', 'confirmations', 'indicators', 'rank', 'rank_score']
+
+
+def _json_default(value):
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return str(value)
+
+
+def dumps(data) -> str:
+    return json.dumps(data, default=_json_default)
+
+
+def config_values() -> Dict:
+    return {name: getattr(Config, name) for name in CONFIG_FIELDS}
+
+
+def validate_config(changes: Dict) -> tuple:
+    """Valeurs converties et erreurs par paramètre ; rien n'est appliqué ici"""
+    values, errors = {}, {}
+    if not isinstance(changes, dict):
+        return values, {'_': "objet JSON attendu"}
+    for name, value in changes.items():
+        if name not in CONFIG_FIELDS:
+            errors[name] = "paramètre inconnu ou non modifiable"
+            continue
+        kind, minimum, maximum = CONFIG_FIELDS[name]
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            errors[name] = "nombre attendu"
+        elif kind is int and value != int(value):
+            errors[name] = "entier attendu"
+        elif not minimum <= value <= maximum:
+            errors[name] = f"hors bornes [{minimum}, {maximum}]"
+        else:
+            values[name] = kind(value)
+    merged = {**config_values(), **values}
+    if not errors and not merged['TP1_PERCENT'] < merged['TP2_PERCENT'] < merged['TP3_PERCENT']:
+        errors['TP_PERCENT'] = "TP1 < TP2 < TP3 attendu"
+    return values, errors
+
+
+def apply_config(changes: Dict) -> tuple:
+    """Applique tous les changements ou aucun ; retourne (valeurs avant, erreurs)"""
+    with CONFIG_LOCK:
+        values, errors = validate_config(changes)
+        if errors:
+            return {}, errors
+        previous = {name: getattr(Config, name) for name in values}
+        for name, value in values.items():
+            setattr(Config, name, value)
+    if values:
+        logging.info(f"Configuration modifiée via l'API: {values}", extra={'event': 'config'})
+    return previous, {}
+
+
+def flatten_metrics(data: Dict, prefix: str = 'kucoin_scanner') -> List[str]:
+    """Métriques numériques au format texte Prometheus"""
+    lines = []
+    for key, value in data.items():
+        name = re.sub(r'[^a-zA-Z0-9_]', '_', f"{prefix}_{key}")
+        if isinstance(value, dict):
+            lines += flatten_metrics(value, name)
+        elif isinstance(value, (bool, np.bool_)):
+            lines.append(f"{name} {int(value)}")
+        elif isinstance(value, (int, float, np.number)):
+            lines.append(f"{name} {value}")
+    return lines
+
+
+class ControlServer:
+    """API HTTP de pilotage d'une instance, servie par une boucle asyncio dédiée.
+
+    - GET  /status, /metrics (JSON, ou texte Prometheus avec ?format=prometheus)
+    - GET  /config ; PATCH /config : changement atomique, sans relancer l'interface
+    - POST /scan/start, /scan/stop, /scan/run
+    - GET  /signals ; /signals/stream : nouveaux signaux en server-sent events
+
+    Les abonnés SSE ont chacun une file bornée : un client lent perd des
+    événements au lieu de ralentir le scanner. Un client qui se reconnecte
+    avec Last-Event-ID reçoit les événements récents qu'il a manqués.
+    """
+
+    def __init__(self, runtime: Dict, host: str = None, port: int = None, token: str = None):
+        self.runtime = runtime
+        self.host = host or Config.API_HOST
+        self.port = port or Config.API_PORT
+        self.token = Config.API_TOKEN if token is None else token
+        self.started = time.time()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._runner = None
+        self._clients: Set[asyncio.Queue] = set()
+        self._recent = deque(maxlen=Config.API_SSE_QUEUE_SIZE)
+        self._event_id = 0
+        self.stats = {'requests': 0, 'unauthorized': 0, 'events': 0, 'dropped': 0}
+
+    @property
+    def scanner(self):
+        return self.runtime['scanner']
+
+    @property
+    def trader(self):
+        return self.runtime['trader']
+
+    def start(self) -> bool:
+        """Démarre le serveur ; False si aiohttp manque ou si le port n'a pas pu être ouvert"""
+        if self._thread:
+            return True
+        try:
+            from aiohttp import web
+        except ImportError:
+            logging.error("API de contrôle désactivée: aiohttp n'est pas installé (pip install -r requirements.txt)")
+            return False
+
+        @web.middleware
+        async def authenticate(request, handler):
+            self.stats['requests'] += 1
+            if not self._authorized(request):
+                self.stats['unauthorized'] += 1
+                return web.json_response({'error': "jeton invalide"}, status=401)
+            return await handler(request)
+
+        app = web.Application(middlewares=[authenticate])
+        app.add_routes([
+            web.get('/status', self.handle_status),
+            web.get('/metrics', self.handle_metrics),
+            web.get('/config', self.handle_get_config),
+            web.patch('/config', self.handle_patch_config),
+            web.post('/scan/start', self.handle_scan_start),
+            web.post('/scan/stop', self.handle_scan_stop),
+            web.post('/scan/run', self.handle_scan_run),
+            web.get('/signals', self.handle_signals),
+            web.get('/signals/stream', self.handle_stream),
+        ])
+        loop = asyncio.new_event_loop()
+        try:
+            self._runner = web.AppRunner(app, access_log=None)
+            loop.run_until_complete(self._runner.setup())
+            loop.run_until_complete(web.TCPSite(self._runner, self.host, self.port).start())
+        except OSError as e:
+            logging.error(f"API de contrôle indisponible sur {self.host}:{self.port}: {e}")
+            loop.run_until_complete(self._runner.cleanup())
+            loop.close()
+            return False
+        self._loop = loop
+        self._thread = threading.Thread(target=loop.run_forever, name="control-api", daemon=True)
+        self._thread.start()
+        self.scanner.signal_listeners.append(self.publish)
+        if not self.token and self.host not in ('127.0.0.1', 'localhost'):
+            logging.warning(f"API de contrôle exposée sur {self.host} sans jeton (API_TOKEN)")
+        logging.info(f"API de contrôle démarrée sur http://{self.host}:{self.port}")
+        return True
+
+    def stop(self):
+        """Ferme les flux SSE puis le serveur"""
+        if not self._thread:
+            return
+        if self.publish in self.scanner.signal_listeners:
+            self.scanner.signal_listeners.remove(self.publish)
+        try:
+            asyncio.run_coroutine_threadsafe(self._shutdown(), self._loop).result(timeout=5)
+        except Exception as e:
+            logging.error(f"Erreur à l'arrêt de l'API de contrôle: {e}")
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=5)
+        self._thread = None
+
+    async def _shutdown(self):
+        for client in list(self._clients):
+            if client.full():
+                client.get_nowait()
+            client.put_nowait(None)  # Termine chaque flux SSE proprement
+        await self._runner.cleanup()
+
+    # Flux de signaux (appelé depuis les threads du scanner)
+
+    def publish(self, signal: Dict):
+        """Abonné du scanner : diffuse le signal aux clients SSE"""
+        if self._loop is None:
+            return
+        payload = dumps({key: signal[key] for key in STREAM_FIELDS if key in signal})
+        self._loop.call_soon_threadsafe(self._broadcast, 'signal', payload)
+
+    def _broadcast(self, kind: str, payload: str):
+        self._event_id += 1
+        event = f"id: {self._event_id}\nevent: {kind}\ndata: {payload}\n\n".encode()
+        self._recent.append((self._event_id, event))
+        self.stats['events'] += 1
+        for client in self._clients:
+            try:
+                client.put_nowait(event)
+            except asyncio.QueueFull:
+                self.stats['dropped'] += 1
+
+    # Requêtes
+
+    def _authorized(self, request) -> bool:
+        if not self.token:
+            return True
+        header = request.headers.get('Authorization', '')
+        supplied = header[7:] if header.startswith('Bearer ') else request.query.get('token', '')
+        return hmac.compare_digest(supplied.encode(), self.token.encode())
+
+    def _json(self, data: Dict, status: int = 200):
+        from aiohttp import web
+        return web.json_response(data, status=status, dumps=dumps)
+
+    def status(self) -> Dict:
+        scan_loop = self.runtime['scan_loop']
+        return {
+            'scanning': scan_loop.running,
+            'scan_in_progress': scan_loop.scanning,
+            'auto_trading': self.runtime.get('pipeline') is not None,
+            'mode': 'mock' if Config.KUCOIN_MOCK else 'sandbox' if Config.KUCOIN_SANDBOX else 'live',
+            'uptime_s': round(time.time() - self.started, 1),
+            'symbols': len(self.scanner.futures_symbols),
+            'signals': len(self.scanner.detected_signals),
+            'active_trades': sum(1 for t in self.trader.orders_history if t.get('status') == 'active'),
+            'scan_loop': dict(scan_loop.stats),
+            'last_scan': self.scanner.last_scan_stats,
+        }
+
+    def metrics(self) -> Dict:
+        """Métriques de toute l'instance, lues sans requête à l'exchange"""
+        pipeline = self.runtime.get('pipeline')
+        metrics = {
+            'scan': {key: value for key, value in self.scanner.last_scan_stats.items() if key != 'governor'},
+            'governor': self.scanner.governor.stats(),
+            'startup': self.scanner.startup_metrics,
+            'quality': self.scanner.quality_guard.stats,
+            'pipeline': pipeline.metrics() if pipeline is not None else {},
+            'risk': {key: value for key, value in self.trader.risk_engine.snapshot().items()
+                     if not key.startswith('exposure')},
+            'pnl': self.trader.ledger.portfolio(),
+            'execution': dict(self.trader.execution.stats, active=self.trader.execution.active),
+            'liquidity': self.trader.liquidity.stats,
+            'api': dict(self.stats, clients=len(self._clients)),
+        }
+        metrics['scan']['running'] = self.runtime['scan_loop'].running
+        return metrics
+
+    async def handle_status(self, request):
+        return self._json(self.status())
+
+    async def handle_metrics(self, request):
+        from aiohttp import web
+        metrics = self.metrics()
+        if request.query.get('format') == 'prometheus':
+            return web.Response(text="\n".join(flatten_metrics(metrics)) + "\n", content_type='text/plain')
+        return self._json(metrics)
+
+    async def handle_get_config(self, request):
+        return self._json(config_values())
+
+    async def handle_patch_config(self, request):
+        try:
+            changes = await request.json()
+        except ValueError:
+            return self._json({'error': "corps JSON invalide"}, status=400)
+        previous, errors = apply_config(changes)
+        if errors:
+            return self._json({'errors': errors}, status=400)
+        return self._json({'previous': previous, 'config': config_values()})
+
+    async def handle_scan_start(self, request):
+        started = self.runtime['scan_loop'].start()
+        return self._json({'scanning': True, 'changed': started})
+
+    async def handle_scan_stop(self, request):
+        stopped = self.runtime['scan_loop'].stop()
+        return self._json({'scanning': False, 'changed': stopped})
+
+    async def handle_scan_run(self, request):
+        start = time.perf_counter()
+        signals = await asyncio.to_thread(self.runtime['scan_loop'].run_once, False)
+        if signals is None:
+            return self._json({'error': "scan déjà en cours"}, status=409)
+        return self._json({'signals': len(signals), 'duration_s': round(time.perf_counter() - start, 2)})
+
+    async def handle_signals(self, request):
+        try:
+            limit = int(request.query.get('limit', Config.RANKING_TOP_K))
+        except ValueError:
+            return self._json({'error': "limit doit être un entier"}, status=400)
+        signals = self.scanner.detected_signals[:limit]
+        return self._json({'signals': [{key: s[key] for key in STREAM_FIELDS if key in s} for s in signals]})
+
+    async def handle_stream(self, request):
+        from aiohttp import web
+        response = web.StreamResponse(headers={
+            'Content-Type': 'text/event-stream', 'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no',
+        })
+        await response.prepare(request)
+        client = asyncio.Queue(maxsize=Config.API_SSE_QUEUE_SIZE)
+        try:
+            last_id = int(request.headers.get('Last-Event-ID', 0))
+        except ValueError:
+            last_id = 0
+        for event_id, event in self._recent:
+            if event_id > last_id > 0:
+                client.put_nowait(event)
+        self._clients.add(client)
+        try:
+            while True:
+                try:
+                    event = await asyncio.wait_for(client.get(), timeout=Config.API_SSE_HEARTBEAT)
+                except asyncio.TimeoutError:
+                    await response.write(b": ping\n\n")
+                    continue
+                if event is None:
+                    break
+                await response.write(event)
+        except ConnectionResetError:
+            pass  # Client déconnecté
+        finally:
+            self._clients.discard(client)
+        return response
+
+
+def start_control_api(runtime: Dict) -> Optional[ControlServer]:
+    """Démarre l'API de contrôle si elle est activée (API_ENABLED)"""
+    if not Config.API_ENABLED:
+        return None
+    server = ControlServer(runtime)
+    return server if server.start() else None
@@ -0,0 +1,150 @@
+import logging
+import time
+import warnings
+import numpy as np
+import pandas as pd
+from typing import Dict, Optional, Set
+from config import Config
+from timeframes import OHLCV_COLUMNS, timeframe_to_seconds
+
+CHECKS = ['missing_bars', 'duplicate_bars', 'zero_volume_run', 'price_spikes', 'bad_ohlc']
+PRICE_COLUMNS = OHLCV_COLUMNS[1:]  # Colonnes des séries du CandleStore, dans cet ordre
+
+
+def _stack_tail(frames: Dict[str, pd.DataFrame], window: int) -> tuple:
+    """Matrices (symbols x bougies) des `window` dernières bougies, complétées à gauche par NaN"""
+    symbols = [s for s, frame in frames.items() if frame is not None and len(frame)]
+    timestamps = np.full((len(symbols), window), np.nan)
+    values = np.full((len(symbols), window, len(PRICE_COLUMNS)), np.nan)
+    for row, symbol in enumerate(symbols):
+        frame = frames[symbol]
+        n = min(window, len(frame))
+        timestamps[row, -n:] = frame.index.asi8[-n:] // 10**6
+        values[row, -n:] = frame.to_numpy(dtype=float)[-n:]
+    arrays = {column: values[:, :, i] for i, column in enumerate(PRICE_COLUMNS)}
+    arrays['timestamp'] = timestamps
+    return symbols, arrays
+
+
+def _longest_run(mask: np.ndarray) -> np.ndarray:
+    """Plus longue suite de True de chaque ligne"""
+    if not mask.size:
+        return np.zeros(len(mask), dtype=int)
+    counts = np.cumsum(mask, axis=1)
+    resets = np.maximum.accumulate(np.where(mask, 0, counts), axis=1)
+    return (counts - resets).max(axis=1)
+
+
+def _spikes(prices: np.ndarray, close: np.ndarray) -> np.ndarray:
+    """Prix aberrants de chaque ligne : écart qui revient aussitôt, loin du bruit habituel en MAD.
+
+    Un prix n'est aberrant que s'il sort des clôtures des deux bougies
+    voisines (précédente et suivante) : une cassure qui tient n'est pas
+    comptée. Seules les QUALITY_SPIKE_BARS dernières bougies terminées sont
+    testées, pour qu'un mauvais prix ne bloque pas le symbol toute la fenêtre.
+    """
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', RuntimeWarning)  # Lignes entièrement NaN (séries courtes)
+        # Bruit habituel : MAD des variations d'une bougie à l'autre
+        moves = np.log(prices[:, 1:] / close[:, :-1])
+        median = np.nanmedian(moves, axis=1, keepdims=True)
+        mad = np.nanmedian(np.abs(moves - median), axis=1, keepdims=True) * 1.4826
+        # Excursion au-delà des deux clôtures voisines (nulle si le prix reste entre elles)
+        previous, following = close[:, :-2], close[:, 2:]
+        excursion = np.fmax(np.log(prices[:, 1:-1] / np.fmax(previous, following)),
+                            np.log(np.fmin(previous, following) / prices[:, 1:-1]))
+    excursion = excursion[:, -Config.QUALITY_SPIKE_BARS:]
+    return ((excursion > Config.QUALITY_SPIKE_MAD * mad)
+            & (excursion > np.log1p(Config.QUALITY_SPIKE_MIN_PERCENT / 100))).sum(axis=1)
+
+
+def assess_series(frames: Dict[str, pd.DataFrame], timeframe: str, now_ms: Optional[int] = None,
+                  window: int = None) -> pd.DataFrame:
+    """Contrôle qualité de toutes les séries en une passe NumPy.
+
+    Sur les `window` dernières bougies de chaque symbol : bougies manquantes
+    (trous et, si `now_ms` est fourni, retard de la dernière bougie),
+    horodatages dupliqués ou désordonnés, plus longue suite de bougies sans
+    volume, prix de clôture ou de mèche aberrants sur les bougies récentes
+    (écart aux deux bougies voisines, mesuré en MAD) et bougies incohérentes (plus haut sous l'ouverture, prix nul).
+    """
+    window = window or Config.QUALITY_WINDOW
+    symbols, m = _stack_tail(frames, window)
+    if not symbols:
+        return pd.DataFrame(columns=CHECKS + ['quarantined'])
+    step = timeframe_to_seconds(timeframe) * 1000
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        gaps = np.diff(m['timestamp'], axis=1)
+        missing = np.where(gaps > step, np.round(gaps / step) - 1, 0).sum(axis=1)
+        if now_ms is not None:
+            # La dernière bougie (en formation) doit couvrir l'instant présent
+            missing += np.maximum(0, (now_ms - m['timestamp'][:, -1]) // step - 1)
+        spikes = sum(_spikes(m[column], m['close']) for column in ['close', 'high', 'low'])
+        bad_ohlc = ((m['high'] < np.fmax(m['open'], m['close'])) | (m['low'] > np.fmin(m['open'], m['close']))
+                    | (m['low'] <= 0)).sum(axis=1)
+
+    report = pd.DataFrame({
+        'missing_bars': missing.astype(int),
+        'duplicate_bars': (gaps <= 0).sum(axis=1),
+        'zero_volume_run': _longest_run(m['volume'] == 0),
+        'price_spikes': spikes,
+        'bad_ohlc': bad_ohlc,
+    }, index=symbols)
+    report['quarantined'] = (
+        (report['missing_bars'] > Config.QUALITY_MAX_MISSING_BARS)
+        | (report['duplicate_bars'] > 0)
+        | (report['zero_volume_run'] >= Config.QUALITY_MAX_ZERO_VOLUME_BARS)
+        | (report['price_spikes'] > 0)
+        | (report['bad_ohlc'] > 0)
+    )
+    return report
+
+
+def describe(row: pd.Series) -> str:
+    """Motif lisible d'une mise en quarantaine"""
+    labels = {
+        'missing_bars': "bougies manquantes", 'duplicate_bars': "horodatages dupliqués",
+        'zero_volume_run': "bougies consécutives sans volume", 'price_spikes': "variations aberrantes",
+        'bad_ohlc': "bougies incohérentes",
+    }
+    return ", ".join(f"{int(row[check])} {labels[check]}" for check in CHECKS if row[check])
+
+
+class QualityGuard:
+    """Quarantaine des séries de bougies douteuses avant la détection de signaux.
+
+    Chaque lot de séries est évalué en une passe ; un symbol en quarantaine
+    n'est pas scanné ni pris en compte dans le classement, et en sort dès
+    que sa fenêtre récente redevient saine.
+    """
+
+    def __init__(self, timeframe: str = None):
+        self.timeframe = timeframe or Config.TIMEFRAME_BASE
+        self.quarantine: Dict[str, Dict] = {}
+        self.report = pd.DataFrame(columns=CHECKS + ['quarantined'])  # Dernière évaluation
+        self.stats = {'checked': 0, 'quarantined': 0, 'released': 0, 'last_check_ms': 0.0}
+
+    def check(self, frames: Dict[str, pd.DataFrame], now_ms: Optional[int] = None) -> Set[str]:
+        """Évalue les séries et met à jour la quarantaine ; retourne les symbols sains"""
+        start = time.perf_counter()
+        report = assess_series(frames, self.timeframe, now_ms=now_ms)
+        for symbol, row in report[report['quarantined']].iterrows():
+            if symbol not in self.quarantine:
+                reason = describe(row)
+                self.quarantine[symbol] = {'since': time.time(), 'reason': reason}
+                self.stats['quarantined'] += 1
+                logging.warning(f"Série {symbol} mise en quarantaine: {reason}",
+                                extra={'event': 'quarantine', 'symbol': symbol})
+        healthy = set(report.index[~report['quarantined']])
+        for symbol in healthy & set(self.quarantine):
+            del self.quarantine[symbol]
+            self.stats['released'] += 1
+            logging.info(f"Série {symbol} sortie de quarantaine")
+        self.report = report
+        self.stats['checked'] += len(report)
+        self.stats['last_check_ms'] = round((time.perf_counter() - start) * 1000, 1)
+        return healthy
+
+    def is_quarantined(self, symbol: str) -> bool:
+        return symbol in self.quarantine
@@ -0,0 +1,217 @@
+import asyncio
+import logging
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from functools import partial
+from typing import Callable, Dict, List, Optional
+from config import Config
+
+ALGOS = ['market', 'chase', 'twap']
+
+
+def summarize(children: List[Dict], side: str, amount: float, arrival_price: float) -> Dict:
+    """Agrège les ordres enfants et mesure l'implementation shortfall par rapport au prix du signal"""
+    filled = sum(o.get('filled') or 0.0 for o in children)
+    cost = sum((o.get('filled') or 0.0) * (o.get('average') or o.get('price') or 0.0) for o in children)
+    fees = sum((o.get('fee') or {}).get('cost') or 0.0 for o in children)
+    average = cost / filled if filled else None
+    sign = 1 if side == 'buy' else -1
+    report = {
+        'amount': amount, 'filled': round(filled, 6), 'unfilled': round(max(0.0, amount - filled), 6),
+        'average_price': average, 'arrival_price': arrival_price, 'fees_usdt': round(fees, 6),
+        'child_orders': len(children), 'shortfall_bps': None, 'shortfall_usdt': None,
+    }
+    if average and arrival_price:
+        # Coût de l'exécution par rapport à une exécution instantanée au prix du signal, frais compris
+        report['shortfall_bps'] = round(sign * (average / arrival_price - 1) * 10_000, 2)
+        report['shortfall_usdt'] = round(sign * (average - arrival_price) * filled + fees, 6)
+    return report
+
+
+def is_open(order: Dict) -> bool:
+    """Ordre encore au carnet (un état inconnu est traité comme ouvert)"""
+    return order.get('status') in (None, 'open')
+
+
+class ExecutionEngine:
+    """Algorithmes d'exécution des entrées, exécutés comme tâches coopératives.
+
+    Chaque exécution est une coroutine d'une boucle asyncio dédiée : pendant
+    qu'un ordre attend son exécution, les autres symbols progressent. Les
+    appels REST (synchrones avec ccxt) passent par des threads, sans bloquer
+    la boucle. Les ordres enfants sont conservés même si l'algorithme échoue
+    en cours de route : l'ordre encore ouvert est annulé et le rapport
+    partiel reflète la quantité réellement exécutée.
+
+    - chase : ordre limite post-only au meilleur prix du carnet, replacé quand
+      le marché s'éloigne ; reliquat au marché à l'échéance
+    - twap : tranches régulières (ou de taille aléatoire, façon iceberg)
+      étalées sur la durée, chacune exécutée par chase
+    """
+
+    def __init__(self, exchange):
+        self.exchange = exchange
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._guard = threading.Lock()
+        self.active = 0
+        self.reports = deque(maxlen=500)
+        self.stats = {'executions': 0, 'child_orders': 0, 'replaced': 0, 'market_fallbacks': 0}
+
+    def choose_algo(self, notional: float) -> str:
+        """Algorithme d'entrée configuré, ou choisi selon la taille en mode auto"""
+        if Config.EXEC_ALGO in ALGOS:
+            return Config.EXEC_ALGO
+        if notional >= Config.EXEC_TWAP_MIN_NOTIONAL:
+            return 'twap'
+        if notional >= Config.EXEC_CHASE_MIN_NOTIONAL:
+            return 'chase'
+        return 'market'
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        with self._guard:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(target=self._loop.run_forever, daemon=True, name="execution")
+                self._thread.start()
+            return self._loop
+
+    def submit(self, algo: str, symbol: str, side: str, amount: float, arrival_price: float) -> Future:
+        """Lance une exécution en tâche de fond ; le Future donne le rapport d'exécution (jamais d'exception)"""
+        coroutine = self._run(algo, symbol, side, amount, arrival_price)
+        return asyncio.run_coroutine_threadsafe(coroutine, self._ensure_loop())
+
+    async def _call(self, func, *args, **kwargs):
+        return await asyncio.to_thread(func, *args, **kwargs)
+
+    async def _run(self, algo: str, symbol: str, side: str, amount: float, arrival_price: float) -> Dict:
+        start = time.perf_counter()
+        orders: Dict[str, Dict] = {}  # Ordres enfants, alimentés au fil de l'algorithme
+        error = None
+        self.active += 1
+        try:
+            if algo == 'twap':
+                await self.twap(symbol, side, amount, orders)
+            elif algo == 'chase':
+                await self.limit_chase(symbol, side, amount, Config.EXEC_CHASE_TIMEOUT,
+                                       Config.EXEC_MARKET_FALLBACK, orders)
+            else:
+                await self._place(partial(self.exchange.create_market_order, symbol, side, amount),
+                                  symbol, side, amount, None, lambda o: orders.__setitem__(o['id'], o))
+        except Exception as e:
+            error = str(e)
+            logging.error(f"Erreur d'exécution {algo} {symbol}, rapport partiel: {e}")
+            # Ordre limite encore au carnet : annulé, puis relu pour la quantité exécutée entre-temps
+            for order in [o for o in orders.values() if is_open(o)]:
+                try:
+                    orders[order['id']] = await self._cancel(order)
+                except Exception as cancel_error:
+                    logging.error(f"Ordre {order['id']} {symbol} peut-être encore ouvert: {cancel_error}")
+        finally:
+            self.active -= 1
+        children = list(orders.values())
+        report = summarize(children, side, amount, arrival_price)
+        report.update({'algo': algo, 'symbol': symbol, 'side': side, 'error': error,
+                       'duration_s': round(time.perf_counter() - start, 2), 'orders': children})
+        self.stats['executions'] += 1
+        self.stats['child_orders'] += len(children)
+        self.reports.append({k: v for k, v in report.items() if k != 'orders'})
+        logging.info(f"Exécution {algo} {symbol}: {report['filled']}/{amount} à {report['average_price']}, "
+                     f"shortfall {report['shortfall_bps']} pb", extra={'event': 'execution', 'symbol': symbol})
+        return report
+
+    async def _best_price(self, symbol: str, side: str) -> float:
+        book = await self._call(self.exchange.fetch_order_book, symbol, 5)
+        return book['bids'][0][0] if side == 'buy' else book['asks'][0][0]
+
+    async def _place(self, create, symbol: str, side: str, amount: float, price: Optional[float],
+                     track: Callable[[Dict], None]) -> Dict:
+        """Place un ordre puis relit son état : la réponse de création (KuCoin) ne contient que l'identifiant"""
+        created = await self._call(create)
+        # Provisoire jusqu'à la relecture : ouvert et rien d'exécuté, donc annulé et relu en cas d'erreur
+        track({'id': created['id'], 'symbol': symbol, 'side': side, 'amount': amount, 'price': price,
+               'status': 'open', 'filled': 0.0})
+        order = await self._call(self.exchange.fetch_order, created['id'], symbol)
+        track(order)
+        return order
+
+    async def _cancel(self, order: Dict) -> Dict:
+        """Annule un ordre puis relit son état final (quantité exécutée entre-temps)"""
+        try:
+            await self._call(self.exchange.cancel_order, order['id'], order['symbol'])
+        except Exception as e:
+            logging.debug(f"Annulation de {order['id']} impossible (déjà exécuté ?): {e}")
+        return await self._call(self.exchange.fetch_order, order['id'], order['symbol'])
+
+    async def limit_chase(self, symbol: str, side: str, amount: float, timeout: float,
+                          market_fallback: bool, orders: Dict[str, Dict] = None) -> List[Dict]:
+        """Ordre limite post-only au meilleur prix, replacé tant que le marché s'éloigne.
+
+        Chaque ordre placé est inscrit dans `orders` dès sa création, pour que
+        l'appelant le retrouve si la poursuite est interrompue.
+        """
+        orders = {} if orders is None else orders
+        own: List[str] = []  # Ordres de cette poursuite (`orders` peut en contenir d'autres)
+        deadline = time.monotonic() + timeout
+        working = None
+
+        def track(order: Dict):
+            if order['id'] not in orders:
+                own.append(order['id'])
+            orders[order['id']] = order
+
+        def remaining() -> float:
+            return round(amount - sum(orders[i].get('filled') or 0.0 for i in own), 6)
+
+        while remaining() > 0 and time.monotonic() < deadline:
+            best = await self._best_price(symbol, side)
+            if working is not None and working['price'] != best:
+                track(await self._cancel(working))
+                working = None
+                self.stats['replaced'] += 1
+            if working is None and remaining() > 0:
+                size = remaining()
+                order = await self._place(partial(self.exchange.create_order, symbol, 'limit', side, size, best,
+                                                  {'postOnly': True}), symbol, side, size, best, track)
+                # Un post-only qui croiserait le carnet est rejeté : nouvel essai au prochain tour
+                working = order if is_open(order) else None
+            await asyncio.sleep(Config.EXEC_CHASE_INTERVAL)
+            if working is not None:
+                working = await self._call(self.exchange.fetch_order, working['id'], symbol)
+                track(working)
+                if not is_open(working):
+                    working = None
+
+        if working is not None:
+            track(await self._cancel(working))
+        if remaining() > 0 and market_fallback:
+            size = remaining()
+            await self._place(partial(self.exchange.create_market_order, symbol, side, size),
+                              symbol, side, size, None, track)
+            self.stats['market_fallbacks'] += 1
+        return [orders[i] for i in own]
+
+    async def twap(self, symbol: str, side: str, amount: float, orders: Dict[str, Dict] = None) -> List[Dict]:
+        """Tranches étalées sur EXEC_TWAP_DURATION ; le non-exécuté d'une tranche passe à la suivante"""
+        slices = max(1, Config.EXEC_TWAP_SLICES)
+        interval = Config.EXEC_TWAP_DURATION / slices
+        weights = [1 + random.uniform(-Config.EXEC_ICEBERG_JITTER, Config.EXEC_ICEBERG_JITTER) for _ in range(slices)]
+        sizes = [amount * w / sum(weights) for w in weights]
+        orders = {} if orders is None else orders
+        scheduled = 0.0
+        for i, size in enumerate(sizes):
+            slot_end = time.monotonic() + interval
+            last = i == slices - 1
+            scheduled += size
+            # Objectif cumulé : ce qui n'a pas été exécuté dans une tranche est reporté sur la suivante
+            filled = sum(o.get('filled') or 0.0 for o in orders.values())
+            target = round((amount if last else scheduled) - filled, 6)
+            if target > 0:
+                await self.limit_chase(symbol, side, target, min(interval, Config.EXEC_CHASE_TIMEOUT),
+                                       last and Config.EXEC_MARKET_FALLBACK, orders)
+            if not last:
+                await asyncio.sleep(max(0.0, slot_end - time.monotonic()))
+        return list(orders.values())
@@ -0,0 +1,261 @@
+import logging
+import threading
+import time
+import numpy as np
+from typing import Callable, Dict, List, Optional
+from config import Config
+
+FINAL_STATUSES = ('closed', 'canceled', 'cancelled', 'expired', 'rejected')
+
+
+class ExitManager:
+    """Gestion côté client des sorties de tous les trades actifs.
+
+    À chaque passage, les prix de tous les symbols sont lus en une fois
+    (flux privé du compte, sinon un seul `fetch_tickers`), puis les nouveaux
+    stops sont calculés de façon vectorisée : passage au point mort après
+    TP1, puis suivi du plus haut par ATR ou par niveaux de Fibonacci. Les
+    stops déplacés sont remplacés par lots (création groupée puis annulation
+    des anciens), sans requête par position.
+
+    Un prix qui touche le stop ou un TP ne clôt rien : il déclenche seulement
+    la relecture des ordres concernés. Un trade n'est clôturé que sur l'état
+    de l'exchange (stop exécuté, tous les TP exécutés, position soldée).
+    """
+
+    def __init__(self, trader, atr_provider: Callable[[str], Optional[float]] = None,
+                 mode: str = None, interval: float = None):
+        self.trader = trader
+        self.atr_provider = atr_provider
+        self.mode = mode or Config.EXIT_TRAIL_MODE
+        self.interval = interval or Config.EXIT_CHECK_INTERVAL
+        self._thread = None
+        self._running = False
+        self._lock = threading.Lock()
+        self.stats = {'passes': 0, 'stops_moved': 0, 'trades_closed': 0, 'last_duration_ms': None, 'managed': 0}
+
+    def start(self):
+        """Démarre la surveillance périodique"""
+        if self._running:
+            return
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="exit-manager", daemon=True)
+        self._thread.start()
+        logging.info(f"Gestion des sorties démarrée (mode {self.mode}, toutes les {self.interval}s)")
+
+    def stop(self):
+        """Arrête la surveillance"""
+        self._running = False
+        if self._thread:
+            self._thread.join(timeout=self.interval + 5)
+            self._thread = None
+
+    def _run(self):
+        while self._running:
+            try:
+                self.evaluate()
+            except Exception as e:
+                logging.error(f"Erreur gestion des sorties: {e}")
+            time.sleep(self.interval)
+
+    def _init_exit_state(self, trade: Dict) -> Dict:
+        levels = trade['levels']
+        entry = levels['entry_price']
+        atr = self.atr_provider(trade['symbol']) if self.atr_provider else None
+        atr = atr or trade['signal'].get('indicators', {}).get('atr')
+        # Sans ATR connu, la distance de suivi reprend celle du stop initial
+        trail_distance = atr * Config.EXIT_ATR_MULTIPLIER if atr else entry - levels['stop_loss']
+        fib = trade['signal'].get('fibonacci_levels') or {}
+        fib_levels = sorted(
+            list(fib.get('retracements', {}).values()) + list(fib.get('extensions', {}).values())
+        )
+        trade['exit'] = {
+            'highest': entry, 'stop': levels['stop_loss'], 'tp_hit': 0,
+            'tp_filled': 0, 'trail_distance': trail_distance, 'fib_levels': np.array(fib_levels, dtype=float),
+        }
+        return trade['exit']
+
+    def evaluate(self, prices: Dict[str, float] = None) -> Dict:
+        """Un passage : calcule les nouveaux stops de tous les trades actifs et les applique"""
+        start = time.perf_counter()
+        with self._lock:
+            trades = [t for t in self.trader.orders_history if t.get('status') == 'active']
+            self.stats['managed'] = len(trades)
+            if not trades:
+                return self.stats
+            if prices is None:
+                prices = self.trader.get_price_snapshot(sorted({t['symbol'] for t in trades}))
+            trades = [t for t in trades if t['symbol'] in prices]
+            if not trades:
+                return self.stats
+
+            states = [t.get('exit') or self._init_exit_state(t) for t in trades]
+            price = np.array([prices[t['symbol']] for t in trades], dtype=float)
+            entry = np.array([t['levels']['entry_price'] for t in trades], dtype=float)
+            stop = np.array([s['stop'] for s in states], dtype=float)
+            highest = np.maximum(np.array([s['highest'] for s in states], dtype=float), price)
+            tps = np.array([(t['levels']['take_profits'] + [np.inf] * 3)[:3] for t in trades], dtype=float)
+            tp_hit = (highest[:, None] >= tps).sum(axis=1)
+            for i, state in enumerate(states):
+                state['highest'] = float(highest[i])
+                state['tp_hit'] = int(tp_hit[i])
+
+            # Prix au stop, TP touché (nouveau plus haut ou prix au niveau) ou position soldée :
+            # les ordres concernés sont relus, l'état de l'exchange fait foi
+            flat = self._flat_symbols(trades)
+            filled_before = np.array([s.get('tp_filled', 0) for s in states])
+            checked_high = np.array([s.get('checked_high', 0.0) for s in states], dtype=float)
+            next_tp = np.append(tps, np.full((len(tps), 1), np.inf), axis=1)[np.arange(len(tps)), filled_before]
+            touched = (price <= stop) | (price >= next_tp) | ((tp_hit > filled_before) & (highest > checked_high))
+            closing = {}
+            for i, trade in enumerate(trades):
+                if touched[i] or trade['symbol'] in flat:
+                    states[i]['checked_high'] = float(highest[i])
+                    reason = self._check_orders(trade, np.inf if trade['symbol'] in flat else highest[i])
+                    if reason is None and trade['symbol'] in flat and self._position_gone(trade['symbol']):
+                        reason = 'position_closed'
+                    if reason:
+                        closing.setdefault(reason, []).append(trade)
+            for reason, closed in closing.items():
+                self._close_trades(closed, reason)
+            done = {id(t) for closed in closing.values() for t in closed}
+            tp_filled = np.array([s.get('tp_filled', 0) for s in states])
+
+            if self.mode == 'fibonacci':
+                trail = np.array([self._fib_stop(s['fib_levels'], h) for s, h in zip(states, highest)])
+            else:
+                trail = highest - np.array([s['trail_distance'] for s in states], dtype=float)
+
+            # Après l'exécution de TP1 : au moins le point mort, puis suivi ; un stop ne descend jamais
+            candidate = np.where(tp_filled >= 1, np.maximum(entry, trail), stop)
+            new_stop = np.maximum(stop, candidate)
+            moved = new_stop > stop * (1 + Config.EXIT_MIN_STOP_STEP_PERCENT / 100)
+            updates = [
+                (t, float(new_stop[i]), int(tp_filled[i])) for i, t in enumerate(trades)
+                if moved[i] and id(t) not in done
+            ]
+            if updates:
+                self._amend_stops(updates)
+
+            self.stats['passes'] += 1
+            self.stats['last_duration_ms'] = round((time.perf_counter() - start) * 1000, 2)
+            return self.stats
+
+    @staticmethod
+    def _fib_stop(levels: np.ndarray, highest: float) -> float:
+        # Niveau de Fibonacci le plus haut sous le plus haut atteint, moins une marge
+        below = levels[levels < highest * (1 - Config.EXIT_FIB_BUFFER_PERCENT / 100)]
+        return float(below[-1]) if len(below) else -np.inf
+
+    def _refresh(self, order: Dict, symbol: str) -> Dict:
+        """Relit l'état d'un ordre sur l'exchange (un état final connu n'est pas relu)"""
+        if order.get('status') not in FINAL_STATUSES:
+            current = self.trader.get_order_status(order['id'], symbol)
+            if current:
+                order.update({'status': current.get('status'), 'filled': current.get('filled')})
+        return order
+
+    def _check_orders(self, trade: Dict, highest: float) -> Optional[str]:
+        """Motif de clôture d'après les ordres du trade, None s'il reste ouvert"""
+        symbol = trade['symbol']
+        stop = trade.get('stop_loss_order')
+        if stop and self._refresh(stop, symbol).get('status') == 'closed':
+            return 'stop'
+        take_profits = trade.get('take_profit_orders', [])
+        for order in take_profits:
+            if (order.get('price') or 0) <= highest:
+                self._refresh(order, symbol)
+        filled = sum(1 for o in take_profits if o.get('status') == 'closed')
+        trade['exit']['tp_filled'] = filled
+        return 'take_profit' if take_profits and filled == len(take_profits) else None
+
+    def _flat_symbols(self, trades: List[Dict]) -> set:
+        """Symbols sans position d'après le flux privé (vide si le flux n'est pas connecté)"""
+        state = self.trader.account_state
+        if state is None or not state.is_live():
+            return set()
+        return {t['symbol'] for t in trades if state.get_position(t['symbol']) is None}
+
+    def _position_gone(self, symbol: str) -> bool:
+        """Confirme par REST une position soldée hors des ordres du trade (manuel, liquidation)"""
+        try:
+            positions = self.trader.exchange.fetch_positions([symbol])
+        except Exception as e:
+            logging.error(f"Erreur vérification de la position {symbol}: {e}")
+            return False
+        return not any((p.get('contracts') or p.get('size') or 0) and p.get('symbol') == symbol for p in positions)
+
+    def _remaining_size(self, trade: Dict, tp_filled: int) -> float:
+        state = self.trader.account_state
+        if state is not None and state.is_live():
+            position = state.get_position(trade['symbol'])
+            if position:
+                return position['size']
+        size = trade['position_info']['size']
+        return round(size - size / 3 * min(tp_filled, len(trade['take_profit_orders'])), 6)
+
+    def _amend_stops(self, updates: List[tuple]):
+        """Remplace les stops par lots : nouveaux ordres d'abord, anciens annulés ensuite"""
+        exchange = self.trader.exchange
+        has = getattr(exchange, 'has', {}) or {}
+        batch_size = Config.EXIT_BATCH_SIZE
+        for offset in range(0, len(updates), batch_size):
+            batch = updates[offset:offset + batch_size]
+            requests = [{
+                'symbol': trade['symbol'], 'type': 'stop', 'side': 'sell',
+                'amount': self._remaining_size(trade, tp_filled), 'price': None,
+                # Réduction seule : si l'ancien stop vient de partir, le nouveau ne peut pas ouvrir un short
+                'params': {'stopPrice': round(new_stop, 6), 'reduceOnly': True},
+            } for trade, new_stop, tp_filled in batch]
+            try:
+                if has.get('createOrders'):
+                    orders = exchange.create_orders(requests)
+                else:
+                    orders = [self.trader.place_stop_order(r['symbol'], 'sell', r['amount'], r['params']['stopPrice'])
+                              for r in requests]
+            except Exception as e:
+                logging.error(f"Erreur remplacement groupé des stops: {e}")
+                continue
+
+            old_ids = []
+            for (trade, new_stop, _), order in zip(batch, orders):
+                if not order:
+                    continue
+                if trade.get('stop_loss_order'):
+                    old_ids.append((trade['stop_loss_order']['id'], trade['symbol']))
+                trade['stop_loss_order'] = order
+                trade['levels']['stop_loss'] = round(new_stop, 6)
+                trade['exit']['stop'] = new_stop
+                self.stats['stops_moved'] += 1
+                self.trader.notify_trade(trade)
+                logging.info(f"Stop {trade['symbol']} déplacé à {new_stop:.6f}")
+            self._cancel(old_ids)
+
+    def _cancel(self, orders: List[tuple]):
+        if not orders:
+            return
+        exchange = self.trader.exchange
+        if (getattr(exchange, 'has', {}) or {}).get('cancelOrders'):
+            try:
+                exchange.cancel_orders([order_id for order_id, _ in orders])
+                return
+            except Exception as e:
+                logging.error(f"Erreur annulation groupée: {e}")
+        for order_id, symbol in orders:
+            self.trader.cancel_order(order_id, symbol)
+
+    def _close_trades(self, trades: List[Dict], reason: str):
+        """Clôt les trades (stop exécuté, tous les TP exécutés ou position soldée) et annule leurs ordres restants"""
+        leftovers = []
+        for trade in trades:
+            trade['status'] = 'closed'
+            trade['close_reason'] = reason
+            trade['closed_at'] = time.time()
+            orders = trade.get('take_profit_orders', []) + [trade.get('stop_loss_order')]
+            leftovers += [(o['id'], trade['symbol']) for o in orders if o and o.get('status') not in FINAL_STATUSES]
+            info = trade['position_info']
+            self.trader.risk_engine.on_close(trade['symbol'], info['value_usdt'], info['margin_required'])
+            self.stats['trades_closed'] += 1
+            self.trader.notify_trade(trade)
+            logging.info(f"Trade {trade['symbol']} clôturé ({reason})")
+        self._cancel(leftovers)
@@ -3,19 +3,116 @@ import pandas as pd
 import plotly.graph_objects as go
 import plotly.express as px
 from datetime import datetime, timedelta
-import time
-import threading
-from scanner import KuCoinScanner
+import os
+from scanner import KuCoinScanner, ScanLoop
 from trading import KuCoinTrader
+from pipeline import TradingPipeline
+from exits import ExitManager
+from state_store import StateManager
+from control_api import start_control_api
+from tables import paginate, signals_columns, trades_columns, with_pnl
+from log_setup import format_event
 from config import Config
 import logging
+from typing import Dict, List
+
+@st.cache_resource(show_spinner=False)
+def get_runtime() -> Dict:
+    """Scanner, trader et tâches de fond, partagés par toutes les sessions du serveur"""
+    scanner = KuCoinScanner()
+    trader = KuCoinTrader()
+    state_manager = None
+    if Config.STATE_ENABLED:
+        # Restauration avant tout traitement : les nouveaux événements prolongent le journal
+        state_manager = StateManager(scanner, trader)
+        state_manager.restore()
+        state_manager.start()
+    trader.start_account_stream()
+    trader.ledger.start()
+    scanner.batch_listeners.append(trader.liquidity.prefetch_signals)
+    exit_manager = ExitManager(trader, atr_provider=scanner.latest_atr)
+    if Config.EXIT_MANAGEMENT_ENABLED:
+        exit_manager.start()
+    runtime = {'scanner': scanner, 'trader': trader, 'exit_manager': exit_manager, 'state_manager': state_manager,
+               'scan_loop': ScanLoop(scanner), 'pipeline': None}
+    # API de contrôle sur le même runtime : scans et configuration pilotables sans navigateur
+    runtime['api'] = start_control_api(runtime)
+    return runtime
+
+
+@st.cache_data(ttl=Config.GUI_ACCOUNT_TTL, show_spinner=False)
+def load_account_summary(_trader) -> Dict:
+    """Solde et positions (mis en cache quelques secondes entre les rafraîchissements)"""
+    return {
+        'balance': _trader.get_account_balance().get('USDT', {}),
+        'open_positions': len(_trader.get_open_positions()),
+    }
+
+
+@st.cache_data(show_spinner=False)
+def build_signals_frame(_signals: List[Dict], version: tuple) -> pd.DataFrame:
+    """Tableau des signaux, reconstruit uniquement quand la liste change"""
+    return signals_columns(_signals)
+
+
+@st.cache_data(show_spinner=False)
+def build_trades_frame(_trades: List[Dict], version: tuple) -> pd.DataFrame:
+    """Colonnes statiques des trades, reconstruites uniquement quand l'historique change"""
+    return trades_columns(_trades)
+
+
+@st.cache_data(ttl=Config.GUI_PERFORMANCE_TTL, show_spinner=False)
+def build_performance_frame(_trader, version: tuple) -> pd.DataFrame:
+    """P&L net par trade et cumulé, lu dans le registre P&L (aucune requête de prix)"""
+    rows = _trader.ledger.trade_rows()
+    if not rows:
+        return pd.DataFrame(columns=['timestamp', 'symbol', 'pnl', 'fees', 'funding', 'cumulative_pnl'])
+    trades = pd.DataFrame(rows)
+    return pd.DataFrame({
+        'timestamp': trades['opened'],
+        'symbol': trades['symbol'],
+        'pnl': trades['net'],
+        'fees': trades['fees'],
+        'funding': trades['funding'],
+        'cumulative_pnl': trades['net'].cumsum(),
+    })
+
+
+@st.cache_data(show_spinner=False)
+def read_log_tail(path: str, mtime: float, lines: int = 20) -> str:
+    """Dernières lignes du fichier de log (relu seulement s'il a changé)"""
+    with open(path, 'r', encoding='utf-8') as f:
+        return "\n".join(format_event(line) for line in f.readlines()[-lines:])
+
 
 class TradingGUI:
-    def __init__(self):
-        self.scanner = KuCoinScanner()
-        self.trader = KuCoinTrader()
-        self.is_scanning = False
-        self.scan_thread = None
+    """Interface Streamlit ; une instance par session, conservée dans st.session_state"""
+
+    def __init__(self, runtime: Dict = None):
+        self.runtime = runtime or get_runtime()
+        self.scanner = self.runtime['scanner']
+        self.trader = self.runtime['trader']
+        self.exit_manager = self.runtime['exit_manager']
+        if Config.AUTO_TRADING and self.pipeline is None:
+            self.enable_auto_trading()
+    
+    # L'état des tâches de fond est partagé : une seule boucle de scan et un seul
+    # pipeline par serveur, quel que soit le nombre d'onglets ouverts
+    @property
+    def scan_loop(self) -> ScanLoop:
+        return self.runtime['scan_loop']
+    
+    @property
+    def is_scanning(self) -> bool:
+        return self.scan_loop.running
+    
+    @property
+    def pipeline(self):
+        return self.runtime['pipeline']
+    
+    @pipeline.setter
+    def pipeline(self, value):
+        self.runtime['pipeline'] = value
         
     def setup_page(self):
         """Configuration de la page Streamlit"""
@@ -79,17 +176,44 @@ class TradingGUI:
         if st.sidebar.button("🔄 Scan Manuel"):
             self.manual_scan()
         
-        # Statut
+        auto_trading = st.sidebar.checkbox("🤖 Trading automatique", value=self.pipeline is not None)
+        if auto_trading and self.pipeline is None:
+            self.enable_auto_trading()
+        elif not auto_trading and self.pipeline is not None:
+            self.disable_auto_trading()
+        
+        with st.sidebar:
+            self.display_runtime_status()
+    
+    @st.fragment(run_every=Config.GUI_REFRESH_INTERVAL)
+    def display_runtime_status(self):
+        """Statut du scanner, du pipeline et du risque (rafraîchi seul)"""
         status = "🟢 En cours" if self.is_scanning else "🔴 Arrêté"
-        st.sidebar.markdown(f"**Statut Scanner:** {status}")
+        st.markdown(f"**Statut Scanner:** {status}")
+        if self.pipeline is not None:
+            metrics = self.pipeline.metrics()
+            latency = metrics.get('latency_ms', {}).get('p50')
+            st.markdown(
+                f"**Pipeline:** {metrics.get('executed', 0)} exécutés, "
+                f"{metrics.get('rejected', 0)} rejetés, file {metrics['queue_depth']}"
+                + (f", latence {latency:.0f} ms" if latency is not None else "")
+            )
+        
+        risk = self.trader.risk_engine.snapshot()
+        if risk['last_sync'] is not None:
+            st.markdown(
+                f"**Risque:** marge {risk['margin_used']:.0f}/{risk['equity']:.0f} USDT, "
+                f"perte du jour {risk['daily_loss']:.2f} USDT"
+            )
     
+    @st.fragment(run_every=Config.GUI_REFRESH_INTERVAL)
     def display_account_info(self):
         """Affiche les informations du compte"""
         col1, col2, col3, col4 = st.columns(4)
         
         try:
-            balance = self.trader.get_account_balance()
-            usdt_balance = balance.get('USDT', {})
+            summary = load_account_summary(self.trader)
+            usdt_balance = summary['balance']
             
             with col1:
                 st.metric("💰 Solde USDT", f"{usdt_balance.get('free', 0):.2f}")
@@ -98,8 +222,7 @@ class TradingGUI:
                 st.metric("🔒 USDT Utilisé", f"{usdt_balance.get('used', 0):.2f}")
             
             with col3:
-                positions = self.trader.get_open_positions()
-                st.metric("📊 Positions Ouvertes", len(positions))
+                st.metric("📊 Positions Ouvertes", summary['open_positions'])
             
             with col4:
                 st.metric("📈 Trades Historique", len(self.trader.orders_history))
@@ -107,100 +230,135 @@ class TradingGUI:
         except Exception as e:
             st.error(f"Erreur récupération compte: {e}")
     
+    def history_version(self) -> tuple:
+        """Clé de cache de l'historique des trades (nouveaux trades, statuts, stops déplacés)"""
+        history = self.trader.orders_history
+        return len(history), tuple(trade.get('status') for trade in history), self.exit_manager.stats['stops_moved']
+    
+    def paginated_table(self, frame: pd.DataFrame, key: str, sort_columns: List[str],
+                        column_config: Dict = None, filters: Dict[str, List] = None, selectable: bool = False):
+        """Tableau paginé côté serveur : recherche, tri et page courante uniquement envoyés au navigateur"""
+        col1, col2, col3, col4, col5 = st.columns([3, 2, 1, 1, 1])
+        with col1:
+            search = st.text_input("🔎 Symbol", key=f"{key}_search")
+        with col2:
+            sort_by = st.selectbox("Trier par", sort_columns, key=f"{key}_sort")
+        with col3:
+            ascending = st.toggle("Croissant", value=False, key=f"{key}_asc")
+        with col4:
+            page_size = st.selectbox("Lignes", Config.GUI_PAGE_SIZES, key=f"{key}_size")
+        with col5:
+            page = st.number_input("Page", min_value=1, value=1, step=1, key=f"{key}_page")
+        
+        page_frame, total, pages = paginate(frame, page, page_size, sort_by, ascending, search, filters)
+        start = (min(page, pages) - 1) * page_size
+        st.caption(f"{start + 1 if total else 0}–{start + len(page_frame)} sur {total} (page {min(page, pages)}/{pages})")
+        event = st.dataframe(
+            page_frame, use_container_width=True, hide_index=True, column_config=column_config, key=f"{key}_table",
+            on_select='rerun' if selectable else 'ignore', selection_mode='multi-row'
+        )
+        rows = event.selection.rows if selectable else []
+        return page_frame, page_frame.iloc[rows]
+    
     def display_signals_table(self):
         """Affiche le tableau des signaux détectés"""
         st.header("📊 Signaux Détectés")
         
         if not hasattr(self.scanner, 'detected_signals') or not self.scanner.detected_signals:
-            st.info("Aucun signal détecté. Lancez un scan pour commencer.")
+            st.info("Aucun nouveau signal. Lancez un scan pour commencer.")
+            self.display_signals_history()
             return
         
-        # Convertir en DataFrame
-        signals_data = []
-        for signal in self.scanner.detected_signals:
-            signals_data.append({
-                'Timestamp': signal['timestamp'].strftime("%H:%M:%S"),
-                'Symbol': signal['symbol'],
-                'Prix': f"{signal['price']:.6f}",
-                'Volume +%': f"{signal['volume_increase']:.1f}%",
-                'EMA20': f"{signal['ema_value']:.6f}",
-                'Force': signal['signal_strength'],
-                'Action': 'pending'
-            })
-        
-        df = pd.DataFrame(signals_data)
-        
-        # Afficher le tableau avec possibilité de sélection
-        st.dataframe(
-            df,
-            use_container_width=True,
+        # Colonnes brutes mises en cache tant que la liste ne change pas ; formatage côté navigateur
+        signals = self.scanner.detected_signals
+        df = build_signals_frame(signals, tuple((s['symbol'], s['timestamp']) for s in signals))
+        strengths = st.multiselect("Force", ['FAIBLE', 'MOYENNE', 'FORTE'], key="signals_strength")
+        _, selected = self.paginated_table(
+            df.assign(index=range(len(df))), 'signals', ['score', 'detected', 'volume_increase', 'price', 'symbol'],
             column_config={
-                'Force': st.column_config.SelectboxColumn(
-                    'Force Signal',
-                    options=['FAIBLE', 'MOYENNE', 'FORTE'],
-                ),
-            }
+                'index': None,
+                'rank': st.column_config.NumberColumn('Rang', format="%d"),
+                'detected': st.column_config.DatetimeColumn('Timestamp', format="HH:mm:ss"),
+                'symbol': 'Symbol',
+                'price': st.column_config.NumberColumn('Prix', format="%.6f"),
+                'volume_increase': st.column_config.NumberColumn('Volume +%', format="%.1f%%"),
+                'ema_value': st.column_config.NumberColumn('EMA20', format="%.6f"),
+                'strength': 'Force Signal',
+                'score': st.column_config.ProgressColumn('Score', min_value=0, max_value=100, format="%.0f"),
+            },
+            filters={'strength': strengths}, selectable=True
         )
         
-        # Boutons d'action pour chaque signal
+        # Sans sélection, tous les signaux détectés sont tradés
         if st.button("🚀 Trader les Signaux Sélectionnés"):
-            self.execute_selected_signals()
+            chosen = [signals[i] for i in selected['index']] if len(selected) else None
+            self.execute_selected_signals(chosen)
+        
+        self.display_signals_history()
+    
+    def display_signals_history(self):
+        """Affiche l'historique borné des signaux (hors doublons)"""
+        history = self.scanner.signal_store.recent()
+        if not history:
+            return
+        with st.expander(f"🕘 Historique des signaux ({len(history)})", expanded=False):
+            st.dataframe(pd.DataFrame([{
+                'Détection': signal['timestamp'].strftime("%d/%m %H:%M:%S"),
+                'Bougie': str(signal.get('bar_timestamp', '')),
+                'Symbol': signal['symbol'],
+                'Prix': signal['price'],
+                'Force': signal['signal_strength'],
+            } for signal in history]), use_container_width=True)
     
+    @st.fragment(run_every=Config.GUI_REFRESH_INTERVAL)
     def display_active_trades(self):
         """Affiche les trades actifs"""
         st.header("📈 Trades Actifs")
 
-        # Vérifier que l'historique contient bien des ordres
-        if not self.trader.orders_history:
-            st.info("Aucun trade actif.")
-            return
+        history = self.trader.orders_history
+        frame = build_trades_frame(history, self.history_version())
+        frame = frame[frame['status'].str.lower().isin(['active', 'open', 'opened'])]
 
-        # Filtrer les trades actifs (en fonction de ta structure réelle : ajuste si nécessaire)
-        active_trades = [
-            trade for trade in self.trader.orders_history
-            if trade.get('status', '').lower() in ['active', 'open', 'opened']  # ajuster selon ta structure
-            ]
-
-        if not active_trades:
+        if frame.empty:
             st.info("Aucun trade actif.")
             return
 
-        for i, trade in enumerate(active_trades):
-            with st.expander(f"Trade {i+1}: {trade.get('symbol', 'N/A')}", expanded=True):
-                col1, col2, col3 = st.columns(3)
-
-                with col1:
-                    st.markdown("**Informations Trade :**")
-                    st.write(f"**Symbole**: {trade.get('symbol', 'N/A')}")
-                    st.write(f"**Entrée**: {trade['levels'].get('entry_price', 0):.6f}")
-                    st.write(f"**Taille**: {trade['position_info'].get('size', 0):.6f}")
-                    st.write(f"**Valeur**: {trade['position_info'].get('value_usdt', 0):.2f} USDT")
+        # Un seul instantané de prix met à jour le latent du registre P&L, qui fournit le P&L net
+        self.trader.get_price_snapshot(sorted(frame['symbol'].unique()))
+        frame = with_pnl(frame, {row['trade_id']: row for row in self.trader.ledger.trade_rows()})
 
-                with col2:
-                    st.markdown("**Niveaux :**")
-                    st.write(f"Stop Loss: {trade['levels'].get('stop_loss', 0):.6f}")
-                    for j, tp in enumerate(trade['levels'].get('take_profits', []), 1):
-                        st.write(f"TP{j}: {tp:.6f}")
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.metric("Trades actifs", len(frame))
+        with col2:
+            st.metric("P&L latent", f"{frame['pnl_usdt'].sum():.2f} USDT")
+        with col3:
+            st.metric("Exposition", f"{frame['value_usdt'].sum():.2f} USDT")
 
-                with col3:
-                    pnl = self.trader.calculate_pnl(trade)
-                    st.markdown("**P&L Actuel :**")
-                    if pnl:
-                        pnl_color = "green" if pnl['pnl_usdt'] >= 0 else "red"
-                        st.write(f"Prix actuel : {pnl['current_price']:.6f}")
-                        st.markdown(
-                            f"<span style='color:{pnl_color}'>"
-                            f"P&L : {pnl['pnl_usdt']:.2f} USDT ({pnl['pnl_percent']:.2f}%)"
-                            f"</span>",
-                            unsafe_allow_html=True
-                            )
-                    else:
-                        st.warning("Impossible de calculer le P&L.")
+        _, selected = self.paginated_table(
+            frame, 'trades', ['pnl_usdt', 'pnl_percent', 'opened', 'value_usdt', 'symbol'],
+            column_config={
+                'trade_id': None,
+                'opened': st.column_config.DatetimeColumn('Ouverture', format="DD/MM HH:mm:ss"),
+                'symbol': 'Symbole', 'status': 'Statut',
+                'entry': st.column_config.NumberColumn('Entrée', format="%.6f"),
+                'size': st.column_config.NumberColumn('Taille', format="%.6f"),
+                'value_usdt': st.column_config.NumberColumn('Valeur (USDT)', format="%.2f"),
+                'stop_loss': st.column_config.NumberColumn('Stop Loss', format="%.6f"),
+                'tp1': st.column_config.NumberColumn('TP1', format="%.6f"),
+                'tp2': st.column_config.NumberColumn('TP2', format="%.6f"),
+                'tp3': st.column_config.NumberColumn('TP3', format="%.6f"),
+                'price': st.column_config.NumberColumn('Prix actuel', format="%.6f"),
+                'pnl_usdt': st.column_config.NumberColumn('P&L (USDT)', format="%.2f"),
+                'pnl_percent': st.column_config.NumberColumn('P&L %', format="%.2f%%"),
+            },
+            selectable=True
+        )
 
-                # Bouton de fermeture du trade
-                if st.button(f"❌ Fermer Trade {i+1}", key=f"close_trade_{i}"):
-                    self.close_trade_manually(trade)
-                    st.success(f"Trade {trade.get('symbol')} fermé.")
+        # Fermeture des trades sélectionnés
+        if st.button("❌ Fermer les trades sélectionnés", disabled=selected.empty, key="close_selected_trades"):
+            for trade_id in selected['trade_id']:
+                self.close_trade_manually(history[int(trade_id)])
                     
     def display_performance_chart(self):
         """Affiche le graphique de performance"""
@@ -211,23 +369,11 @@ class TradingGUI:
             return
         
         # Calculer les performances
-        performance_data = []
-        cumulative_pnl = 0
-        
-        for trade in self.trader.orders_history:
-            pnl = self.trader.calculate_pnl(trade)
-            if pnl:
-                cumulative_pnl += pnl['pnl_usdt']
-                performance_data.append({
-                    'timestamp': trade['timestamp'],
-                    'symbol': trade['symbol'],
-                    'pnl': pnl['pnl_usdt'],
-                    'cumulative_pnl': cumulative_pnl
-                })
-        
-        if performance_data:
-            df_perf = pd.DataFrame(performance_data)
-            
+        df_perf = build_performance_frame(self.trader, self.history_version())
+        
+        if df_perf.empty:
+            st.info("Aucune exécution enregistrée pour l'instant : la performance s'affichera dès la première.")
+        else:
             # Graphique de performance cumulative
             fig = px.line(df_perf, x='timestamp', y='cumulative_pnl', 
                          title='Performance Cumulative (USDT)',
@@ -238,31 +384,29 @@ class TradingGUI:
             # Métriques de performance
             col1, col2, col3, col4 = st.columns(4)
             
-            total_trades = len(performance_data)
-            winning_trades = len([p for p in performance_data if p['pnl'] > 0])
+            total_trades = len(df_perf)
+            winning_trades = int((df_perf['pnl'] > 0).sum())
             win_rate = (winning_trades / total_trades * 100) if total_trades > 0 else 0
             
+            portfolio = self.trader.ledger.portfolio()
             with col1:
-                st.metric("Total P&L", f"{cumulative_pnl:.2f} USDT")
+                st.metric("Total P&L", f"{portfolio['net']:.2f} USDT")
             with col2:
                 st.metric("Total Trades", total_trades)
             with col3:
                 st.metric("Trades Gagnants", winning_trades)
             with col4:
                 st.metric("Taux de Réussite", f"{win_rate:.1f}%")
+            st.caption(f"Réalisé {portfolio['realized']:.2f} · Latent {portfolio['unrealized']:.2f} · "
+                       f"Frais {portfolio['fees']:.2f} · Funding {portfolio['funding']:+.2f} USDT")
     
     def display_logs(self):
         """Affiche les logs récents"""
         st.header("📋 Logs Récents")
         
         try:
-            with open(Config.LOG_FILE, 'r') as f:
-                logs = f.readlines()
-            
             # Afficher les 20 dernières lignes
-            recent_logs = logs[-20:]
-            
-            log_text = "".join(recent_logs)
+            log_text = read_log_tail(Config.LOG_FILE, os.path.getmtime(Config.LOG_FILE))
             st.text_area("Logs", log_text, height=200)
             
         except FileNotFoundError:
@@ -270,68 +414,63 @@ class TradingGUI:
         except Exception as e:
             st.error(f"Erreur lecture logs: {e}")
     
+    def enable_auto_trading(self):
+        """Branche le pipeline d'exécution automatique sur le scanner"""
+        self.pipeline = TradingPipeline(self.trader)
+        self.pipeline.start()
+        self.scanner.signal_listeners.append(self.pipeline.submit)
+    
+    def disable_auto_trading(self):
+        """Débranche et arrête le pipeline d'exécution automatique"""
+        if self.pipeline.submit in self.scanner.signal_listeners:
+            self.scanner.signal_listeners.remove(self.pipeline.submit)
+        self.pipeline.stop()
+        self.pipeline = None
+    
     def start_scanning(self):
         """Démarre le scanner en arrière-plan"""
-        if not self.is_scanning:
-            self.is_scanning = True
-            self.scan_thread = threading.Thread(target=self.scanning_loop, daemon=True)
-            self.scan_thread.start()
+        if self.scan_loop.start():
             st.success("Scanner démarré!")
     
     def stop_scanning(self):
         """Arrête le scanner"""
-        self.is_scanning = False
+        self.scan_loop.stop()
         st.success("Scanner arrêté!")
     
-    def scanning_loop(self):
-        """Boucle principale du scanner"""
-        while self.is_scanning:
-            try:
-                # Vérifier les nouveaux listings
-                new_listings = self.scanner.get_new_listings()
-                if new_listings:
-                    logging.info(f"Nouveaux listings: {new_listings}")
-                
-                # Scanner tous les symbols
-                signals = self.scanner.scan_all_symbols()
-                
-                # Attendre avant le prochain scan
-                time.sleep(Config.SCAN_INTERVAL)
-                
-            except Exception as e:
-                logging.error(f"Erreur dans la boucle de scan: {e}")
-                time.sleep(30)  # Pause en cas d'erreur
-    
     def manual_scan(self):
         """Lance un scan manuel"""
         with st.spinner("Scan en cours..."):
             try:
-                signals = self.scanner.scan_all_symbols()
+                signals = self.scan_loop.run_once()
                 st.success(f"Scan terminé! {len(signals)} signaux détectés.")
                 st.rerun()
             except Exception as e:
                 st.error(f"Erreur lors du scan: {e}")
     
-    def execute_selected_signals(self):
-        """Exécute les signaux sélectionnés"""
-        if not self.scanner.detected_signals:
+    def execute_selected_signals(self, signals: List[Dict] = None):
+        """Exécute les signaux sélectionnés (tous les signaux détectés par défaut)"""
+        signals = signals or self.scanner.detected_signals
+        if not signals:
             st.warning("Aucun signal à exécuter.")
             return
         
         success_count = 0
+        # Carnets d'ordres du lot récupérés en parallèle avant l'exécution
+        if Config.LIQUIDITY_FILTER_ENABLED:
+            self.trader.liquidity.prefetch([signal['symbol'] for signal in signals])
         
-        for signal in self.scanner.detected_signals:
+        for signal in signals:
             try:
                 result = self.trader.execute_signal(signal, Config.DEFAULT_POSITION_SIZE)
                 if result['success']:
                     success_count += 1
-                    st.success(f"Trade exécuté pour {signal['symbol']}")
+                    st.success(result['message'])
                 else:
                     st.error(f"Erreur trade {signal['symbol']}: {result['error']}")
             except Exception as e:
                 st.error(f"Erreur exécution {signal['symbol']}: {e}")
         
-        st.info(f"{success_count} trades exécutés avec succès sur {len(self.scanner.detected_signals)} signaux.")
+        st.info(f"{success_count} trades exécutés avec succès sur {len(signals)} signaux.")
     
     def close_trade_manually(self, trade):
         """Ferme un trade manuellement"""
@@ -353,6 +492,7 @@ class TradingGUI:
                 # Marquer le trade comme fermé
                 trade['status'] = 'closed_manually'
                 trade['close_order'] = order
+                self.trader.notify_trade(trade)
                 
                 st.success(f"Trade fermé manuellement pour {symbol}")
             else:
@@ -379,24 +519,7 @@ class TradingGUI:
             st.header("📊 Dashboard")
             self.display_account_info()
             
-            # Statistiques rapides
-            col1, col2 = st.columns(2)
-            
-            with col1:
-                st.subheader("📈 Marchés Surveillés")
-                if hasattr(self.scanner, 'futures_symbols'):
-                    st.metric("Symbols avec Futures", len(self.scanner.futures_symbols))
-                else:
-                    st.metric("Symbols avec Futures", "Chargement...")
-            
-            with col2:
-                st.subheader("🔍 Dernière Activité")
-                if hasattr(self.scanner, 'detected_signals'):
-                    last_scan = max([s['timestamp'] for s in self.scanner.detected_signals]) if self.scanner.detected_signals else None
-                    if last_scan:
-                        st.write(f"Dernier signal: {last_scan.strftime('%H:%M:%S')}")
-                    else:
-                        st.write("Aucun signal récent")
+            self.display_dashboard_activity()
         
         with tab2:
             self.display_signals_table()
@@ -409,15 +532,37 @@ class TradingGUI:
         
         with tab5:
             self.display_logs()
+    
+    @st.fragment(run_every=Config.GUI_REFRESH_INTERVAL)
+    def display_dashboard_activity(self):
+        """Statistiques rapides du dashboard (rafraîchies seules)"""
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            st.subheader("📈 Marchés Surveillés")
+            if hasattr(self.scanner, 'futures_symbols'):
+                st.metric("Symbols avec Futures", len(self.scanner.futures_symbols))
+            else:
+                st.metric("Symbols avec Futures", "Chargement...")
         
-        # Auto-refresh toutes les 30 secondes si le scanner est actif
-        if self.is_scanning:
-            time.sleep(30)
-            st.rerun()
+        with col2:
+            st.subheader("🔍 Dernière Activité")
+            if hasattr(self.scanner, 'detected_signals'):
+                last_scan = max([s['timestamp'] for s in self.scanner.detected_signals]) if self.scanner.detected_signals else None
+                if last_scan:
+                    st.write(f"Dernier signal: {last_scan.strftime('%H:%M:%S')}")
+                else:
+                    st.write("Aucun signal récent")
+
+def get_gui() -> TradingGUI:
+    """Instance de l'interface de la session courante (créée au premier affichage)"""
+    if 'gui' not in st.session_state:
+        st.session_state.gui = TradingGUI()
+    return st.session_state.gui
 
 def main():
     """Fonction principale"""
-    gui = TradingGUI()
+    gui = get_gui()
     gui.run()
 
 if __name__ == "__main__":
@@ -0,0 +1,114 @@
+import numpy as np
+import pandas as pd
+import talib
+import threading
+from typing import Callable, Dict, Optional
+
+# Registre des indicateurs disponibles : nom -> fonction(data, **params) -> np.ndarray
+INDICATORS: Dict[str, Callable] = {}
+
+
+def register_indicator(name: str):
+    """Décorateur d'enregistrement d'un indicateur dans le registre"""
+    def decorator(func: Callable) -> Callable:
+        INDICATORS[name] = func
+        return func
+    return decorator
+
+
+@register_indicator('ema')
+def ema(data: pd.DataFrame, period: int = 20) -> np.ndarray:
+    """Moyenne mobile exponentielle des clôtures"""
+    return talib.EMA(data['close'].values.astype(float), timeperiod=period)
+
+
+@register_indicator('rsi')
+def rsi(data: pd.DataFrame, period: int = 14) -> np.ndarray:
+    """Relative Strength Index"""
+    return talib.RSI(data['close'].values.astype(float), timeperiod=period)
+
+
+@register_indicator('atr')
+def atr(data: pd.DataFrame, period: int = 14) -> np.ndarray:
+    """Average True Range"""
+    return talib.ATR(
+        data['high'].values.astype(float),
+        data['low'].values.astype(float),
+        data['close'].values.astype(float),
+        timeperiod=period
+    )
+
+
+@register_indicator('vwap')
+def vwap(data: pd.DataFrame, window: int = 20) -> np.ndarray:
+    """VWAP glissant sur `window` bougies (prix typique pondéré par le volume)"""
+    typical = (data['high'].values + data['low'].values + data['close'].values) / 3
+    volume = data['volume'].values.astype(float)
+    pv = np.convolve(typical * volume, np.ones(window), 'full')[:len(volume)]
+    vol = np.convolve(volume, np.ones(window), 'full')[:len(volume)]
+    result = np.divide(pv, vol, out=np.full(len(volume), np.nan), where=vol > 0)
+    result[:window - 1] = np.nan
+    return result
+
+
+@register_indicator('volume_zscore')
+def volume_zscore(data: pd.DataFrame, window: int = 20) -> np.ndarray:
+    """Z-score du volume par rapport aux `window` bougies précédentes"""
+    volume = data['volume'].astype(float)
+    previous = volume.shift(1).rolling(window)
+    std = previous.std()
+    return ((volume - previous.mean()) / std.where(std > 0)).values
+
+
+class IndicatorCache:
+    """Cache mémo des séries calculées, par (symbol, timeframe, indicateur, paramètres).
+
+    Une entrée est valide tant que la dernière bougie (timestamp, clôture,
+    volume) est inchangée ; une nouvelle bougie remplace l'entrée, ce qui
+    borne le cache à une série par combinaison.
+    """
+
+    def __init__(self):
+        self._entries: Dict[tuple, tuple] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _bar_key(data: pd.DataFrame) -> tuple:
+        last = data.iloc[-1]
+        return (data.index[-1], len(data), float(last['close']), float(last['volume']))
+
+    def get(self, symbol: str, timeframe: str, name: str, data: pd.DataFrame, **params) -> np.ndarray:
+        """Retourne la série d'un indicateur, calculée au plus une fois par bougie"""
+        key = (symbol, timeframe, name, tuple(sorted(params.items())))
+        bar_key = self._bar_key(data)
+        with self._lock:
+            cached = self._entries.get(key)
+            if cached is not None and cached[0] == bar_key:
+                self.hits += 1
+                return cached[1]
+        values = INDICATORS[name](data, **params)
+        with self._lock:
+            self._entries[key] = (bar_key, values)
+            self.misses += 1
+        return values
+
+    def invalidate(self, symbol: Optional[str] = None):
+        """Supprime les entrées d'un symbol ou tout le cache"""
+        with self._lock:
+            if symbol is None:
+                self._entries.clear()
+                return
+            for key in [k for k in self._entries if k[0] == symbol]:
+                del self._entries[key]
+
+    def stats(self) -> Dict:
+        """Statistiques du cache"""
+        total = self.hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / total * 100, 1) if total else 0.0
+        }
@@ -0,0 +1,332 @@
+import logging
+import threading
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+from config import Config
+
+
+def new_book(symbol: str, multiplier: float = 1.0) -> Dict:
+    """Compte P&L vide d'un trade ou d'un symbol"""
+    return {'symbol': symbol, 'multiplier': multiplier, 'qty': 0.0, 'avg_price': 0.0, 'realized': 0.0,
+            'unrealized': 0.0, 'fees': 0.0, 'funding': 0.0, 'volume': 0.0, 'fills': 0}
+
+
+def apply_fill(book: Dict, side: str, price: float, amount: float, fee: float) -> float:
+    """Applique une exécution à un compte (prix moyen pondéré) ; retourne le P&L réalisé"""
+    signed = amount if side == 'buy' else -amount
+    qty = book['qty']
+    realized = 0.0
+    if qty and (qty > 0) != (signed > 0):
+        closed = min(amount, abs(qty))
+        realized = closed * (price - book['avg_price']) * book['multiplier'] * (1 if qty > 0 else -1)
+        if amount > abs(qty):
+            book['avg_price'] = price  # Position retournée
+    else:
+        book['avg_price'] = (book['avg_price'] * abs(qty) + price * amount) / (abs(qty) + amount)
+    book['qty'] = qty + signed if abs(qty + signed) > 1e-12 else 0.0
+    book['realized'] += realized
+    book['fees'] += fee
+    book['volume'] += price * amount * book['multiplier']
+    book['fills'] += 1
+    return realized
+
+
+def summarize_book(book: Dict, mark: Optional[float] = None) -> Dict:
+    """P&L d'un compte : réalisé, latent, frais, funding et net"""
+    net = book['realized'] + book['unrealized'] - book['fees'] + book['funding']
+    return {
+        'symbol': book['symbol'], 'qty': book['qty'], 'avg_price': book['avg_price'], 'mark': mark,
+        'realized': round(book['realized'], 6), 'unrealized': round(book['unrealized'], 6),
+        'fees': round(book['fees'], 6), 'funding': round(book['funding'], 6), 'net': round(net, 6),
+        'fills': book['fills'],
+    }
+
+
+def _timestamp_ms(value) -> Optional[int]:
+    if isinstance(value, datetime):
+        return int(value.timestamp() * 1000)
+    return int(value) if value else None
+
+
+class PnLLedger:
+    """Comptabilité P&L incrémentale à partir des exécutions et du funding.
+
+    Chaque exécution (entrée, TP partiels, stop, clôture manuelle) et chaque
+    paiement de funding n'est consommé qu'une fois (dédoublonnage par id).
+    Il met à jour le compte de son symbol et, via l'id d'ordre, celui de son
+    trade : prix moyen, P&L réalisé avec multiplicateur de contrat, frais
+    réels et funding. Un nouveau prix de marque ne recalcule que les comptes
+    du symbol ; les totaux du portefeuille sont tenus à jour à chaque
+    événement et se lisent en O(1).
+    """
+
+    def __init__(self, exchange, price_source: Callable[[List[str]], Dict] = None, interval: float = None):
+        self.exchange = exchange
+        self.price_source = price_source
+        self.interval = interval or Config.LEDGER_POLL_INTERVAL
+        self._lock = threading.RLock()
+        self._stop = threading.Event()
+        self._thread = None
+        self.trades: Dict[int, Dict] = {}
+        self.symbols: Dict[str, Dict] = {}
+        self.marks: Dict[str, float] = {}
+        self.totals = {'realized': 0.0, 'unrealized': 0.0, 'fees': 0.0, 'funding': 0.0}
+        self._order_trade: Dict[str, int] = {}  # id d'ordre -> trade
+        self._pending: Dict[str, List[Dict]] = {}  # Exécutions d'ordres pas encore rattachés à un trade
+        self._open: Dict[str, set] = {}  # symbol -> trades avec une position ouverte
+        self._funding_symbols = set()  # Symbols exposés depuis la dernière lecture du funding
+        self._seen: Dict[str, int] = {}  # id d'exécution ou de funding -> horodatage
+        now = exchange.milliseconds() if exchange else int(time.time() * 1000)
+        self.since = now
+        self.funding_since = now
+        self._last_funding_poll = 0.0
+        self.stats = {'fills': 0, 'duplicates': 0, 'unassigned': 0, 'funding_events': 0, 'polls': 0,
+                      'last_poll_ms': 0.0}
+
+    def _multiplier(self, symbol: str) -> float:
+        market = (getattr(self.exchange, 'markets', None) or {}).get(symbol) or {}
+        return float(market.get('contractSize') or 1.0)
+
+    def _symbol_book(self, symbol: str) -> Dict:
+        book = self.symbols.get(symbol)
+        if book is None:
+            book = self.symbols[symbol] = new_book(symbol, self._multiplier(symbol))
+        return book
+
+    def _remark(self, book: Dict) -> float:
+        """Recalcule le latent d'un compte au dernier prix de marque ; retourne la variation"""
+        mark = self.marks.get(book['symbol'])
+        value = (mark - book['avg_price']) * book['qty'] * book['multiplier'] if mark and book['qty'] else 0.0
+        delta = value - book['unrealized']
+        book['unrealized'] = value
+        return delta
+
+    def _fee(self, fill: Dict, symbol: str, price: float, amount: float) -> float:
+        fee = fill.get('fee') or {}
+        if fee.get('cost') is not None:
+            return float(fee['cost'])
+        # Sans frais dans la réponse : taux du marché selon le rôle de l'ordre
+        market = (getattr(self.exchange, 'markets', None) or {}).get(symbol) or {}
+        role = 'maker' if fill.get('takerOrMaker') == 'maker' else 'taker'
+        rate = market.get(role) or market.get('fees', {}).get(role) or 0.0
+        return price * amount * self._multiplier(symbol) * rate
+
+    def _apply_trade(self, trade_id: int, entry: Dict):
+        book = self.trades[trade_id]
+        apply_fill(book, entry['side'], entry['price'], entry['amount'], entry['fee'])
+        self._remark(book)
+        symbol = book['symbol']
+        if book['qty']:
+            self._open.setdefault(symbol, set()).add(trade_id)
+        else:
+            self._open.get(symbol, set()).discard(trade_id)
+
+    def register(self, trade: Dict, backfill: bool = False):
+        """Abonné de trade du trader : rattache les ordres du trade à son compte"""
+        trade_id = trade.get('trade_id')
+        if trade_id is None:
+            return
+        order_ids = [o['id'] for o in [trade.get('entry_order'), trade.get('stop_loss_order'),
+                                       trade.get('close_order')] + list(trade.get('take_profit_orders', [])) if o]
+        order_ids += (trade.get('entry_order') or {}).get('child_order_ids', [])
+        with self._lock:
+            book = self.trades.get(trade_id)
+            if book is None:
+                book = self.trades[trade_id] = new_book(trade['symbol'], self._multiplier(trade['symbol']))
+                book['opened'] = trade.get('timestamp')
+                # Trade restauré sans compte : ses exécutions passées sont relues depuis son ouverture
+                opened = _timestamp_ms(trade.get('timestamp'))
+                if backfill and opened:
+                    self.since = min(self.since, opened)
+                    self.funding_since = min(self.funding_since, opened)
+            book['status'] = trade.get('status')
+            book['value_usdt'] = trade.get('position_info', {}).get('value_usdt')
+            for order_id in order_ids:
+                # Un ordre reste attribué au premier trade qui l'a déclaré (les anciens stops aussi)
+                if self._order_trade.setdefault(order_id, trade_id) == trade_id:
+                    for entry in self._pending.pop(order_id, []):
+                        self._apply_trade(trade_id, entry)
+
+    def on_fill(self, fill: Dict) -> bool:
+        """Consomme une exécution (format ccxt) ; False si elle a déjà été comptée"""
+        key = str(fill.get('id') or (fill.get('order'), fill.get('timestamp'), fill.get('price'), fill.get('amount')))
+        symbol = fill['symbol']
+        price, amount = float(fill.get('price') or 0.0), float(fill.get('amount') or 0.0)
+        with self._lock:
+            if key in self._seen:
+                self.stats['duplicates'] += 1
+                return False
+            self._seen[key] = fill.get('timestamp') or 0
+            if price <= 0 or amount <= 0:
+                return False
+            entry = {'side': fill['side'], 'price': price, 'amount': amount,
+                     'fee': self._fee(fill, symbol, price, amount)}
+            book = self._symbol_book(symbol)
+            self.totals['realized'] += apply_fill(book, entry['side'], price, amount, entry['fee'])
+            self.totals['fees'] += entry['fee']
+            self.totals['unrealized'] += self._remark(book)
+            if book['qty']:
+                self._funding_symbols.add(symbol)
+            trade_id = self._order_trade.get(fill.get('order'))
+            if trade_id is None:
+                self._pending.setdefault(fill.get('order'), []).append(entry)
+                self.stats['unassigned'] += 1
+            else:
+                self._apply_trade(trade_id, entry)
+            self.stats['fills'] += 1
+        return True
+
+    def on_funding(self, event: Dict) -> bool:
+        """Consomme un paiement de funding (positif = reçu), réparti sur les trades ouverts du symbol"""
+        symbol = event['symbol']
+        key = 'funding:' + str(event.get('id') or (symbol, event.get('timestamp')))
+        amount = float(event.get('amount') or 0.0)
+        with self._lock:
+            if key in self._seen:
+                self.stats['duplicates'] += 1
+                return False
+            self._seen[key] = event.get('timestamp') or 0
+            self._symbol_book(symbol)['funding'] += amount
+            self.totals['funding'] += amount
+            open_trades = [self.trades[i] for i in self._open.get(symbol, ())]
+            exposure = sum(abs(book['qty']) for book in open_trades)
+            for book in open_trades:
+                book['funding'] += amount * abs(book['qty']) / exposure
+            self.stats['funding_events'] += 1
+        return True
+
+    def mark_prices(self, prices: Dict[str, float]):
+        """Nouveaux prix de marque : seul le latent des comptes de ces symbols est recalculé"""
+        with self._lock:
+            for symbol, price in prices.items():
+                if not price:
+                    continue
+                self.marks[symbol] = price
+                if symbol in self.symbols:
+                    self.totals['unrealized'] += self._remark(self.symbols[symbol])
+                for trade_id in self._open.get(symbol, ()):
+                    self._remark(self.trades[trade_id])
+
+    def portfolio(self) -> Dict:
+        """P&L du portefeuille (totaux tenus à jour à chaque événement)"""
+        with self._lock:
+            totals = dict(self.totals)
+        totals['net'] = totals['realized'] + totals['unrealized'] - totals['fees'] + totals['funding']
+        return {key: round(value, 6) for key, value in totals.items()}
+
+    def trade_pnl(self, trade_id: int) -> Optional[Dict]:
+        with self._lock:
+            book = self.trades.get(trade_id)
+            return summarize_book(book, self.marks.get(book['symbol'])) if book else None
+
+    def symbol_pnl(self, symbol: str) -> Optional[Dict]:
+        with self._lock:
+            book = self.symbols.get(symbol)
+            return summarize_book(book, self.marks.get(symbol)) if book else None
+
+    def trade_rows(self) -> List[Dict]:
+        """P&L de chaque trade ayant au moins une exécution, par ordre d'ouverture"""
+        with self._lock:
+            rows = [{'trade_id': trade_id, 'opened': book.get('opened'), 'status': book.get('status'),
+                     'value_usdt': book.get('value_usdt'), **summarize_book(book, self.marks.get(book['symbol']))}
+                    for trade_id, book in self.trades.items() if book['fills']]
+        return sorted(rows, key=lambda row: row['trade_id'])
+
+    def poll(self) -> int:
+        """Lit les nouvelles exécutions (et le funding, moins souvent) ; retourne le nombre d'événements comptés"""
+        start = time.perf_counter()
+        count = 0
+        since = initial = self.since
+        now = self.exchange.milliseconds()
+        window = Config.LEDGER_FILLS_WINDOW * 1000
+        while True:
+            fills = self.exchange.fetch_my_trades(since=since, limit=Config.LEDGER_PAGE_SIZE)
+            count += sum(self.on_fill(fill) for fill in fills)
+            latest = max([since] + [fill['timestamp'] for fill in fills if fill.get('timestamp')])
+            if len(fills) >= Config.LEDGER_PAGE_SIZE and latest > since:
+                since = latest  # Page pleine : suite à partir de la dernière exécution lue
+                continue
+            # Page incomplète (ou pleine au même horodatage) : la fenêtre de la requête est lue en entier.
+            # Le curseur passe à la dernière exécution (les suivantes au même horodatage sont dédoublonnées),
+            # ou à la fin de la fenêtre si elle n'atteint pas encore le présent.
+            if since + window >= now:
+                since = latest
+                break
+            since = max(latest, since + window)
+
+        if time.time() - self._last_funding_poll >= Config.LEDGER_FUNDING_INTERVAL:
+            self._last_funding_poll = time.time()
+            with self._lock:
+                symbols = sorted(self._funding_symbols)
+                self._funding_symbols = {s for s, book in self.symbols.items() if book['qty']}
+            funding_since = self.funding_since
+            for symbol in symbols:
+                # KuCoin Futures ne donne l'historique de funding que par symbol
+                for event in self.exchange.fetch_funding_history(symbol, since=self.funding_since):
+                    count += self.on_funding(event)
+                    funding_since = max(funding_since, event.get('timestamp') or 0)
+            self.funding_since = funding_since
+
+        with self._lock:
+            if self.since == initial:  # Sinon reculé entre-temps par une restauration
+                self.since = since
+            # Les identifiants antérieurs à leur curseur (exécutions ou funding) ne peuvent plus être relus
+            self._seen = {key: ts for key, ts in self._seen.items()
+                          if ts >= (self.funding_since if key.startswith('funding:') else self.since)}
+            open_symbols = sorted(s for s, book in self.symbols.items() if book['qty'])
+        if self.price_source and open_symbols:
+            self.price_source(open_symbols)  # Le trader transmet chaque instantané de prix au registre
+        self.stats['polls'] += 1
+        self.stats['last_poll_ms'] = round((time.perf_counter() - start) * 1000, 1)
+        return count
+
+    def export(self) -> Dict:
+        """État complet du registre (pour l'instantané d'état)"""
+        with self._lock:
+            return {
+                'trades': {trade_id: dict(book) for trade_id, book in self.trades.items()},
+                'symbols': {symbol: dict(book) for symbol, book in self.symbols.items()},
+                'marks': dict(self.marks), 'totals': dict(self.totals),
+                'order_trade': dict(self._order_trade),
+                'pending': {order_id: list(entries) for order_id, entries in self._pending.items()},
+                'open': {symbol: set(ids) for symbol, ids in self._open.items()},
+                'seen': dict(self._seen), 'since': self.since, 'funding_since': self.funding_since,
+            }
+
+    def restore(self, state: Dict):
+        """Reprend un état exporté ; les exécutions postérieures sont relues au prochain passage"""
+        if not state:
+            return
+        with self._lock:
+            self.trades = state['trades']
+            self.symbols = state['symbols']
+            self.marks = state['marks']
+            self.totals = state['totals']
+            self._order_trade = state['order_trade']
+            self._pending = state['pending']
+            self._open = state['open']
+            self._seen = state['seen']
+            self.since = state['since']
+            self.funding_since = state['funding_since']
+            self._funding_symbols = {s for s, book in self.symbols.items() if book['qty']}
+
+    def start(self):
+        """Lance la lecture périodique des exécutions en arrière-plan"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True, name="pnl-ledger")
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=self.interval)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.poll()
+            except Exception as e:
+                logging.error(f"Erreur lecture des exécutions pour le P&L: {e}")
@@ -0,0 +1,139 @@
+import logging
+import threading
+import time
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Dict, List, Optional
+from config import Config
+
+
+def estimate_fill(levels: List[list], amount: float) -> Dict:
+    """Prix moyen d'exécution d'une quantité en parcourant un côté du carnet"""
+    book = np.asarray(levels, dtype=float).reshape(-1, 2)
+    prices, sizes = book[:, 0], book[:, 1]
+    filled = np.minimum(sizes, np.maximum(amount - np.concatenate([[0.0], np.cumsum(sizes)[:-1]]), 0))
+    total = filled.sum()
+    return {
+        'filled': float(total),
+        'average_price': float((prices * filled).sum() / total) if total > 0 else None,
+        'levels_used': int((filled > 0).sum()),
+    }
+
+
+def max_amount_within(levels: List[list], reference: float, max_slippage_percent: float, side: str) -> float:
+    """Plus grande quantité dont le prix moyen reste dans la limite de slippage"""
+    book = np.asarray(levels, dtype=float).reshape(-1, 2)
+    if not len(book):
+        return 0.0
+    prices, sizes = book[:, 0], book[:, 1]
+    limit = reference * (1 + max_slippage_percent / 100) if side == 'buy' else reference * (1 - max_slippage_percent / 100)
+    cumulative_size = np.cumsum(sizes)
+    cumulative_cost = np.cumsum(prices * sizes)
+    average = cumulative_cost / cumulative_size
+    within = average <= limit if side == 'buy' else average >= limit
+    if within.all():
+        return float(cumulative_size[-1])
+    k = int(np.argmin(within))  # Premier niveau qui ferait dépasser la limite
+    size_before = cumulative_size[k - 1] if k else 0.0
+    cost_before = cumulative_cost[k - 1] if k else 0.0
+    # Quantité partielle x au niveau k telle que (coût + p.x) / (taille + x) = limite
+    partial = (limit * size_before - cost_before) / (prices[k] - limit) if prices[k] != limit else 0.0
+    return float(size_before + max(0.0, min(partial, sizes[k])))
+
+
+class LiquidityGuard:
+    """Contrôle pré-trade de la profondeur du carnet.
+
+    Les carnets des candidats sont récupérés en parallèle par lots et gardés
+    quelques secondes ; un lot n'attend jamais plus de
+    LIQUIDITY_BATCH_TIMEOUT (les réponses tardives alimentent quand même le
+    cache). Pour chaque ordre, le slippage est estimé en parcourant le carnet :
+    la taille est réduite pour rester sous la limite, ou le trade abandonné si
+    la part exécutable est trop faible.
+    """
+
+    def __init__(self, exchange, governor=None, ttl: float = None, depth: int = None):
+        self.exchange = exchange
+        self.governor = governor
+        self.ttl = ttl if ttl is not None else Config.LIQUIDITY_CACHE_TTL
+        self.depth = depth or Config.LIQUIDITY_BOOK_DEPTH
+        self._books: Dict[str, tuple] = {}  # symbol -> (instant de récupération, carnet)
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=Config.LIQUIDITY_WORKERS, thread_name_prefix="orderbook")
+        self.stats = {'fetched': 0, 'cache_hits': 0, 'timeouts': 0, 'capped': 0, 'skipped': 0,
+                      'last_batch_ms': 0.0}
+
+    def _fetch(self, symbol: str) -> Optional[Dict]:
+        try:
+            if self.governor:
+                book = self.governor.call(self.exchange.fetch_order_book, symbol, self.depth)
+            else:
+                book = self.exchange.fetch_order_book(symbol, self.depth)
+        except Exception as e:
+            logging.warning(f"Carnet d'ordres indisponible pour {symbol}: {e}")
+            return None
+        with self._lock:
+            self._books[symbol] = (time.time(), book)
+            self.stats['fetched'] += 1
+        return book
+
+    def _cached(self, symbol: str) -> Optional[Dict]:
+        with self._lock:
+            entry = self._books.get(symbol)
+        if entry and time.time() - entry[0] < self.ttl:
+            return entry[1]
+        return None
+
+    def prefetch(self, symbols: List[str]) -> Dict[str, Dict]:
+        """Récupère en parallèle les carnets manquants d'un lot de symbols (attente bornée)"""
+        start = time.perf_counter()
+        books = {s: self._cached(s) for s in dict.fromkeys(symbols)}
+        missing = [s for s, book in books.items() if book is None]
+        self.stats['cache_hits'] += len(books) - len(missing)
+        if missing:
+            futures = {self._pool.submit(self._fetch, s): s for s in missing}
+            done, pending = wait(futures, timeout=Config.LIQUIDITY_BATCH_TIMEOUT)
+            self.stats['timeouts'] += len(pending)
+            for future in done:
+                books[futures[future]] = future.result()
+        self.stats['last_batch_ms'] = round((time.perf_counter() - start) * 1000, 1)
+        return {s: book for s, book in books.items() if book}
+
+    def prefetch_signals(self, signals: List[Dict]):
+        """Abonné de lot du scanner : précharge les carnets des meilleurs candidats"""
+        if Config.LIQUIDITY_FILTER_ENABLED and signals:
+            self.prefetch([s['symbol'] for s in signals[:Config.RANKING_TOP_K]])
+
+    def assess(self, symbol: str, side: str, amount: float) -> Dict:
+        """Slippage estimé et quantité autorisée pour un ordre au marché"""
+        book = self._cached(symbol)
+        if book is None:
+            book = self._fetch(symbol)
+        else:
+            self.stats['cache_hits'] += 1
+        if not book or not book.get('bids') or not book.get('asks'):
+            # Sans carnet, l'ordre n'est pas bloqué : le contrôle est une protection, pas une dépendance
+            return {'allowed': True, 'amount': amount, 'slippage_percent': None, 'reason': 'carnet indisponible'}
+        levels = book['asks'] if side == 'buy' else book['bids']
+        mid = (book['bids'][0][0] + book['asks'][0][0]) / 2
+        fill = estimate_fill(levels, amount)
+        slippage = abs(fill['average_price'] / mid - 1) * 100 if fill['average_price'] else None
+        limit = Config.LIQUIDITY_MAX_SLIPPAGE_PERCENT
+        result = {'allowed': True, 'amount': amount, 'slippage_percent': slippage,
+                  'spread_percent': (book['asks'][0][0] / book['bids'][0][0] - 1) * 100, 'reason': None}
+        if fill['filled'] >= amount and slippage is not None and slippage <= limit:
+            return result
+
+        cause = (f"slippage estimé {slippage:.2f}% > {limit}%" if fill['filled'] >= amount
+                 else f"carnet trop peu profond (il couvre {fill['filled'] / amount:.0%} de la taille)")
+        capped = min(amount, max_amount_within(levels, mid, limit, side))
+        if capped < amount * Config.LIQUIDITY_MIN_FILL_RATIO:
+            self.stats['skipped'] += 1
+            result.update({'allowed': False, 'amount': 0.0,
+                           'reason': f"{cause}, seulement {capped / amount:.0%} exécutable"})
+            return result
+        self.stats['capped'] += 1
+        capped_fill = estimate_fill(levels, capped)
+        result.update({'amount': capped, 'slippage_percent': abs(capped_fill['average_price'] / mid - 1) * 100,
+                       'reason': f"taille réduite à {capped / amount:.0%} ({cause})"})
+        return result
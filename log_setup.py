@@ -0,0 +1,136 @@
+import atexit
+import itertools
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import threading
+from datetime import datetime, timezone
+from typing import Dict, Optional
+from config import Config
+
+# Attributs standard d'un LogRecord : tout le reste provient de `extra=` et part dans l'événement JSON
+_RECORD_FIELDS = set(vars(logging.LogRecord('', 0, '', 0, '', None, None))) | {'message', 'asctime'}
+CONSOLE_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+_lock = threading.Lock()
+_listener: Optional[logging.handlers.QueueListener] = None
+_configured_pid: Optional[int] = None
+
+
+class JsonFormatter(logging.Formatter):
+    """Un événement JSON par ligne : horodatage, niveau, module, message et champs `extra`"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        event = {
+            'ts': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'module': record.module,
+            'thread': record.threadName,
+            'msg': record.getMessage(),
+        }
+        if record.process != _configured_pid:
+            event['pid'] = record.process
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_FIELDS and not key.startswith('_'):
+                event[key] = value
+        if record.exc_info:
+            event['exc'] = self.formatException(record.exc_info)
+        return json.dumps(event, ensure_ascii=False, default=str)
+
+
+class SamplingFilter(logging.Filter):
+    """Ne conserve qu'un message DEBUG sur N pour les modules bavards (Config.LOG_SAMPLING)"""
+
+    def __init__(self, rates: Dict[str, int]):
+        super().__init__()
+        self.rates = {module: rate for module, rate in rates.items() if rate > 1}
+        self._counters = {module: itertools.count() for module in self.rates}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > logging.DEBUG or record.module not in self._counters:
+            return True
+        return next(self._counters[record.module]) % self.rates[record.module] == 0
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler qui n'attend jamais : si la file est pleine, le message est abandonné et compté"""
+
+    dropped = 0
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            DroppingQueueHandler.dropped += 1
+
+
+def _file_handler() -> logging.Handler:
+    if _configured_pid is None or _configured_pid == os.getpid():
+        return logging.handlers.RotatingFileHandler(
+            Config.LOG_FILE, maxBytes=Config.LOG_MAX_BYTES, backupCount=Config.LOG_BACKUP_COUNT, encoding='utf-8')
+    # Processus fils (shards) : la rotation reste au processus principal, le fichier est rouvert après rotation
+    return logging.handlers.WatchedFileHandler(Config.LOG_FILE, encoding='utf-8')
+
+
+def setup_logging(force: bool = False) -> bool:
+    """Configure le logging global : file non bloquante, écriture par un thread dédié.
+
+    Les appelants (scan, exécution) ne font que déposer l'enregistrement dans
+    une file ; le fichier JSON avec rotation et la console sont alimentés par
+    un QueueListener. Sans effet si le logging est déjà configuré dans ce
+    processus, sauf `force=True`.
+    """
+    global _listener, _configured_pid
+    with _lock:
+        root = logging.getLogger()
+        inherited = _configured_pid is not None and _configured_pid != os.getpid()
+        if root.handlers and not force and not inherited:
+            return False
+        if _listener is not None and not inherited:
+            _listener.stop()
+        for handler in list(root.handlers):
+            root.removeHandler(handler)
+
+        file_handler = _file_handler()
+        file_handler.setFormatter(JsonFormatter())
+        console_handler = logging.StreamHandler(sys.stdout)
+        console_handler.setFormatter(logging.Formatter(CONSOLE_FORMAT))
+        log_queue = queue.Queue(maxsize=Config.LOG_QUEUE_SIZE)
+        queue_handler = DroppingQueueHandler(log_queue)
+        queue_handler.addFilter(SamplingFilter(Config.LOG_SAMPLING))
+        root.addHandler(queue_handler)
+        root.setLevel(getattr(logging, Config.LOG_LEVEL.upper(), logging.INFO))
+
+        _configured_pid = os.getpid()
+        _listener = logging.handlers.QueueListener(log_queue, file_handler, console_handler)
+        _listener.start()
+
+        # Réduire le niveau de logging pour les librairies externes
+        for name in ['ccxt', 'urllib3', 'requests', 'websocket']:
+            logging.getLogger(name).setLevel(logging.WARNING)
+        return True
+
+
+def shutdown_logging():
+    """Vide la file et arrête le thread d'écriture"""
+    global _listener
+    with _lock:
+        if _listener is not None and _configured_pid == os.getpid():
+            _listener.stop()
+        _listener = None
+
+
+def format_event(line: str) -> str:
+    """Ligne lisible à partir d'un événement JSON du fichier de log (lignes non JSON inchangées)"""
+    try:
+        event = json.loads(line)
+        return f"{event['ts'][:19].replace('T', ' ')} - {event['level']} - {event['msg']}"
+    except (ValueError, KeyError, TypeError):
+        return line.rstrip('\n')
+
+
+atexit.register(shutdown_logging)
@@ -12,50 +12,37 @@ Version: 1.0.0
 
 import sys
 import os
+import time
 import logging
+import importlib.util
 from pathlib import Path
 
+STARTED_AT = time.perf_counter()
+
 # Ajouter le répertoire courant au path Python
 current_dir = Path(__file__).parent
 sys.path.insert(0, str(current_dir))
 
-# Imports locaux
+# Imports locaux : les modules lourds (ccxt, pandas, talib, streamlit, plotly)
+# sont importés dans chaque mode, pour que --help ou le daemon démarrent vite
 from config import Config
-from scanner import KuCoinScanner
-from trading import KuCoinTrader
-from gui import TradingGUI
-
-def setup_logging():
-    """Configure le système de logging global"""
-    logging.basicConfig(
-        level=getattr(logging, Config.LOG_LEVEL),
-        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-        handlers=[
-            logging.FileHandler(Config.LOG_FILE, encoding='utf-8'),
-            logging.StreamHandler(sys.stdout)
-        ]
-    )
-    
-    # Réduire le niveau de logging pour les librairies externes
-    logging.getLogger('ccxt').setLevel(logging.WARNING)
-    logging.getLogger('urllib3').setLevel(logging.WARNING)
-    logging.getLogger('requests').setLevel(logging.WARNING)
-
-def check_dependencies():
-    """Vérifie que toutes les dépendances sont installées"""
-    required_packages = [
-        'ccxt', 'pandas', 'numpy', 'talib', 'streamlit', 
-        'plotly', 'dotenv', 'requests'
+from log_setup import setup_logging
+
+CORE_PACKAGES = ['ccxt', 'pandas', 'numpy', 'talib', 'dotenv', 'requests']
+GUI_PACKAGES = CORE_PACKAGES + ['streamlit', 'plotly']
+API_PACKAGES = ['aiohttp']  # API de contrôle (API_ENABLED)
+
+def log_startup_time(mode: str):
+    """Journalise le temps écoulé depuis le lancement (imports compris)"""
+    logging.info(f"Mode {mode} prêt en {time.perf_counter() - STARTED_AT:.2f}s")
+
+def check_dependencies(packages: list = None):
+    """Vérifie que les dépendances sont installées (sans les importer)"""
+    missing_packages = [
+        package for package in (packages or GUI_PACKAGES) + (API_PACKAGES if Config.API_ENABLED else [])
+        if importlib.util.find_spec(package) is None
     ]
     
-    missing_packages = []
-    
-    for package in required_packages:
-        try:
-            __import__(package)
-        except ImportError:
-            missing_packages.append(package)
-    
     if missing_packages:
         print("❌ Dépendances manquantes:")
         for package in missing_packages:
@@ -102,6 +89,8 @@ LOG_LEVEL=INFO
 def run_tests():
     """Execute des tests de base pour vérifier le fonctionnement"""
     print("🧪 Exécution des tests de base...")
+    from scanner import KuCoinScanner
+    from trading import KuCoinTrader
     
     try:
         # Test 1: Initialisation du scanner
@@ -134,6 +123,214 @@ def run_tests():
         print(f"❌ Erreur lors des tests: {e}")
         return False
 
+def run_load_test(n_symbols: int = 100):
+    """Mesure le débit du scan et la latence des ordres sur l'exchange simulé"""
+    from mock_exchange import MockKuCoinFutures
+    from scanner import KuCoinScanner
+    from trading import KuCoinTrader
+    
+    print(f"🧪 Test de charge sur l'exchange simulé ({n_symbols} symbols)...")
+    exchange = MockKuCoinFutures(n_symbols=n_symbols, latency=0.02, jitter=0.005, seed=42)
+    scanner = KuCoinScanner(exchange=exchange)
+    trader = KuCoinTrader(exchange=exchange)
+    
+    # Débit du scan
+    scanner.load_markets()
+    start = time.perf_counter()
+    signals = scanner.scan_all_symbols()
+    elapsed = time.perf_counter() - start
+    scanned = len(scanner.futures_symbols)
+    print(f"   Scan: {scanned} symbols en {elapsed:.2f}s "
+          f"({scanned / elapsed:.1f} symbols/s), {len(signals)} signaux")
+    
+    # Latence d'exécution (ordre principal + SL + 3 TP)
+    latencies = []
+    for symbol in exchange.symbols[:10]:
+        signal = {'symbol': symbol, 'price': exchange.fetch_ticker(symbol)['last'], 'fibonacci_levels': {}}
+        start = time.perf_counter()
+        result = trader.execute_signal(signal, Config.DEFAULT_POSITION_SIZE)
+        if result['success']:
+            latencies.append((time.perf_counter() - start) * 1000)
+    if latencies:
+        latencies.sort()
+        print(f"   Exécution: {len(latencies)} trades, latence médiane "
+              f"{latencies[len(latencies) // 2]:.1f} ms, max {latencies[-1]:.1f} ms")
+    print(f"   Appels API: {dict(exchange.calls)}")
+    return True
+
+def run_daemon():
+    """Scanner sans interface ; ordres passés seulement si AUTO_TRADING est activé (ou --trade)"""
+    from scanner import KuCoinScanner, ScanLoop
+    from trading import KuCoinTrader
+    from pipeline import TradingPipeline
+    from exits import ExitManager
+    from state_store import StateManager
+    from control_api import start_control_api
+    
+    log_startup_time("daemon")
+    scanner = KuCoinScanner()
+    trader = KuCoinTrader()
+    state_manager = None
+    if Config.STATE_ENABLED:
+        state_manager = StateManager(scanner, trader)
+        state_manager.restore()
+        state_manager.start()
+    trader.start_account_stream()
+    trader.ledger.start()
+    exit_manager = ExitManager(trader, atr_provider=scanner.latest_atr)
+    if Config.EXIT_MANAGEMENT_ENABLED:
+        exit_manager.start()
+    pipeline = None
+    if Config.AUTO_TRADING:
+        pipeline = TradingPipeline(trader)
+        scanner.batch_listeners.append(trader.liquidity.prefetch_signals)
+        scanner.signal_listeners.append(pipeline.submit)
+        pipeline.start()
+    
+    def log_metrics(signals):
+        if pipeline is not None:
+            logging.info(f"Pipeline: {pipeline.metrics()}")
+        logging.info(f"Démarrage: {scanner.startup_metrics}")
+    
+    scan_loop = ScanLoop(scanner, after_scan=log_metrics)
+    runtime = {'scanner': scanner, 'trader': trader, 'exit_manager': exit_manager, 'state_manager': state_manager,
+               'scan_loop': scan_loop, 'pipeline': pipeline}
+    api = start_control_api(runtime)
+    if api:
+        print(f"🛰️  API de contrôle: http://{api.host}:{api.port}")
+    scan_loop.start()
+    if pipeline is not None:
+        print("🤖 Trading automatique démarré (Ctrl+C pour arrêter)")
+    else:
+        print("🔍 Scan seul, aucun ordre passé (AUTO_TRADING=true ou --trade pour trader) - Ctrl+C pour arrêter")
+    logging.info("Démarrage du mode daemon")
+    try:
+        # Le scan tourne dans sa propre boucle : l'API peut l'arrêter et le relancer
+        while True:
+            time.sleep(1)
+    finally:
+        scan_loop.stop()
+        if api:
+            api.stop()
+        if pipeline is not None:
+            pipeline.stop()
+        exit_manager.stop()
+        trader.ledger.stop()
+        if state_manager:
+            state_manager.stop()
+
+def run_backfill(days: int = None):
+    """Télécharge l'historique de tout l'univers (reprend après interruption)"""
+    from backfill import Backfiller
+    from scanner import KuCoinScanner
+    
+    scanner = KuCoinScanner()
+    scanner.load_markets()
+    if not scanner.futures_symbols:
+        print("❌ Aucun marché futures chargé")
+        return False
+    backfiller = Backfiller(scanner.exchange, days=days, governor=scanner.governor)
+    symbols = sorted(scanner.futures_symbols)
+    print(f"📥 Backfill de {len(symbols)} symbols x {backfiller.timeframes} sur {backfiller.days} jours "
+          f"vers {backfiller.store.root}/")
+    start = time.time()
+    reports = backfiller.run(symbols)
+    
+    errors = {key: r['error'] for key, r in reports.items() if 'error' in r}
+    rows = sum(r.get('rows', 0) for r in reports.values())
+    gaps = sum(r.get('gaps', 0) for r in reports.values())
+    duplicates = sum(r.get('duplicates', 0) for r in reports.values())
+    print(f"✅ {len(reports) - len(errors)}/{len(reports)} séries, {rows} bougies en {time.time() - start:.1f}s")
+    print(f"   Doublons retirés: {duplicates}, trous restants: {gaps}")
+    for key, error in errors.items():
+        print(f"   ❌ {key}: {error}")
+    return not errors
+
+def run_sharded_scan(n_shards: int):
+    """Scan continu réparti sur plusieurs processus (sans interface)"""
+    from sharding import ShardedScanner
+    
+    try:
+        coordinator = ShardedScanner(n_shards)
+    except ValueError as e:
+        print(f"❌ {e}")
+        return False
+    print(f"🔀 Scan réparti sur {coordinator.n_shards} processus (Ctrl+C pour arrêter)")
+    try:
+        coordinator.start()
+        while True:
+            coordinator.add_new_listings()
+            signals = coordinator.scan_all_symbols()
+            for signal in signals:
+                print(f"   📈 {signal['symbol']}: {signal['price']} (Volume +{signal['volume_increase']:.1f}%, "
+                      f"{signal['signal_strength']})")
+            for shard_id, health in sorted(coordinator.shard_health.items()):
+                status = "✅" if health['alive'] and not health['error'] else "❌"
+                print(f"   {status} Shard {shard_id}: {health['symbols']} symbols, "
+                      f"{health['duration']}s, {health['failed']} échecs, {health['error'] or ''}")
+            time.sleep(Config.SCAN_INTERVAL)
+    finally:
+        coordinator.stop()
+
+def run_replay(path: str, speed: float = None):
+    """Rejoue une session enregistrée (scans et exécutions) sous profilage, sans réseau"""
+    import cProfile
+    import pstats
+    import threading
+    
+    if not Path(path).exists():
+        print(f"❌ Enregistrement introuvable: {path}")
+        return False
+    Config.EXCHANGE_REPLAY_FILE = path
+    if speed is not None:
+        Config.EXCHANGE_REPLAY_SPEED = speed
+    from scanner import KuCoinScanner
+    from trading import KuCoinTrader
+    from pipeline import TradingPipeline
+    
+    # Un profileur par thread : les scans et les exécutions tournent dans des pools de threads
+    profilers = []
+    def profile_thread(*_):
+        profiler = cProfile.Profile()
+        profilers.append(profiler)
+        profiler.enable()
+    
+    scanner = KuCoinScanner()
+    trader = KuCoinTrader()
+    print(f"⏯️  Rejeu de {path} (vitesse {Config.EXCHANGE_REPLAY_SPEED or 'max'})")
+    main_profiler = cProfile.Profile()
+    profilers.append(main_profiler)
+    threading.setprofile(profile_thread)
+    main_profiler.enable()
+    pipeline = TradingPipeline(trader)
+    scanner.signal_listeners.append(pipeline.submit)
+    pipeline.start()
+    start = time.perf_counter()
+    scans = 0
+    try:
+        scanner.load_markets()
+        # Une passe par scan enregistré, jusqu'à épuisement des bougies de la session
+        remaining = scanner.exchange.remaining('fetch_ohlcv')
+        while remaining:
+            scanner.scan_all_symbols()
+            scans += 1
+            served, remaining = remaining - scanner.exchange.remaining('fetch_ohlcv'), scanner.exchange.remaining('fetch_ohlcv')
+            if not served:
+                break  # Bougies restantes sans appel correspondant (symbols absents du rejeu)
+            print(f"   Scan {scans}: {scanner.last_scan_stats['duration']}s, "
+                  f"{len(scanner.detected_signals)} signaux, {scanner.last_scan_stats['failed']} échecs")
+    finally:
+        pipeline.stop()
+        main_profiler.disable()
+        threading.setprofile(None)
+    print(f"✅ {scans} scans rejoués en {time.perf_counter() - start:.1f}s, pipeline: {pipeline.metrics()}")
+    for client, exchange in (('scanner', scanner.exchange), ('trader', trader.exchange)):
+        for method, stats in sorted(exchange.stats.items()):
+            print(f"   {client}.{method}: {stats['calls']} appels, {stats['misses']} absents, "
+                  f"{stats['recorded_s']:.2f}s enregistrées, {stats['served_s']:.2f}s rejouées")
+    pstats.Stats(*profilers).sort_stats('cumulative').print_stats(25)
+    return True
+
 def print_banner():
     """Affiche la bannière du programme"""
     banner = """
@@ -160,6 +357,14 @@ def print_usage():
 2. 🚀 Lancement:
    - Interface graphique: streamlit run main.py
    - Tests: python main.py --test
+   - Test de charge hors ligne: python main.py --load-test [nb_symbols]
+   - Scan multi-processus: python main.py --shard-scan [nb_processus]
+   - Scan sans interface: python main.py --daemon
+   - Trading automatique sans interface: python main.py --daemon --trade (ou AUTO_TRADING=true)
+   - Pilotage à distance (API HTTP): API_ENABLED=true python main.py --daemon
+   - Téléchargement de l'historique: python main.py --backfill [nb_jours]
+   - Enregistrement des échanges: EXCHANGE_RECORD_FILE=data/session.rec.gz python main.py --daemon
+   - Rejeu profilé d'une session: python main.py --replay data/session.rec.gz [vitesse]
    - Aide: python main.py --help
 
 3. 📊 Utilisation:
@@ -189,7 +394,7 @@ def main():
             setup_logging()
             create_env_template()
             
-            if not check_dependencies():
+            if not check_dependencies(CORE_PACKAGES):
                 sys.exit(1)
             
             if not run_tests():
@@ -199,6 +404,54 @@ def main():
             print("   streamlit run main.py")
             return
         
+        elif arg == '--load-test':
+            setup_logging()
+            n_symbols = int(sys.argv[2]) if len(sys.argv) > 2 else 100
+            if not run_load_test(n_symbols):
+                sys.exit(1)
+            return
+        
+        elif arg == '--daemon':
+            setup_logging()
+            if not check_dependencies(CORE_PACKAGES):
+                sys.exit(1)
+            if '--trade' in sys.argv[2:]:
+                Config.AUTO_TRADING = True
+            try:
+                run_daemon()
+            except KeyboardInterrupt:
+                print("\n👋 Arrêt du daemon")
+            return
+        
+        elif arg == '--backfill':
+            setup_logging()
+            days = int(sys.argv[2]) if len(sys.argv) > 2 else None
+            try:
+                if not run_backfill(days):
+                    sys.exit(1)
+            except KeyboardInterrupt:
+                print("\n⏸️  Backfill interrompu, relancez la même commande pour reprendre")
+            return
+        
+        elif arg == '--shard-scan':
+            setup_logging()
+            n_shards = int(sys.argv[2]) if len(sys.argv) > 2 else None
+            try:
+                run_sharded_scan(n_shards)
+            except KeyboardInterrupt:
+                print("\n👋 Arrêt du scan réparti")
+            return
+        
+        elif arg == '--replay':
+            setup_logging()
+            if len(sys.argv) < 3:
+                print("Usage: python main.py --replay <fichier> [vitesse]")
+                sys.exit(1)
+            speed = float(sys.argv[3]) if len(sys.argv) > 3 else None
+            if not run_replay(sys.argv[2], speed):
+                sys.exit(1)
+            return
+        
         elif arg in ['--version', '-v']:
             print("KuCoin EMA Scanner & Auto Trader v1.0.0")
             return
@@ -226,7 +479,9 @@ def main():
         print("⏹️  Appuyez sur Ctrl+C pour arrêter")
         
         # Importer et lancer l'interface
-        gui = TradingGUI()
+        from gui import get_gui
+        gui = get_gui()
+        log_startup_time("interface")
         gui.run()
         
     except KeyboardInterrupt:
@@ -0,0 +1,64 @@
+import json
+import logging
+import os
+import time
+from pathlib import Path
+from typing import Dict, Optional
+from config import Config
+from mock_exchange import MockKuCoinFutures
+from recorder import RecordingExchange, ReplayExchange
+
+
+def _cacheable(exchange) -> bool:
+    """Seuls les marchés d'un vrai exchange sont mis en cache (ni simulé, ni rejoué)"""
+    if isinstance(exchange, RecordingExchange):
+        exchange = exchange.exchange
+    return not isinstance(exchange, (MockKuCoinFutures, ReplayExchange))
+
+
+def snapshot_key(exchange) -> str:
+    """Identifie l'environnement des marchés (un instantané live ne sert pas en sandbox)"""
+    return f"{exchange.id}:{'sandbox' if Config.KUCOIN_SANDBOX else 'live'}"
+
+
+def load_snapshot(exchange, path: str = None, max_age: float = None) -> Optional[Dict]:
+    """Marchés de l'instantané disque s'il existe, correspond à l'exchange et est assez récent"""
+    if not _cacheable(exchange):
+        return None  # Marchés générés (simulé) ou issus de l'enregistrement (rejeu)
+    path = Path(path or Config.MARKETS_SNAPSHOT_FILE)
+    max_age = max_age if max_age is not None else Config.MARKETS_SNAPSHOT_MAX_AGE
+    try:
+        if not path.exists() or time.time() - path.stat().st_mtime > max_age:
+            return None
+        with open(path, 'r', encoding='utf-8') as f:
+            snapshot = json.load(f)
+        if snapshot.get('key') != snapshot_key(exchange):
+            return None
+        return snapshot['markets']
+    except Exception as e:
+        logging.warning(f"Instantané des marchés illisible ({path}): {e}")
+        return None
+
+
+def save_snapshot(exchange, markets: Dict, path: str = None):
+    """Écrit l'instantané des marchés de façon atomique"""
+    if not _cacheable(exchange) or not markets:
+        return
+    path = Path(path or Config.MARKETS_SNAPSHOT_FILE)
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(path.name + '.tmp')
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump({'key': snapshot_key(exchange), 'saved_at': time.time(), 'markets': markets}, f, default=str)
+        os.replace(tmp, path)
+    except Exception as e:
+        logging.warning(f"Impossible d'écrire l'instantané des marchés: {e}")
+
+
+def apply_snapshot(exchange) -> bool:
+    """Initialise les marchés d'un exchange depuis l'instantané, sans requête réseau"""
+    markets = load_snapshot(exchange)
+    if not markets:
+        return False
+    exchange.set_markets(markets)
+    return True
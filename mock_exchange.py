@@ -0,0 +1,524 @@
+import ccxt
+import numpy as np
+import threading
+import time
+import zlib
+from collections import Counter
+from typing import Callable, Dict, List, Optional
+
+DEFAULT_BASES = [
+    'BTC', 'ETH', 'SOL', 'XRP', 'DOGE', 'ADA', 'AVAX', 'LINK', 'DOT', 'MATIC',
+    'LTC', 'TRX', 'ATOM', 'NEAR', 'APT', 'ARB', 'OP', 'INJ', 'SUI', 'PEPE'
+]
+MINUTE_MS = 60_000
+FUNDING_PERIOD_MS = 8 * 3_600_000  # Règlement du funding toutes les 8 h
+FILLS_WINDOW_MS = 7 * 86_400_000  # Fenêtre couverte par une requête d'exécutions KuCoin à partir de since
+
+
+class MockKuCoinFutures:
+    """Exchange KuCoin Futures simulé, en mémoire, pour les tests hors ligne.
+
+    Reproduit la surface ccxt utilisée par le scanner et le trader
+    (marchés, bougies, tickers, ordres, positions, solde) avec des prix
+    synthétiques déterministes (marche aléatoire géométrique par symbol),
+    une latence configurable et des erreurs de rate limit injectables.
+    L'horloge de marché est simulée : `advance()` la fait avancer.
+    """
+
+    _shared = None
+
+    def __init__(self, symbols: List[str] = None, n_symbols: int = 50, seed: int = 42,
+                 latency: float = 0.0, jitter: float = 0.0, rate_limit: float = None,
+                 error_rate: float = 0.0, history_days: int = 30, balance: float = 10000.0,
+                 volatility: float = 0.002, taker_fee: float = 0.0006, maker_fee: float = 0.0002,
+                 funding_rate: float = 0.0001):
+        self.id = 'kucoinfutures'
+        self.seed = seed
+        self.latency = latency
+        self.jitter = jitter
+        self.rate_limit = rate_limit  # requêtes par seconde, None = illimité
+        self.error_rate = error_rate
+        self.volatility = volatility
+        self.taker_fee = taker_fee
+        self.maker_fee = maker_fee
+        self.funding_rate = funding_rate  # Taux appliqué toutes les 8 h (positif : les longs paient)
+        self.enableRateLimit = False
+        self.has = {'createOrders': True, 'cancelOrders': True, 'fetchTickers': True,
+                    'fetchMyTrades': True, 'fetchFundingHistory': True}
+        self.rateLimit = 0
+        self.last_response_headers = {}
+        self.thread_response_headers = threading.local()  # En-têtes de la réponse, par thread comme avec ccxt
+        self.calls = Counter()
+        self._rng = np.random.default_rng(seed)
+        self._lock = threading.RLock()
+        self._tokens = rate_limit or 0.0
+        self._last_refill = time.monotonic()
+
+        self.start_ms = 1_704_067_200_000  # 2024-01-01 00:00 UTC
+        self.now_ms = self.start_ms + history_days * 86_400_000
+        self._paths: Dict[str, Dict[str, np.ndarray]] = {}
+
+        if symbols is None:
+            bases = DEFAULT_BASES + [f"COIN{i}" for i in range(max(0, n_symbols - len(DEFAULT_BASES)))]
+            symbols = [f"{base}/USDT:USDT" for base in bases[:n_symbols]]
+        self.markets = {symbol: self._build_market(symbol) for symbol in symbols}
+        self.symbols = list(self.markets)
+
+        self.balance = {'free': balance, 'used': 0.0, 'total': balance}
+        self.positions: Dict[str, Dict] = {}
+        self.orders: Dict[str, Dict] = {}
+        self.fills: List[Dict] = []  # Exécutions du compte (fetch_my_trades)
+        self.funding: List[Dict] = []  # Paiements de funding (fetch_funding_history)
+        self._order_seq = 0
+        self.account_listeners: List[Callable[[Dict], None]] = []  # Canal privé simulé
+
+    @classmethod
+    def shared(cls, **kwargs) -> 'MockKuCoinFutures':
+        """Instance partagée entre le scanner et le trader"""
+        if cls._shared is None:
+            cls._shared = cls(**kwargs)
+        return cls._shared
+
+    # ------------------------------------------------------------------
+    # Infrastructure : latence, rate limit, horloge
+    # ------------------------------------------------------------------
+
+    def _request(self, method: str):
+        """Simule le coût d'une requête REST (latence, quota, erreurs)"""
+        self.calls[method] += 1
+        if self.latency or self.jitter:
+            time.sleep(max(0.0, self.latency + self._rng.uniform(-self.jitter, self.jitter)))
+        with self._lock:
+            remaining = None
+            if self.rate_limit:
+                now = time.monotonic()
+                self._tokens = min(self.rate_limit, self._tokens + (now - self._last_refill) * self.rate_limit)
+                self._last_refill = now
+                if self._tokens < 1:
+                    self.last_response_headers = {
+                        'gw-ratelimit-limit': str(int(self.rate_limit)),
+                        'gw-ratelimit-remaining': '0',
+                        'gw-ratelimit-reset': str(int(1000 / self.rate_limit)),
+                    }
+                    self.thread_response_headers.headers = self.last_response_headers
+                    self.calls['rate_limited'] += 1
+                    raise ccxt.RateLimitExceeded(f"{self.id} 429 Too Many Requests")
+                self._tokens -= 1
+                remaining = int(self._tokens)
+            if self.error_rate and self._rng.random() < self.error_rate:
+                self.calls['injected_errors'] += 1
+                raise ccxt.RateLimitExceeded(f"{self.id} 429 Too Many Requests (injected)")
+            self.last_response_headers = {
+                'gw-ratelimit-limit': str(int(self.rate_limit or 0)),
+                'gw-ratelimit-remaining': str(remaining if remaining is not None else 1000),
+                'gw-ratelimit-reset': '1000',
+            }
+            self.thread_response_headers.headers = self.last_response_headers
+
+    def milliseconds(self) -> int:
+        """Horloge simulée (ms)"""
+        return self.now_ms
+
+    def advance(self, seconds: float):
+        """Fait avancer l'horloge de marché et exécute les ordres déclenchés"""
+        with self._lock:
+            previous = self.now_ms
+            self.now_ms += int(seconds * 1000)
+            for settlement in range((previous // FUNDING_PERIOD_MS + 1) * FUNDING_PERIOD_MS, self.now_ms + 1,
+                                    FUNDING_PERIOD_MS):
+                self._settle_funding(settlement)
+            for symbol in list(self.positions) + [o['symbol'] for o in self.orders.values() if o['status'] == 'open']:
+                self._match_orders(symbol)
+
+    # ------------------------------------------------------------------
+    # Marchés et prix synthétiques
+    # ------------------------------------------------------------------
+
+    def _build_market(self, symbol: str) -> Dict:
+        base = symbol.split('/')[0]
+        return {
+            'id': f"{base}USDTM", 'symbol': symbol, 'base': base, 'quote': 'USDT', 'settle': 'USDT',
+            'type': 'swap', 'swap': True, 'future': False, 'spot': False, 'linear': True,
+            'active': True, 'contract': True, 'contractSize': 1.0,
+            'maker': self.maker_fee, 'taker': self.taker_fee,
+            'fees': {'maker': self.maker_fee, 'taker': self.taker_fee},
+            'precision': {'amount': 0.001, 'price': 1e-6},
+            'limits': {'amount': {'min': 0.001, 'max': 1e6}, 'leverage': {'min': 1, 'max': 50}},
+        }
+
+    def add_symbol(self, symbol: str):
+        """Ajoute un marché (simule un nouveau listing)"""
+        with self._lock:
+            self.markets[symbol] = self._build_market(symbol)
+            self.symbols = list(self.markets)
+
+    def _path(self, symbol: str) -> Dict[str, np.ndarray]:
+        """Série minute déterministe du symbol, étendue jusqu'à l'horloge courante"""
+        with self._lock:
+            needed = (self.now_ms - self.start_ms) // MINUTE_MS + 1
+            path = self._paths.get(symbol)
+            if path is not None and len(path['close']) >= needed:
+                return path
+            # Génération par blocs d'une journée ; un flux aléatoire indépendant
+            # par série garantit que l'historique reste identique en s'étendant
+            size = -(-needed // 1440) * 1440
+            streams = [np.random.default_rng(s) for s in
+                       np.random.SeedSequence(zlib.crc32(f"{self.seed}:{symbol}".encode())).spawn(5)]
+            start_price = 10 ** streams[0].uniform(-3, 4)
+            close = start_price * np.exp(np.cumsum(streams[1].normal(0, self.volatility, size)))
+            open_ = np.concatenate([[start_price], close[:-1]])
+            spread = np.abs(streams[2].normal(0, self.volatility / 2, size)) * close
+            volume = streams[3].lognormal(3, 1, size) * (1 + 20 * (streams[4].random(size) < 0.002))
+            path = {
+                'open': open_, 'close': close,
+                'high': np.maximum(open_, close) + spread,
+                'low': np.minimum(open_, close) - spread,
+                'volume': volume,
+            }
+            self._paths[symbol] = path
+            return path
+
+    def _current_minute(self) -> int:
+        return (self.now_ms - self.start_ms) // MINUTE_MS
+
+    def _last_price(self, symbol: str) -> float:
+        return float(self._path(symbol)['close'][self._current_minute()])
+
+    def load_markets(self, reload: bool = False, params: Dict = None) -> Dict:
+        self._request('load_markets')
+        return self.markets
+
+    def set_markets(self, markets: Dict, currencies: Dict = None) -> Dict:
+        """Équivalent de ccxt set_markets (marchés fournis sans requête)"""
+        self.markets = {symbol: market for symbol, market in markets.items()}
+        self.symbols = list(self.markets)
+        return self.markets
+
+    def fetch_markets(self, params: Dict = None) -> List[Dict]:
+        self._request('fetch_markets')
+        return list(self.markets.values())
+
+    def parse_timeframe(self, timeframe: str) -> int:
+        units = {'m': 60, 'h': 3600, 'd': 86400, 'w': 604800}
+        return int(timeframe[:-1]) * units[timeframe[-1]]
+
+    def fetch_ohlcv(self, symbol: str, timeframe: str = '1m', since: int = None,
+                    limit: int = None, params: Dict = None) -> List[list]:
+        self._request('fetch_ohlcv')
+        if symbol not in self.markets:
+            raise ccxt.BadSymbol(f"{self.id} does not have market symbol {symbol}")
+        limit = min(limit or 200, 200)
+        step = self.parse_timeframe(timeframe) // 60
+        path = self._path(symbol)
+        current_minute = self._current_minute()
+        last_bucket = current_minute // step
+        if since is None:
+            first_bucket = max(0, last_bucket - limit + 1)
+        else:
+            first_bucket = max(0, -(-(since - self.start_ms) // (step * MINUTE_MS)))
+        last_bucket = min(last_bucket, first_bucket + limit - 1)
+        candles = []
+        for bucket in range(first_bucket, last_bucket + 1):
+            lo, hi = bucket * step, min((bucket + 1) * step, current_minute + 1)
+            candles.append([
+                self.start_ms + bucket * step * MINUTE_MS,
+                float(path['open'][lo]), float(path['high'][lo:hi].max()),
+                float(path['low'][lo:hi].min()), float(path['close'][hi - 1]),
+                float(path['volume'][lo:hi].sum()),
+            ])
+        return candles
+
+    def _recent_volume(self, symbol: str, minutes: int) -> np.ndarray:
+        current = self._current_minute()
+        return self._path(symbol)['volume'][max(0, current - minutes + 1):current + 1]
+
+    def _ticker(self, symbol: str) -> Dict:
+        last = self._last_price(symbol)
+        return {
+            'symbol': symbol, 'timestamp': self.now_ms, 'last': last, 'close': last,
+            'bid': last * 0.9999, 'ask': last * 1.0001,
+            'quoteVolume': float(self._recent_volume(symbol, 1440).sum() * last),
+        }
+
+    def fetch_ticker(self, symbol: str, params: Dict = None) -> Dict:
+        self._request('fetch_ticker')
+        if symbol not in self.markets:
+            raise ccxt.BadSymbol(f"{self.id} does not have market symbol {symbol}")
+        return self._ticker(symbol)
+
+    def fetch_tickers(self, symbols: List[str] = None, params: Dict = None) -> Dict[str, Dict]:
+        self._request('fetch_tickers')
+        return {s: self._ticker(s) for s in (symbols or self.symbols) if s in self.markets}
+
+    def fetch_order_book(self, symbol: str, limit: int = None, params: Dict = None) -> Dict:
+        self._request('fetch_order_book')
+        last = self._last_price(symbol)
+        depth = limit or 20
+        size = float(self._recent_volume(symbol, 60).mean())
+        return {
+            'symbol': symbol, 'timestamp': self.now_ms,
+            'bids': [[last * (1 - 0.0001 * (i + 1)), size * (i + 1) / depth] for i in range(depth)],
+            'asks': [[last * (1 + 0.0001 * (i + 1)), size * (i + 1) / depth] for i in range(depth)],
+        }
+
+    # ------------------------------------------------------------------
+    # Ordres, positions, solde
+    # ------------------------------------------------------------------
+
+    def create_order(self, symbol: str, type: str, side: str, amount: float,
+                     price: float = None, params: Dict = None) -> Dict:
+        self._request('create_order')
+        return self._acknowledge(self._create_order(symbol, type, side, amount, price, params))
+
+    def create_orders(self, orders: List[Dict], params: Dict = None) -> List[Dict]:
+        """Création groupée (une seule requête, comme l'endpoint batch KuCoin)"""
+        self._request('create_orders')
+        return [
+            self._acknowledge(self._create_order(o['symbol'], o['type'], o['side'], o['amount'], o.get('price'),
+                                                 o.get('params')))
+            for o in orders
+        ]
+
+    @staticmethod
+    def _acknowledge(order: Dict) -> Dict:
+        """Réponse de création telle que ccxt la donne pour KuCoin : l'identifiant seul, état à relire"""
+        response = {key: None for key in order}
+        response.update({'id': order['id'], 'clientOrderId': order['clientOrderId'], 'symbol': order['symbol'],
+                         'info': {'orderId': order['id']}, 'trades': [], 'fees': []})
+        return response
+
+    def _create_order(self, symbol: str, type: str, side: str, amount: float,
+                      price: float = None, params: Dict = None) -> Dict:
+        params = params or {}
+        if symbol not in self.markets:
+            raise ccxt.BadSymbol(f"{self.id} does not have market symbol {symbol}")
+        if amount <= 0:
+            raise ccxt.InvalidOrder(f"{self.id} amount must be positive")
+        with self._lock:
+            self._order_seq += 1
+            order = {
+                'id': f"mock-{self._order_seq}", 'clientOrderId': params.get('clientOid'),
+                'symbol': symbol, 'type': type, 'side': side, 'amount': float(amount),
+                'price': price, 'stopPrice': params.get('stopPrice'),
+                'postOnly': bool(params.get('postOnly')), 'reduceOnly': bool(params.get('reduceOnly')),
+                'status': 'open', 'filled': 0.0, 'remaining': float(amount), 'average': None,
+                'fee': {'cost': 0.0, 'currency': 'USDT'}, 'timestamp': self.now_ms, 'trades': [],
+            }
+            if order['postOnly'] and price is not None:
+                last = self._last_price(symbol)
+                if (side == 'buy' and price >= last) or (side == 'sell' and price <= last):
+                    order['status'] = 'canceled'
+                    self.orders[order['id']] = order
+                    return dict(order)
+            self.orders[order['id']] = order
+            self._match_orders(symbol)
+            if order['status'] == 'open' and self.account_listeners:
+                self._emit_order(order, 'open')
+            return dict(order)
+
+    def create_market_order(self, symbol: str, side: str, amount: float,
+                            price: float = None, params: Dict = None) -> Dict:
+        return self.create_order(symbol, 'market', side, amount, None, params)
+
+    def create_limit_order(self, symbol: str, side: str, amount: float,
+                           price: float, params: Dict = None) -> Dict:
+        return self.create_order(symbol, 'limit', side, amount, price, params)
+
+    def cancel_order(self, id: str, symbol: str = None, params: Dict = None) -> Dict:
+        self._request('cancel_order')
+        with self._lock:
+            order = self.orders.get(id)
+            if order is None:
+                raise ccxt.OrderNotFound(f"{self.id} order {id} not found")
+            if order['status'] == 'open':
+                order['status'] = 'canceled'
+                self._emit_order(order, 'canceled')
+            return dict(order)
+
+    def cancel_orders(self, ids: List[str], symbol: str = None, params: Dict = None) -> List[Dict]:
+        """Annulation groupée (une seule requête)"""
+        self._request('cancel_orders')
+        with self._lock:
+            result = []
+            for id in ids:
+                order = self.orders.get(id)
+                if order is None:
+                    continue
+                if order['status'] == 'open':
+                    order['status'] = 'canceled'
+                    self._emit_order(order, 'canceled')
+                result.append(dict(order))
+            return result
+
+    def fetch_order(self, id: str, symbol: str = None, params: Dict = None) -> Dict:
+        self._request('fetch_order')
+        with self._lock:
+            order = self.orders.get(id)
+            if order is None:
+                raise ccxt.OrderNotFound(f"{self.id} order {id} not found")
+            self._match_orders(order['symbol'])
+            return dict(order)
+
+    def fetch_open_orders(self, symbol: str = None, since: int = None,
+                          limit: int = None, params: Dict = None) -> List[Dict]:
+        self._request('fetch_open_orders')
+        with self._lock:
+            return [dict(o) for o in self.orders.values()
+                    if o['status'] == 'open' and (symbol is None or o['symbol'] == symbol)]
+
+    def fetch_positions(self, symbols: List[str] = None, params: Dict = None) -> List[Dict]:
+        self._request('fetch_positions')
+        with self._lock:
+            result = []
+            for symbol, position in self.positions.items():
+                if symbols and symbol not in symbols:
+                    continue
+                last = self._last_price(symbol)
+                result.append({
+                    'symbol': symbol, 'side': 'long' if position['size'] > 0 else 'short',
+                    'contracts': abs(position['size']), 'size': abs(position['size']),
+                    'entryPrice': position['entry_price'], 'markPrice': last,
+                    'unrealizedPnl': (last - position['entry_price']) * position['size'],
+                    'notional': abs(position['size']) * last,
+                })
+            return result
+
+    def fetch_balance(self, params: Dict = None) -> Dict:
+        self._request('fetch_balance')
+        with self._lock:
+            usdt = dict(self.balance)
+            return {'USDT': usdt, 'free': {'USDT': usdt['free']}, 'used': {'USDT': usdt['used']},
+                    'total': {'USDT': usdt['total']}}
+
+    def fetch_my_trades(self, symbol: str = None, since: int = None, limit: int = None,
+                        params: Dict = None) -> List[Dict]:
+        self._request('fetch_my_trades')
+        with self._lock:
+            # Comme KuCoin : seules les exécutions de la fenêtre qui suit `since` sont renvoyées
+            until = since + FILLS_WINDOW_MS if since is not None else None
+            fills = [dict(f) for f in self.fills
+                     if (symbol is None or f['symbol'] == symbol)
+                     and (since is None or since <= f['timestamp'] < until)]
+        return fills[:limit] if limit else fills
+
+    def fetch_funding_history(self, symbol: str = None, since: int = None, limit: int = None,
+                              params: Dict = None) -> List[Dict]:
+        self._request('fetch_funding_history')
+        with self._lock:
+            events = [dict(e) for e in self.funding
+                      if (symbol is None or e['symbol'] == symbol) and (since is None or e['timestamp'] >= since)]
+        return events[:limit] if limit else events
+
+    def _settle_funding(self, timestamp: int):
+        """Règlement du funding de toutes les positions ouvertes"""
+        for symbol, position in self.positions.items():
+            amount = -position['size'] * self._last_price(symbol) * self.funding_rate
+            self.funding.append({'id': f"funding-{symbol}-{timestamp}", 'symbol': symbol, 'code': 'USDT',
+                                 'amount': amount, 'timestamp': timestamp})
+            self.balance['total'] += amount
+            self.balance['free'] += amount
+
+    def _match_orders(self, symbol: str):
+        """Exécute les ordres ouverts du symbol selon le dernier prix"""
+        last = self._last_price(symbol)
+        for order in self.orders.values():
+            if order['symbol'] != symbol or order['status'] != 'open':
+                continue
+            side, kind = order['side'], order['type']
+            if kind == 'market':
+                fill_price = last * (1.0005 if side == 'buy' else 0.9995)
+            elif order['stopPrice'] is not None:
+                triggered = last <= order['stopPrice'] if side == 'sell' else last >= order['stopPrice']
+                if not triggered:
+                    continue
+                fill_price = last
+            elif kind == 'limit':
+                if (side == 'buy' and last > order['price']) or (side == 'sell' and last < order['price']):
+                    continue
+                fill_price = order['price']
+            else:
+                continue
+            if order['reduceOnly']:
+                # Réduction seule : annulé s'il ne reste rien à réduire, sinon limité à la position
+                held = self.positions.get(symbol, {}).get('size', 0.0)
+                reducible = -held if side == 'buy' else held
+                if reducible <= 1e-12:
+                    order['status'] = 'canceled'
+                    continue
+                order['remaining'] = order['amount'] = min(order['remaining'], reducible)
+            self._fill(order, fill_price)
+
+    def _fill(self, order: Dict, price: float):
+        amount = order['remaining']
+        fee_rate = self.taker_fee if order['type'] == 'market' or order['stopPrice'] else self.maker_fee
+        fee = amount * price * fee_rate
+        order.update({'status': 'closed', 'filled': order['amount'], 'remaining': 0.0, 'average': price,
+                      'fee': {'cost': fee, 'currency': 'USDT'}})
+        fill = {
+            'id': f"{order['id']}-{len(order['trades']) + 1}", 'order': order['id'], 'symbol': order['symbol'],
+            'side': order['side'], 'price': price, 'amount': amount, 'cost': price * amount,
+            'timestamp': self.now_ms, 'takerOrMaker': 'maker' if fee_rate == self.maker_fee else 'taker',
+            'fee': order['fee'],
+        }
+        order['trades'].append(fill)
+        self.fills.append(fill)
+
+        signed = amount if order['side'] == 'buy' else -amount
+        position = self.positions.get(order['symbol'], {'size': 0.0, 'entry_price': price})
+        new_size = position['size'] + signed
+        realized = 0.0
+        if position['size'] and (position['size'] > 0) != (signed > 0):
+            closed = min(abs(signed), abs(position['size']))
+            realized = closed * (price - position['entry_price']) * (1 if position['size'] > 0 else -1)
+            if new_size and (new_size > 0) != (position['size'] > 0):
+                position['entry_price'] = price  # Position retournée
+        elif new_size:
+            position['entry_price'] = (
+                position['entry_price'] * abs(position['size']) + price * abs(signed)
+            ) / abs(new_size)
+        position['size'] = new_size
+        if abs(new_size) < 1e-12:
+            self.positions.pop(order['symbol'], None)
+        else:
+            self.positions[order['symbol']] = position
+
+        used = sum(abs(p['size']) * p['entry_price'] for p in self.positions.values())
+        self.balance['total'] += realized - fee
+        self.balance['used'] = used
+        self.balance['free'] = self.balance['total'] - used
+
+        if self.account_listeners:
+            self._emit_order(order, 'match', price=price, amount=amount)
+            self._emit({
+                'topic': '/contract/positionAll', 'subject': 'position.change',
+                'data': {
+                    'symbol': self.markets[order['symbol']]['id'], 'currentQty': new_size,
+                    'avgEntryPrice': position['entry_price'], 'markPrice': price,
+                    'unrealisedPnl': (price - position['entry_price']) * new_size,
+                    'realisedPnl': realized - fee, 'posMargin': abs(new_size) * position['entry_price'],
+                    'currentTimestamp': self.now_ms,
+                },
+            })
+            self._emit({
+                'topic': '/contractAccount/wallet', 'subject': 'availableBalance.change',
+                'data': {'currency': 'USDT', 'availableBalance': self.balance['free'],
+                         'holdBalance': self.balance['used'], 'timestamp': self.now_ms},
+            })
+
+    def _emit_order(self, order: Dict, kind: str, price: float = None, amount: float = None):
+        self._emit({
+            'topic': '/contractMarket/tradeOrders', 'subject': 'orderChange',
+            'data': {
+                'orderId': order['id'], 'clientOid': order['clientOrderId'],
+                'symbol': self.markets[order['symbol']]['id'], 'type': kind, 'side': order['side'],
+                'orderType': order['type'], 'status': 'done' if order['status'] != 'open' else 'open',
+                'matchPrice': price, 'matchSize': amount, 'size': order['amount'],
+                'filledSize': order['filled'], 'ts': self.now_ms * 1_000_000,
+            },
+        })
+
+    def _emit(self, message: Dict):
+        """Diffuse un message au format du canal privé KuCoin aux abonnés"""
+        message = {'type': 'message', **message}
+        for listener in list(self.account_listeners):
+            listener(message)
@@ -0,0 +1,200 @@
+import logging
+import queue
+import threading
+import time
+import zlib
+from collections import Counter, deque
+from typing import Callable, Dict, List, Optional
+from config import Config
+
+# Un filtre de risque reçoit le signal et les signaux en cours d'exécution ;
+# il retourne None si le signal est accepté, sinon la raison du rejet
+RiskFilter = Callable[[Dict, List[Dict]], Optional[str]]
+
+
+def reject_stale_signals(max_age: float = None) -> RiskFilter:
+    """Rejette les signaux trop anciens au moment de leur traitement"""
+    def check(signal: Dict, in_flight: List[Dict]) -> Optional[str]:
+        limit = max_age if max_age is not None else Config.PIPELINE_MAX_SIGNAL_AGE
+        age = time.time() - signal['timestamp'].timestamp()
+        return f"signal périmé ({age:.0f}s)" if age > limit else None
+    return check
+
+
+def reject_open_symbol(trader) -> RiskFilter:
+    """Rejette un signal si un trade est déjà actif sur le symbol"""
+    def check(signal: Dict, in_flight: List[Dict]) -> Optional[str]:
+        if any(pending['symbol'] == signal['symbol'] for pending in in_flight):
+            return "trade en cours d'exécution sur le symbol"
+        if signal['symbol'] in trader.pending_entries:
+            return "entrée algorithmique en cours sur le symbol"
+        for trade in trader.orders_history:
+            if trade['symbol'] == signal['symbol'] and trade.get('status') == 'active':
+                return "trade déjà actif sur le symbol"
+        return None
+    return check
+
+
+def limit_open_trades(trader, max_trades: int = None) -> RiskFilter:
+    """Rejette les signaux au-delà d'un nombre de trades actifs"""
+    def check(signal: Dict, in_flight: List[Dict]) -> Optional[str]:
+        limit = max_trades if max_trades is not None else Config.PIPELINE_MAX_OPEN_TRADES
+        active = len(in_flight) + len(trader.pending_entries) + sum(1 for trade in trader.orders_history if trade.get('status') == 'active')
+        return f"{active} trades actifs (max {limit})" if active >= limit else None
+    return check
+
+
+def limit_to_top_ranked(top_k: int = None) -> RiskFilter:
+    """Rejette les signaux classés au-delà des K meilleurs de leur scan"""
+    def check(signal: Dict, in_flight: List[Dict]) -> Optional[str]:
+        limit = top_k if top_k is not None else Config.RANKING_TOP_K
+        rank = signal.get('rank')
+        return f"rang {rank} hors des {limit} meilleurs" if rank is not None and rank > limit else None
+    return check
+
+
+class TradingPipeline:
+    """Pipeline événementiel scan -> filtres de risque -> exécution.
+
+    Les signaux entrent dans une file bornée ; un répartiteur applique les
+    filtres de risque puis route chaque signal vers un exécuteur choisi par
+    hachage du symbol, ce qui préserve l'ordre par symbol. Les files étant
+    bornées, un exécuteur lent freine le répartiteur puis les producteurs
+    (back-pressure) ; au-delà du délai de soumission le signal est abandonné.
+    """
+
+    def __init__(self, trader, position_size: float = None, risk_filters: List[RiskFilter] = None,
+                 workers: int = None, queue_size: int = None):
+        self.trader = trader
+        self.position_size = position_size
+        self.risk_filters = risk_filters if risk_filters is not None else [
+            reject_stale_signals(), limit_to_top_ranked(), reject_open_symbol(trader), limit_open_trades(trader)
+        ]
+        self.n_workers = workers or Config.PIPELINE_WORKERS
+        size = queue_size or Config.PIPELINE_QUEUE_SIZE
+        self.intake = queue.Queue(maxsize=size)
+        self._worker_queues = [queue.Queue(maxsize=size) for _ in range(self.n_workers)]
+        self._threads: List[threading.Thread] = []
+        self._running = False
+        self._lock = threading.Lock()
+        self._in_flight: Dict[int, Dict] = {}
+        self.counters = Counter()
+        self.rejections = Counter()
+        self.latencies = deque(maxlen=1000)  # Latence signal -> ordre (ms)
+
+    def start(self):
+        """Démarre le répartiteur et les exécuteurs"""
+        if self._running:
+            return
+        self._running = True
+        self._threads = [threading.Thread(target=self._dispatch_loop, name="pipeline-dispatch", daemon=True)]
+        for i, worker_queue in enumerate(self._worker_queues):
+            self._threads.append(threading.Thread(
+                target=self._execute_loop, args=(worker_queue,), name=f"pipeline-exec-{i}", daemon=True
+            ))
+        for thread in self._threads:
+            thread.start()
+        logging.info(f"Pipeline de trading démarré ({self.n_workers} exécuteurs)")
+
+    def stop(self, timeout: float = 5.0):
+        """Arrête le pipeline après traitement des signaux en file"""
+        if not self._running:
+            return
+        self._running = False
+        self.intake.put(None)
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+        logging.info("Pipeline de trading arrêté")
+
+    def submit(self, signal: Dict, timeout: float = None) -> bool:
+        """Soumet un signal ; bloque tant que la file est pleine (back-pressure)"""
+        timeout = timeout if timeout is not None else Config.PIPELINE_SUBMIT_TIMEOUT
+        try:
+            self.intake.put(signal, timeout=timeout)
+        except queue.Full:
+            self._count('dropped')
+            logging.warning(f"Pipeline saturé, signal {signal['symbol']} abandonné")
+            return False
+        self._count('submitted')
+        return True
+
+    def _count(self, key: str, reason: str = None):
+        with self._lock:
+            self.counters[key] += 1
+            if reason:
+                self.rejections[reason] += 1
+
+    def _dispatch_loop(self):
+        while True:
+            signal = self.intake.get()
+            if signal is None:
+                for worker_queue in self._worker_queues:
+                    worker_queue.put(None)
+                return
+            with self._lock:
+                in_flight = list(self._in_flight.values())
+            reason = self._check_risk(signal, in_flight)
+            if reason:
+                self._count('rejected', reason)
+                logging.info(f"Signal {signal['symbol']} rejeté: {reason}")
+                continue
+            index = zlib.crc32(signal['symbol'].encode()) % self.n_workers
+            self._worker_queues[index].put(signal)  # Bloquant : propage la back-pressure
+
+    def _check_risk(self, signal: Dict, in_flight: List[Dict]) -> Optional[str]:
+        for risk_filter in self.risk_filters:
+            try:
+                reason = risk_filter(signal, in_flight)
+            except Exception as e:
+                reason = f"erreur filtre de risque: {e}"
+            if reason:
+                return reason
+        return None
+
+    def _execute_loop(self, worker_queue: queue.Queue):
+        while True:
+            signal = worker_queue.get()
+            if signal is None:
+                return
+            # Revalidation et réservation atomiques : les autres exécuteurs voient
+            # ce signal comme en cours jusqu'à la fin de son exécution
+            with self._lock:
+                reason = self._check_risk(signal, list(self._in_flight.values()))
+                if not reason:
+                    self._in_flight[id(signal)] = signal
+            if reason:
+                self._count('rejected', reason)
+                continue
+            try:
+                size = self.position_size or Config.DEFAULT_POSITION_SIZE
+                result = self.trader.execute_signal(signal, size)
+            except Exception as e:
+                result = {'success': False, 'error': str(e)}
+            finally:
+                with self._lock:
+                    self._in_flight.pop(id(signal), None)
+            if result.get('success'):
+                latency = (time.time() - signal['timestamp'].timestamp()) * 1000
+                with self._lock:
+                    self.latencies.append(latency)
+                self._count('executed')
+                logging.info(f"Trade automatique {signal['symbol']} exécuté ({latency:.0f} ms après détection)")
+            else:
+                self._count('failed')
+                logging.error(f"Échec trade automatique {signal['symbol']}: {result.get('error')}")
+
+    def metrics(self) -> Dict:
+        """Compteurs, profondeur des files et latence signal -> ordre"""
+        with self._lock:
+            latencies = sorted(self.latencies)
+            metrics = dict(self.counters)
+            metrics['rejections'] = dict(self.rejections)
+        metrics['queue_depth'] = self.intake.qsize() + sum(q.qsize() for q in self._worker_queues)
+        if latencies:
+            metrics['latency_ms'] = {
+                'p50': round(latencies[len(latencies) // 2], 1),
+                'p95': round(latencies[int(len(latencies) * 0.95)], 1),
+                'max': round(latencies[-1], 1),
+            }
+        return metrics
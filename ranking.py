@@ -0,0 +1,132 @@
+import numpy as np
+import pandas as pd
+from typing import Dict, List, Optional
+from config import Config
+
+FEATURES = ['volume_ratio', 'ema_distance_atr', 'relative_strength', 'liquidity']
+RAW_FEATURES = ['volume_ratio', 'ema_distance_atr', 'returns', 'liquidity']  # Avant référence de l'univers
+
+
+def _stack(frames: Dict[str, pd.DataFrame], window: int) -> tuple:
+    """Matrices (symbols x bougies) des `window` dernières bougies, complétées à gauche par NaN.
+
+    Les séries plus courtes que la fenêtre (nouveaux listings) sont gardées
+    dès qu'elles couvrent l'EMA et l'ATR ; seules les trop courtes sont écartées.
+    """
+    minimum = max(Config.EMA_PERIOD, Config.RANKING_ATR_PERIOD) + 1
+    symbols = [s for s, frame in frames.items() if frame is not None and len(frame) >= minimum]
+    matrices = {column: np.full((len(symbols), window), np.nan) for column in ['high', 'low', 'close', 'volume']}
+    for row, symbol in enumerate(symbols):
+        n = min(window, len(frames[symbol]))
+        for column, matrix in matrices.items():
+            matrix[row, -n:] = frames[symbol][column].to_numpy(dtype=float)[-n:]
+    return symbols, matrices
+
+
+def _smooth(values: np.ndarray, period: int, step) -> np.ndarray:
+    """Moyenne simple des `period` premières valeurs de chaque ligne, puis lissage récursif ; dernière valeur"""
+    first = np.argmax(np.isfinite(values), axis=1)
+    offset = np.arange(values.shape[1])[None, :] - first[:, None]
+    current = np.where((offset >= 0) & (offset < period), values, 0.0).sum(axis=1) / period
+    start = first + period - 1
+    for column in range(period, values.shape[1]):
+        current = np.where(column > start, step(current, values[:, column]), current)
+    return current
+
+
+def _ema(values: np.ndarray, period: int) -> np.ndarray:
+    """EMA de chaque ligne (amorcée par la moyenne simple, comme TA-Lib) ; dernière valeur"""
+    alpha = 2 / (period + 1)
+    return _smooth(values, period, lambda ema, value: alpha * value + (1 - alpha) * ema)
+
+
+def _atr(high: np.ndarray, low: np.ndarray, close: np.ndarray, period: int) -> np.ndarray:
+    """ATR de Wilder de chaque ligne ; dernière valeur"""
+    previous = close[:, :-1]
+    true_range = np.maximum(high[:, 1:] - low[:, 1:],
+                            np.maximum(np.abs(high[:, 1:] - previous), np.abs(low[:, 1:] - previous)))
+    return _smooth(true_range, period, lambda atr, value: (atr * (period - 1) + value) / period)
+
+
+def percentile_rank(values: np.ndarray) -> np.ndarray:
+    """Rang centile (0-1) de chaque valeur dans l'univers ; NaN -> 0"""
+    result = np.zeros(len(values))
+    valid = np.isfinite(values)
+    n = valid.sum()
+    if n == 1:
+        result[valid] = 1.0
+    elif n > 1:
+        result[valid] = values[valid].argsort().argsort() / (n - 1)
+    return result
+
+
+def raw_features(frames: Dict[str, pd.DataFrame]) -> pd.DataFrame:
+    """Statistiques brutes de chaque symbol en une passe NumPy.
+
+    Hausse de volume relative à sa moyenne, distance au dessus de l'EMA en
+    ATR, performance sur l'horizon et volume échangé en USDT. Elles ne
+    dépendent que du symbol : les tables de plusieurs tranches de l'univers
+    (shards) peuvent être concaténées avant le calcul des scores.
+    """
+    window = Config.RANKING_WINDOW
+    lookback = Config.RANKING_LOOKBACK_BARS
+    symbols, m = _stack(frames, window)
+    if not symbols:
+        return pd.DataFrame(columns=RAW_FEATURES)
+    close, volume = m['close'], m['volume']
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        average_volume = np.nanmean(volume[:, -Config.RANKING_VOLUME_BARS - 1:-1], axis=1)
+        ema = _ema(close, Config.EMA_PERIOD)
+        atr = _atr(m['high'], m['low'], close, Config.RANKING_ATR_PERIOD)
+        raw = {
+            'volume_ratio': volume[:, -1] / average_volume,
+            'ema_distance_atr': (close[:, -1] - ema) / atr,
+            'returns': close[:, -1] / close[:, -1 - lookback] - 1,
+            'liquidity': np.nansum(close[:, -lookback:] * volume[:, -lookback:], axis=1),
+        }
+    return pd.DataFrame(raw, index=symbols)
+
+
+def score_features(raw: pd.DataFrame, benchmark: Optional[str] = None) -> pd.DataFrame:
+    """Scores transversaux (0-100) à partir des statistiques brutes de tout l'univers.
+
+    La performance devient relative au symbol de référence (ou à la médiane
+    de l'univers) ; chaque statistique est convertie en rang centile et le
+    score en est la moyenne pondérée.
+    """
+    if raw.empty:
+        return pd.DataFrame(columns=FEATURES + ['score'])
+    returns = raw['returns'].to_numpy(dtype=float)
+    with np.errstate(invalid='ignore'):
+        reference = raw.at[benchmark, 'returns'] if benchmark in raw.index else np.nanmedian(returns)
+    table = raw.drop(columns='returns').astype(float)
+    table.insert(FEATURES.index('relative_strength'), 'relative_strength', returns - reference)
+
+    weights = Config.RANKING_WEIGHTS
+    total = sum(weights.get(f, 0) for f in FEATURES) or 1
+    score = sum(weights.get(f, 0) * percentile_rank(table[f].to_numpy()) for f in FEATURES) / total * 100
+    table['score'] = np.round(score, 1)
+    return table
+
+
+def universe_features(frames: Dict[str, pd.DataFrame], benchmark: Optional[str] = None) -> pd.DataFrame:
+    """Statistiques transversales et score de tout l'univers (voir raw_features et score_features)"""
+    return score_features(raw_features(frames), benchmark)
+
+
+def rank_candidates(signals: List[Dict], table: pd.DataFrame) -> List[Dict]:
+    """Trie les signaux par score décroissant et y ajoute rang, score et statistiques"""
+    for signal in signals:
+        symbol = signal['symbol']
+        if symbol in table.index:
+            row = table.loc[symbol]
+            signal['rank_score'] = float(row['score'])
+            signal['rank_features'] = {f: float(row[f]) for f in FEATURES}
+        else:
+            signal['rank_score'] = 0.0
+            signal['rank_features'] = {}
+    ranked = sorted(signals, key=lambda s: s['rank_score'], reverse=True)
+    for position, signal in enumerate(ranked, start=1):
+        signal['rank'] = position
+    return ranked
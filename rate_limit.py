@@ -0,0 +1,197 @@
+import ccxt
+import logging
+import threading
+import time
+from typing import Callable, Dict, Optional
+from config import Config
+
+# Erreurs signalant une saturation du quota côté exchange
+THROTTLE_ERRORS = (ccxt.RateLimitExceeded, ccxt.DDoSProtection)
+
+
+def track_response_headers(exchange):
+    """Conserve les en-têtes de chaque réponse dans le thread qui l'a reçue.
+
+    ccxt n'expose que `last_response_headers`, partagé par tous les threads :
+    avec des requêtes simultanées sur une même instance, ce sont souvent ceux
+    d'une autre requête. Le crochet `on_rest_response` reçoit les en-têtes de
+    sa propre réponse, succès comme erreur HTTP.
+    """
+    local = threading.local()
+    original = exchange.on_rest_response
+
+    def on_rest_response(code, reason, url, method, headers, body, *args):
+        local.headers = dict(headers or {})
+        return original(code, reason, url, method, headers, body, *args)
+
+    exchange.on_rest_response = on_rest_response
+    exchange.thread_response_headers = local
+    return exchange
+
+
+def clear_response_headers(exchange):
+    """Oublie les en-têtes de la requête précédente du thread (avant un nouvel appel)"""
+    local = getattr(exchange, 'thread_response_headers', None)
+    if local is not None:
+        local.headers = None
+
+
+def response_headers(exchange) -> Optional[Dict]:
+    """En-têtes de la dernière réponse reçue par ce thread ; None si l'exchange ne les suit pas par thread"""
+    local = getattr(exchange, 'thread_response_headers', None)
+    if local is None:
+        return None
+    return getattr(local, 'headers', None) or {}
+
+
+class RateLimitGovernor:
+    """Régulateur adaptatif du débit et de la concurrence des requêtes REST.
+
+    Combine un seau à jetons (débit en requêtes/s) et un plafond de requêtes
+    simultanées, tous deux ajustés en continu (AIMD) : hausse additive tant
+    que les en-têtes `gw-ratelimit-*` de KuCoin indiquent de la marge, baisse
+    multiplicative et pause globale sur une réponse 429. Les en-têtes lus
+    sont ceux de la réponse du thread appelant (track_response_headers) ;
+    sans ce suivi, `last_response_headers` n'est fiable qu'en l'absence de
+    requêtes simultanées et n'est donc utilisé qu'avec une concurrence de 1.
+    Face à une session rejouée, débit et pauses sont accélérés du facteur de
+    rejeu (aucune régulation à vitesse 0) : le rythme est celui du rejeu.
+    """
+
+    def __init__(self, exchange=None, rate: float = None, min_rate: float = None,
+                 max_rate: float = None, max_concurrency: int = None):
+        self.exchange = exchange
+        # Facteur d'accélération du rejeu (None hors rejeu, 0 = sans attente)
+        self.speed = getattr(exchange, 'replay_speed', None)
+        self.rate = rate or Config.RATE_LIMIT_INITIAL
+        self.min_rate = min_rate or Config.RATE_LIMIT_MIN
+        self.max_rate = max_rate or Config.RATE_LIMIT_MAX
+        self.max_concurrency = max_concurrency or Config.SCAN_MAX_CONCURRENCY
+        self.concurrency = max(1, self.max_concurrency // 2)
+        self._cond = threading.Condition()
+        self._tokens = 1.0
+        self._last_refill = time.monotonic()
+        self._in_flight = 0
+        self._backoff_until = 0.0
+        self._consecutive_throttles = 0
+        self._successes = 0
+        self.stats_counters = {'requests': 0, 'throttled': 0, 'waited_s': 0.0}
+        self.remaining_ratio: Optional[float] = None
+
+    @property
+    def _pace(self) -> float:
+        """Débit effectif (accéléré en rejeu)"""
+        return self.rate * (self.speed or 1.0)
+
+    def _refill(self, now: float):
+        self._tokens = min(max(1.0, self._pace), self._tokens + (now - self._last_refill) * self._pace)
+        self._last_refill = now
+
+    def acquire(self):
+        """Bloque jusqu'à disposer d'un jeton et d'un créneau de concurrence"""
+        start = time.monotonic()
+        with self._cond:
+            if self.speed == 0:
+                # Rejeu sans attente : ni jetons, ni pause, ni plafond de concurrence
+                self._in_flight += 1
+                self.stats_counters['requests'] += 1
+                return
+            while True:
+                now = time.monotonic()
+                self._refill(now)
+                if now < self._backoff_until:
+                    timeout = self._backoff_until - now
+                elif self._in_flight >= self.concurrency:
+                    timeout = None  # Réveil à la libération d'un créneau
+                elif self._tokens < 1:
+                    timeout = (1 - self._tokens) / self._pace
+                else:
+                    self._tokens -= 1
+                    self._in_flight += 1
+                    self.stats_counters['requests'] += 1
+                    self.stats_counters['waited_s'] += time.monotonic() - start
+                    return
+                self._cond.wait(timeout)
+
+    def release(self):
+        """Libère un créneau de concurrence"""
+        with self._cond:
+            self._in_flight -= 1
+            self._cond.notify_all()
+
+    def call(self, func: Callable, *args, **kwargs):
+        """Exécute une requête sous contrôle du régulateur"""
+        self.acquire()
+        clear_response_headers(self.exchange)
+        try:
+            result = func(*args, **kwargs)
+        except THROTTLE_ERRORS:
+            self.on_throttle()
+            raise
+        finally:
+            self.release()
+        self.on_success()
+        return result
+
+    def _read_headers(self) -> Dict[str, str]:
+        headers = response_headers(self.exchange)
+        if headers is None:
+            shared = self.max_concurrency == 1
+            headers = (getattr(self.exchange, 'last_response_headers', None) if shared else None) or {}
+        return {str(k).lower(): v for k, v in headers.items()}
+
+    def on_success(self):
+        """Ajuste le débit selon le quota restant annoncé par l'exchange"""
+        headers = self._read_headers()
+        with self._cond:
+            self._consecutive_throttles = 0
+            self._successes += 1
+            try:
+                limit = float(headers['gw-ratelimit-limit'])
+                remaining = float(headers['gw-ratelimit-remaining'])
+                self.remaining_ratio = remaining / limit if limit > 0 else None
+            except (KeyError, ValueError):
+                self.remaining_ratio = None
+
+            if self.remaining_ratio is not None and self.remaining_ratio < Config.RATE_LIMIT_LOW_WATERMARK:
+                # Quota presque épuisé : on ralentit avant de recevoir un 429
+                self.rate = max(self.min_rate, self.rate * 0.9)
+                self.concurrency = max(1, self.concurrency - 1)
+            else:
+                self.rate = min(self.max_rate, self.rate + Config.RATE_LIMIT_INCREASE_STEP)
+                if self._successes % 20 == 0:
+                    self.concurrency = min(self.max_concurrency, self.concurrency + 1)
+            self._cond.notify_all()
+
+    def on_throttle(self):
+        """Réduit débit et concurrence, puis suspend les requêtes jusqu'au reset du quota"""
+        headers = self._read_headers()
+        with self._cond:
+            self._consecutive_throttles += 1
+            self.stats_counters['throttled'] += 1
+            self.rate = max(self.min_rate, self.rate / 2)
+            self.concurrency = max(1, self.concurrency // 2)
+            try:
+                backoff = float(headers['gw-ratelimit-reset']) / 1000
+            except (KeyError, ValueError):
+                backoff = Config.RATE_LIMIT_BACKOFF
+            backoff *= 2 ** min(self._consecutive_throttles - 1, 4)
+            if self.speed is not None:
+                backoff /= self.speed or float('inf')  # Pause du rejeu à la même échelle que les réponses
+            self._backoff_until = max(self._backoff_until, time.monotonic() + backoff)
+            self._tokens = 0.0
+        logging.warning(
+            f"Rate limit atteint: débit réduit à {self.rate:.1f} req/s, "
+            f"concurrence {self.concurrency}, pause {backoff:.1f}s"
+        )
+
+    def stats(self) -> Dict:
+        """État courant du régulateur"""
+        with self._cond:
+            return {
+                'rate': round(self.rate, 2),
+                'concurrency': self.concurrency,
+                'in_flight': self._in_flight,
+                'remaining_ratio': self.remaining_ratio,
+                **{k: round(v, 2) if isinstance(v, float) else v for k, v in self.stats_counters.items()}
+            }
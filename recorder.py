@@ -0,0 +1,286 @@
+import atexit
+import ccxt
+import gzip
+import logging
+import pickle
+import queue
+import threading
+import time
+import zlib
+from collections import defaultdict, deque
+from functools import partial
+from typing import Dict, List, Optional
+from config import Config
+from rate_limit import clear_response_headers, response_headers
+
+RECORDED_METHODS = ('load_markets', 'set_markets', 'milliseconds')
+RECORDED_PREFIXES = ('fetch_', 'create_', 'cancel_', 'edit_')
+FLUSH_EVERY = 100  # Enregistrements écrits entre deux vidages du tampon gzip
+
+
+def is_recorded(name: str) -> bool:
+    """Méthodes de l'exchange qui passent par l'enregistrement (requêtes et horloge)"""
+    return name in RECORDED_METHODS or name.startswith(RECORDED_PREFIXES)
+
+
+def load_session(path: str) -> List[Dict]:
+    """Enregistrements d'une session ; une fin tronquée (arrêt brutal) est ignorée"""
+    records = []
+    with gzip.open(path, 'rb') as f:
+        while True:
+            try:
+                records.append(pickle.load(f))
+            except EOFError:
+                break
+            except (zlib.error, pickle.UnpicklingError, gzip.BadGzipFile) as e:
+                logging.warning(f"Fin d'enregistrement illisible ignorée ({path}): {e}")
+                break
+    return records
+
+
+class SessionRecorder:
+    """Écrit chaque requête à l'exchange (arguments, réponse ou erreur, durée, en-têtes) dans un fichier gzip.
+
+    L'appelant ne fait que sérialiser l'enregistrement (instantané de la
+    réponse, que le code appelant peut modifier ensuite) ; la compression et
+    l'écriture se font dans un thread dédié, sans verrou partagé entre les
+    threads de scan.
+    """
+
+    _shared: Dict[str, 'SessionRecorder'] = {}
+    _shared_lock = threading.Lock()
+
+    def __init__(self, path: str):
+        self.path = path
+        self.started = time.time()
+        self._file = gzip.open(path, 'ab')
+        self._queue = queue.Queue()
+        self.stats = defaultdict(int)
+        self._writer = threading.Thread(target=self._write_loop, name="recorder", daemon=True)
+        self._writer.start()
+
+    @classmethod
+    def shared(cls, path: str) -> 'SessionRecorder':
+        """Un seul fichier par chemin, partagé par le scanner et le trader"""
+        with cls._shared_lock:
+            if path not in cls._shared:
+                cls._shared[path] = cls(path)
+                atexit.register(cls._shared[path].close)
+                logging.info(f"Enregistrement des échanges avec l'exchange dans {path}")
+            return cls._shared[path]
+
+    def write(self, record: Dict):
+        label = record['method'] if record['kind'] == 'call' else record['kind']
+        self._queue.put((label, pickle.dumps(record, protocol=pickle.HIGHEST_PROTOCOL)))
+
+    def _write_loop(self):
+        """Thread d'écriture : compresse et écrit les enregistrements dans l'ordre de réception"""
+        pending = 0
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+            label, data = item
+            try:
+                self._file.write(data)
+            except Exception as e:
+                logging.error(f"Erreur d'écriture de l'enregistrement {self.path}: {e}")
+                continue
+            self.stats[label] += 1
+            pending += 1
+            if pending >= FLUSH_EVERY or self._queue.empty():
+                self._file.flush()  # Données déjà écrites lisibles même après un arrêt brutal
+                pending = 0
+
+    def call(self, exchange, client: str, method: str, func, *args, **kwargs):
+        """Exécute une requête et l'enregistre, qu'elle réussisse ou non"""
+        offset = time.time() - self.started
+        start = time.perf_counter()
+        record = {'kind': 'call', 'client': client, 'method': method, 'args': args, 'kwargs': kwargs,
+                  'offset': offset}
+        clear_response_headers(exchange)
+        try:
+            result = func(*args, **kwargs)
+            record['result'] = result
+            return result
+        except Exception as e:
+            record['error'] = (type(e).__name__, str(e))
+            raise
+        finally:
+            record['duration'] = time.perf_counter() - start
+            headers = response_headers(exchange)
+            if headers is None:
+                headers = getattr(exchange, 'last_response_headers', None)
+            record['headers'] = dict(headers or {})
+            self.write(record)
+
+    def close(self):
+        """Vide la file d'écriture puis ferme le fichier"""
+        if not self._writer.is_alive():
+            return
+        self._queue.put(None)
+        self._writer.join()
+        self._file.close()  # Écrit la fin du flux gzip
+
+
+class RecordingExchange:
+    """Enveloppe transparente d'un client d'exchange : les requêtes sont enregistrées, le reste est délégué"""
+
+    def __init__(self, exchange, recorder: SessionRecorder, client: str):
+        object.__setattr__(self, 'exchange', exchange)
+        object.__setattr__(self, 'recorder', recorder)
+        object.__setattr__(self, 'client', client)
+        recorder.write({'kind': 'header', 'client': client, 'id': exchange.id, 'has': dict(exchange.has or {}),
+                        'rateLimit': getattr(exchange, 'rateLimit', 0), 'started_at': recorder.started})
+
+    def __getattr__(self, name: str):
+        attr = getattr(self.exchange, name)
+        if callable(attr) and is_recorded(name):
+            return partial(self.recorder.call, self.exchange, self.client, name, attr)
+        return attr
+
+    def __setattr__(self, name: str, value):
+        setattr(self.exchange, name, value)
+
+
+def record_exchange(exchange, client: str):
+    """Enveloppe l'exchange si l'enregistrement est activé (EXCHANGE_RECORD_FILE)"""
+    if not Config.EXCHANGE_RECORD_FILE or exchange is None:
+        return exchange
+    return RecordingExchange(exchange, SessionRecorder.shared(Config.EXCHANGE_RECORD_FILE), client)
+
+
+class ReplayExchange:
+    """Rejoue une session enregistrée à la place de l'exchange.
+
+    Chaque appel reçoit la réponse (ou l'erreur et les en-têtes de rate
+    limit) enregistrée pour la même méthode et les mêmes arguments, dans
+    l'ordre d'origine. Les scans étant parallèles, l'ordre des appels peut
+    différer : à défaut d'arguments identiques, la prochaine réponse du même
+    symbol est servie (jamais celle d'un autre symbol : l'appel compte alors
+    comme absent), et pour les appels sans symbol celle de la même méthode. La durée enregistrée
+    de chaque requête est reproduite, divisée par `speed` (0 = sans attente).
+    """
+
+    _sessions: Dict[str, List[Dict]] = {}
+    _shared: Dict[tuple, 'ReplayExchange'] = {}
+    _shared_lock = threading.Lock()
+
+    def __init__(self, records: List[Dict], client: str = None, speed: float = None):
+        self.client = client
+        self.speed = Config.EXCHANGE_REPLAY_SPEED if speed is None else speed
+        self._lock = threading.Lock()
+        headers = [r for r in records if r['kind'] == 'header' and client in (None, r['client'])]
+        header = headers[0] if headers else {}
+        self.id = header.get('id', 'kucoinfutures')
+        self.has = header.get('has', {})
+        self.rateLimit = header.get('rateLimit', 0)
+        self.last_response_headers = {}
+        self.thread_response_headers = threading.local()  # Rejeu parallèle : en-têtes propres à chaque thread
+        calls = [r for r in records if r['kind'] == 'call' and client in (None, r['client'])]
+        self._queues = defaultdict(deque)  # Clé exacte, symbol ou méthode -> enregistrements
+        for record in calls:
+            record['used'] = False
+            for key in self._keys(record['method'], record['args'], record['kwargs']):
+                self._queues[key].append(record)
+        # Marchés connus d'emblée, comme après le chargement de l'instantané
+        markets = next((r['result'] for r in records if r['kind'] == 'call'
+                        and r['method'] in ('load_markets', 'set_markets') and r.get('result')), None)
+        self.markets = markets or {}
+        self.symbols = list(self.markets)
+        self.stats = defaultdict(lambda: {'calls': 0, 'misses': 0, 'recorded_s': 0.0, 'served_s': 0.0})
+
+    @property
+    def replay_speed(self) -> float:
+        """Facteur de rejeu, lu par le régulateur de débit pour ne pas brider le rejeu"""
+        return self.speed
+
+    @classmethod
+    def shared(cls, path: str, client: str) -> 'ReplayExchange':
+        """Une instance par client (scanner, trader) ; le fichier n'est lu qu'une fois"""
+        with cls._shared_lock:
+            if path not in cls._sessions:
+                cls._sessions[path] = load_session(path)
+                logging.info(f"Rejeu de {len(cls._sessions[path])} enregistrements depuis {path}")
+            if (path, client) not in cls._shared:
+                cls._shared[(path, client)] = cls(cls._sessions[path], client)
+            return cls._shared[(path, client)]
+
+    @staticmethod
+    def _keys(method: str, args: tuple, kwargs: Dict) -> List[tuple]:
+        keys = [(method, repr(args), repr(sorted(kwargs.items())))]
+        # Symbol unifié ccxt ('BTC/USDT:USDT'), en premier argument ou après un identifiant d'ordre
+        symbol = kwargs.get('symbol') or next((a for a in args if isinstance(a, str) and '/' in a), None)
+        keys.append((method, symbol) if symbol else (method,))
+        return keys
+
+    def _next(self, method: str, args: tuple, kwargs: Dict) -> Optional[Dict]:
+        with self._lock:
+            for key in self._keys(method, args, kwargs):
+                queue = self._queues.get(key)
+                while queue:
+                    record = queue.popleft()
+                    if not record['used']:
+                        record['used'] = True
+                        return record
+        return None
+
+    def _serve(self, method: str, *args, **kwargs):
+        start = time.perf_counter()
+        record = self._next(method, args, kwargs)
+        stats = self.stats[method]
+        stats['calls'] += 1
+        if record is None:
+            stats['misses'] += 1
+            raise ccxt.ExchangeError(f"{self.id} {method}{args} absent de l'enregistrement")
+        if self.speed:
+            time.sleep(record['duration'] / self.speed)
+        self.last_response_headers = record['headers']
+        self.thread_response_headers.headers = record['headers']
+        stats['recorded_s'] += record['duration']
+        stats['served_s'] += time.perf_counter() - start
+        if 'error' in record:
+            name, message = record['error']
+            error = getattr(ccxt, name, None)
+            if not (isinstance(error, type) and issubclass(error, Exception)):
+                error = ccxt.ExchangeError
+            raise error(message)
+        return record['result']
+
+    def __getattr__(self, name: str):
+        if is_recorded(name):
+            return partial(self._serve, name)
+        raise AttributeError(name)
+
+    def milliseconds(self) -> int:
+        try:
+            return self._serve('milliseconds')
+        except ccxt.ExchangeError:
+            return int(time.time() * 1000)  # Horloge épuisée : heure courante
+
+    def load_markets(self, reload: bool = False, params: Dict = None) -> Dict:
+        try:
+            self.markets = self._serve('load_markets', reload=True) if reload else self._serve('load_markets')
+        except ccxt.ExchangeError:
+            pass  # Session démarrée depuis l'instantané disque : marchés déjà connus
+        self.symbols = list(self.markets)
+        return self.markets
+
+    def set_markets(self, markets: Dict, currencies: Dict = None) -> Dict:
+        self.markets = markets
+        self.symbols = list(markets)
+        return markets
+
+    def remaining(self, method: str = None) -> int:
+        """Enregistrements pas encore servis (d'une méthode ou de toutes)"""
+        with self._lock:
+            records = {id(record): record for key, q in self._queues.items() if method is None or key[0] == method
+                       for record in q}
+            return sum(1 for record in records.values() if not record['used'])
+
+
+def replay_exchange(client: str) -> Optional[ReplayExchange]:
+    """Exchange rejoué si une session est configurée (EXCHANGE_REPLAY_FILE)"""
+    if not Config.EXCHANGE_REPLAY_FILE:
+        return None
+    return ReplayExchange.shared(Config.EXCHANGE_REPLAY_FILE, client)
@@ -0,0 +1,176 @@
+import logging
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Dict, Optional
+from config import Config
+
+
+def symbol_sector(symbol: str) -> str:
+    """Secteur d'un symbol (regroupement des actifs corrélés)"""
+    base = symbol.split('/')[0]
+    return Config.RISK_SECTORS.get(base, 'other')
+
+
+class RiskEngine:
+    """Contrôle de risque au niveau du portefeuille.
+
+    L'état (solde, marge utilisée, exposition par symbol et par secteur,
+    perte du jour) est tenu en mémoire et mis à jour à chaque ordre : les
+    vérifications pré-trade ne font aucun appel réseau. Une resynchronisation
+    complète avec l'exchange n'a lieu que lorsque l'état est trop ancien.
+    """
+
+    def __init__(self, exchange=None, resync_interval: float = None):
+        self.exchange = exchange
+        self.account_state = None  # AccountState du flux privé, prioritaire sur le REST
+        self.resync_interval = resync_interval if resync_interval is not None else Config.RISK_RESYNC_INTERVAL
+        self._lock = threading.Lock()
+        self.balance_total = 0.0
+        self.margin_used = 0.0
+        self.unrealized_pnl = 0.0
+        self.realized_pnl_today = 0.0
+        self.exposure_by_symbol: Dict[str, float] = {}
+        self.exposure_by_sector: Dict[str, float] = {}
+        self.day_start_equity: Optional[float] = None
+        self._day = None
+        self.last_sync: Optional[float] = None
+
+    def sync(self) -> bool:
+        """Reconstruit l'état à partir du solde et des positions de l'exchange"""
+        try:
+            if self.account_state is not None and self.account_state.is_live():
+                balance = self.account_state.get_balance()
+                positions = self.account_state.get_positions()
+            elif not self.exchange:
+                return False
+            else:
+                balance = self.exchange.fetch_balance().get('USDT', {})
+                positions = self.exchange.fetch_positions()
+        except Exception as e:
+            logging.error(f"Erreur synchronisation moteur de risque: {e}")
+            return False
+
+        exposure_by_symbol: Dict[str, float] = {}
+        unrealized = 0.0
+        for position in positions:
+            size = abs(position.get('contracts') or position.get('size') or 0)
+            if size <= 0:
+                continue
+            notional = position.get('notional') or size * (position.get('markPrice') or position.get('entryPrice') or 0)
+            exposure_by_symbol[position['symbol']] = exposure_by_symbol.get(position['symbol'], 0.0) + abs(notional)
+            unrealized += position.get('unrealizedPnl') or 0.0
+
+        with self._lock:
+            self.balance_total = balance.get('total') or 0.0
+            self.margin_used = balance.get('used') or 0.0
+            self.unrealized_pnl = unrealized
+            self.exposure_by_symbol = exposure_by_symbol
+            self.exposure_by_sector = {}
+            for symbol, notional in exposure_by_symbol.items():
+                sector = symbol_sector(symbol)
+                self.exposure_by_sector[sector] = self.exposure_by_sector.get(sector, 0.0) + notional
+            self._roll_day()
+            self.last_sync = time.time()
+        return True
+
+    def refresh_if_stale(self):
+        """Resynchronise si le dernier état date de plus de l'intervalle configuré"""
+        if self.last_sync is None or time.time() - self.last_sync > self.resync_interval:
+            self.sync()
+
+    def equity(self) -> float:
+        """Valeur du compte, P&L latent inclus"""
+        return self.balance_total + self.unrealized_pnl
+
+    def _roll_day(self):
+        # Remise à zéro de la perte du jour au changement de date (UTC)
+        today = datetime.now(timezone.utc).date()
+        if self._day != today:
+            self._day = today
+            self.day_start_equity = self.equity()
+            self.realized_pnl_today = 0.0
+
+    def daily_loss(self) -> float:
+        """Perte depuis le début de la journée (positive en cas de perte)"""
+        if self.day_start_equity is None:
+            return 0.0
+        return max(0.0, self.day_start_equity - self.equity())
+
+    def _check(self, symbol: str, notional: float, margin: float) -> Optional[str]:
+        self._roll_day()
+        equity = self.equity()
+        if equity <= 0:
+            return "solde du compte inconnu ou nul"
+        if self.daily_loss() >= equity * Config.RISK_MAX_DAILY_LOSS_PERCENT / 100:
+            return f"perte journalière maximale atteinte ({self.daily_loss():.2f} USDT)"
+        if self.margin_used + margin > equity * Config.RISK_MAX_MARGIN_PERCENT / 100:
+            return f"marge maximale atteinte ({self.margin_used:.2f} USDT utilisés)"
+        if self.exposure_by_symbol.get(symbol, 0.0) + notional > equity * Config.RISK_MAX_SYMBOL_EXPOSURE_PERCENT / 100:
+            return f"exposition maximale sur {symbol}"
+        sector = symbol_sector(symbol)
+        if self.exposure_by_sector.get(sector, 0.0) + notional > equity * Config.RISK_MAX_SECTOR_EXPOSURE_PERCENT / 100:
+            return f"exposition maximale sur le secteur {sector}"
+        return None
+
+    def check_order(self, symbol: str, notional: float, margin: float) -> Optional[str]:
+        """Vérification pré-trade ; retourne None si l'ordre est accepté, sinon la raison du refus"""
+        with self._lock:
+            return self._check(symbol, notional, margin)
+
+    def reserve(self, symbol: str, notional: float, margin: float) -> Optional[str]:
+        """Vérifie puis réserve atomiquement l'exposition d'un ordre (libérée par on_close en cas d'échec)"""
+        with self._lock:
+            reason = self._check(symbol, notional, margin)
+            if reason is None:
+                self._add_exposure(symbol, notional, margin)
+            return reason
+
+    def available_notional(self, symbol: str) -> float:
+        """Valeur maximale d'une nouvelle position sur le symbol selon les limites courantes"""
+        with self._lock:
+            equity = self.equity()
+            sector = symbol_sector(symbol)
+            return max(0.0, min(
+                equity * Config.RISK_MAX_MARGIN_PERCENT / 100 - self.margin_used,
+                equity * Config.RISK_MAX_SYMBOL_EXPOSURE_PERCENT / 100 - self.exposure_by_symbol.get(symbol, 0.0),
+                equity * Config.RISK_MAX_SECTOR_EXPOSURE_PERCENT / 100 - self.exposure_by_sector.get(sector, 0.0),
+            ))
+
+    def _add_exposure(self, symbol: str, notional: float, margin: float):
+        sector = symbol_sector(symbol)
+        self.margin_used += margin
+        self.exposure_by_symbol[symbol] = self.exposure_by_symbol.get(symbol, 0.0) + notional
+        self.exposure_by_sector[sector] = self.exposure_by_sector.get(sector, 0.0) + notional
+
+    def on_open(self, symbol: str, notional: float, margin: float):
+        """Met à jour l'état après l'ouverture d'une position"""
+        with self._lock:
+            self._add_exposure(symbol, notional, margin)
+
+    def on_close(self, symbol: str, notional: float, margin: float, realized_pnl: float = 0.0):
+        """Met à jour l'état après la réduction ou la clôture d'une position"""
+        sector = symbol_sector(symbol)
+        with self._lock:
+            self.margin_used = max(0.0, self.margin_used - margin)
+            remaining = self.exposure_by_symbol.get(symbol, 0.0) - notional
+            if remaining > 1e-9:
+                self.exposure_by_symbol[symbol] = remaining
+            else:
+                self.exposure_by_symbol.pop(symbol, None)
+            self.exposure_by_sector[sector] = max(0.0, self.exposure_by_sector.get(sector, 0.0) - notional)
+            self.balance_total += realized_pnl
+            self.realized_pnl_today += realized_pnl
+
+    def snapshot(self) -> Dict:
+        """État courant pour l'affichage"""
+        with self._lock:
+            return {
+                'equity': round(self.equity(), 2),
+                'margin_used': round(self.margin_used, 2),
+                'daily_loss': round(self.daily_loss(), 2),
+                'realized_pnl_today': round(self.realized_pnl_today, 2),
+                'exposure_by_symbol': {s: round(v, 2) for s, v in self.exposure_by_symbol.items()},
+                'exposure_by_sector': {s: round(v, 2) for s, v in self.exposure_by_sector.items()},
+                'last_sync': self.last_sync,
+            }
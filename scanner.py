@@ -3,51 +3,85 @@ import pandas as pd
 import numpy as np
 import talib
 import logging
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
-from typing import List, Dict, Optional
+from typing import Callable, List, Dict, Optional
 from config import Config
+from mock_exchange import MockKuCoinFutures
+from swings import SwingDetector, compute_fibonacci_levels
+from timeframes import CandleStore, can_resample, timeframe_to_seconds
+from indicators import IndicatorCache
+from rate_limit import RateLimitGovernor, track_response_headers
+from signal_filters import SignalContext, build_rule
+from signal_store import SignalStore
+from markets_snapshot import load_snapshot, save_snapshot
+from log_setup import setup_logging
+from ranking import rank_candidates, universe_features
+from data_quality import QualityGuard
+from recorder import record_exchange, replay_exchange
 
 class KuCoinScanner:
-    def __init__(self):
-        self.exchange = self._init_exchange()
+    def __init__(self, exchange=None):
+        self.exchange = exchange or self._init_exchange()
         self.markets_info = {}
         self.futures_symbols = set()
         self.detected_signals = []
+        self.signal_store = SignalStore()
+        self.signal_listeners = []  # Appelés pour chaque nouveau signal (après classement si activé)
+        self.batch_listeners = []  # Appelés avec tous les nouveaux signaux classés d'un scan, avant diffusion
+        self.universe_table = pd.DataFrame()  # Statistiques transversales du dernier scan
+        self.swing_detectors = {}
+        self.candle_store = CandleStore()
+        self.quality_guard = QualityGuard()
+        self.indicator_cache = IndicatorCache()
+        self.signal_rule = build_rule(Config.SIGNAL_FILTERS)
+        self.governor = RateLimitGovernor(self.exchange)
+        self.last_scan_stats = {}
+        self.started_at = time.perf_counter()
+        self.startup_metrics = {}  # Chargement des marchés, premier scan, premier signal
         self.setup_logging()
         
     def _init_exchange(self):
         """Initialise la connexion à KuCoin"""
         try:
-            exchange = ccxt.kucoinfutures({
+            if Config.EXCHANGE_REPLAY_FILE:
+                return replay_exchange('scanner')
+            if Config.KUCOIN_MOCK:
+                return record_exchange(MockKuCoinFutures.shared(), 'scanner')
+            exchange = track_response_headers(ccxt.kucoinfutures({
                 'apiKey': Config.KUCOIN_API_KEY,
                 'secret': Config.KUCOIN_API_SECRET,
                 'password': Config.KUCOIN_PASSPHRASE,
                 'sandbox': Config.KUCOIN_SANDBOX,
-                'enableRateLimit': True,
-            })
-            return exchange
+                # Le débit est piloté par RateLimitGovernor
+                'enableRateLimit': False,
+            }))
+            return record_exchange(exchange, 'scanner')
         except Exception as e:
             logging.error(f"Erreur lors de l'initialisation de l'exchange: {e}")
             return None
     
     def setup_logging(self):
-        """Configure le système de logging"""
-        logging.basicConfig(
-            level=getattr(logging, Config.LOG_LEVEL),
-            format='%(asctime)s - %(levelname)s - %(message)s',
-            handlers=[
-                logging.FileHandler(Config.LOG_FILE),
-                logging.StreamHandler()
-            ]
-        )
+        """Configure le système de logging (sans effet s'il l'est déjà)"""
+        setup_logging()
     
     def load_markets(self):
-        """Charge les informations des marchés"""
+        """Charge les informations des marchés (depuis l'instantané disque s'il est récent)"""
         try:
-            self.exchange.load_markets()
+            start = time.perf_counter()
+            markets = load_snapshot(self.exchange)
+            if markets:
+                self.exchange.set_markets(markets)
+                source = "instantané"
+            else:
+                self.exchange.load_markets()
+                save_snapshot(self.exchange, self.exchange.markets)
+                source = "exchange"
             self.markets_info = self.exchange.markets
-            logging.info(f"Chargé {len(self.markets_info)} marchés")
+            self.startup_metrics['markets_ms'] = round((time.perf_counter() - start) * 1000, 1)
+            logging.info(f"Chargé {len(self.markets_info)} marchés ({source}, {self.startup_metrics['markets_ms']:.0f} ms)")
             self._identify_futures_symbols()
         except Exception as e:
             logging.error(f"Erreur lors du chargement des marchés: {e}")
@@ -68,21 +102,71 @@ class KuCoinScanner:
     def get_ohlcv_data(self, symbol: str, timeframe: str, limit: int = 100) -> Optional[pd.DataFrame]:
         """Récupère les données OHLCV pour un symbol"""
         try:
-            ohlcv = self.exchange.fetch_ohlcv(symbol, timeframe, limit=limit)
+            ohlcv = self.governor.call(self.exchange.fetch_ohlcv, symbol, timeframe, limit=limit)
             if not ohlcv:
                 return None
             df = pd.DataFrame(ohlcv, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
             df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
             df.set_index('timestamp', inplace=True)
             return df
+        except ccxt.NetworkError:
+            raise  # Erreur transitoire : le symbol sera réessayé dans le même scan
         except Exception as e:
             logging.warning(f"Erreur lors de la récupération des données pour {symbol}: {e}")
             return None
     
-    def calculate_ema(self, data: pd.DataFrame, period: int = 20) -> pd.Series:
-        """Calcule l'EMA"""
+    def refresh_base_candles(self, symbol: str) -> bool:
+        """Met à jour la série de base d'un symbol (une seule requête en régime établi)"""
+        try:
+            timeframe_ms = timeframe_to_seconds(Config.TIMEFRAME_BASE) * 1000
+            since = self.candle_store.last_timestamp(symbol)
+            if since is None:
+                since = self.exchange.milliseconds() - Config.MTF_BASE_BARS * timeframe_ms
+            rows = []
+            while True:
+                batch = self.governor.call(
+                    self.exchange.fetch_ohlcv,
+                    symbol, Config.TIMEFRAME_BASE, since=since, limit=Config.OHLCV_PAGE_LIMIT
+                )
+                if not batch:
+                    break
+                rows.extend(batch)
+                if len(batch) < Config.OHLCV_PAGE_LIMIT:
+                    break
+                since = batch[-1][0] + timeframe_ms
+            self.candle_store.update(symbol, rows)
+            return self.candle_store.get(symbol, Config.TIMEFRAME_BASE) is not None
+        except ccxt.NetworkError:
+            raise
+        except Exception as e:
+            logging.warning(f"Erreur lors de la mise à jour des bougies de base pour {symbol}: {e}")
+            return False
+    
+    def get_timeframe_data(self, symbol: str, timeframe: str, limit: int = 100) -> Optional[pd.DataFrame]:
+        """Retourne les bougies d'une timeframe, agrégées localement si possible"""
+        if not can_resample(Config.TIMEFRAME_BASE, timeframe):
+            return self.get_ohlcv_data(symbol, timeframe, limit)
+        if self.candle_store.get(symbol, Config.TIMEFRAME_BASE) is None:
+            if not self.refresh_base_candles(symbol):
+                return None
+        data = self.candle_store.get(symbol, timeframe)
+        return data.tail(limit) if data is not None else None
+    
+    def calculate_ema(self, data: pd.DataFrame, period: int = 20,
+                      symbol: str = None, timeframe: str = None) -> np.ndarray:
+        """Calcule l'EMA (mise en cache si le symbol et la timeframe sont fournis)"""
+        if symbol and timeframe:
+            return self.indicator_cache.get(symbol, timeframe, 'ema', data, period=period)
         return talib.EMA(data['close'].values, timeperiod=period)
     
+    def latest_atr(self, symbol: str, period: int = 14) -> Optional[float]:
+        """Dernier ATR connu sur la timeframe principale (bougies en mémoire, sans requête)"""
+        data = self.candle_store.get(symbol, Config.TIMEFRAME_MAIN)
+        if data is None or len(data) <= period:
+            return None
+        value = self.indicator_cache.get(symbol, Config.TIMEFRAME_MAIN, 'atr', data, period=period)[-1]
+        return None if np.isnan(value) else float(value)
+    
     def check_ema_crossover(self, data: pd.DataFrame) -> bool:
         """Vérifie si le prix vient de franchir l'EMA20 à la hausse"""
         if len(data) < Config.EMA_PERIOD + 2:
@@ -94,6 +178,19 @@ class KuCoinScanner:
         previous_ema = ema[-2]
         return previous_price <= previous_ema and current_price > current_ema
     
+    def check_timeframe_confirmations(self, symbol: str) -> Dict[str, Optional[bool]]:
+        """Vérifie que le prix est au-dessus de l'EMA sur les timeframes de confirmation"""
+        confirmations = {}
+        period = Config.MTF_CONFIRMATION_EMA_PERIOD
+        for timeframe in Config.MTF_CONFIRMATION_TIMEFRAMES:
+            data = self.get_timeframe_data(symbol, timeframe, 100)
+            if data is None or len(data) < period + 1:
+                confirmations[timeframe] = None  # Historique insuffisant
+                continue
+            ema = self.calculate_ema(data, period, symbol, timeframe)
+            confirmations[timeframe] = bool(data['close'].iloc[-1] > ema[-1])
+        return confirmations
+    
     def check_volume_increase(self, data: pd.DataFrame) -> tuple:
         """Vérifie l'augmentation du volume"""
         if len(data) < 2:
@@ -105,69 +202,97 @@ class KuCoinScanner:
         volume_increase = ((current_volume - previous_volume) / previous_volume) * 100
         return volume_increase >= Config.VOLUME_THRESHOLD, volume_increase
     
+    def _update_swing_detector(self, symbol: str, closed_bars: pd.DataFrame) -> SwingDetector:
+        """Alimente le détecteur de swings du symbol avec les nouvelles barres clôturées"""
+        detector = self.swing_detectors.get(symbol)
+        if detector is None or detector.last_timestamp not in closed_bars.index:
+            # Premier passage ou historique discontinu : on repart de la fenêtre reçue
+            detector = SwingDetector()
+            self.swing_detectors[symbol] = detector
+            new_bars = closed_bars
+        else:
+            new_bars = closed_bars[closed_bars.index > detector.last_timestamp]
+        detector.update_many(new_bars['high'].values, new_bars['low'].values, new_bars.index)
+        return detector
+    
     def calculate_fibonacci_levels(self, symbol: str) -> Dict:
         """Calcule les niveaux de Fibonacci sur la timeframe 15min"""
         try:
-            data_15m = self.get_ohlcv_data(symbol, Config.TIMEFRAME_FIBONACCI, 50)
+            data_15m = self.get_timeframe_data(symbol, Config.TIMEFRAME_FIBONACCI, 50)
             if data_15m is None or len(data_15m) < 20:
                 return {}
-            high_idx = data_15m['high'].rolling(10).max().idxmax()
-            low_idx = data_15m['low'].rolling(10).min().idxmin()
-            swing_high = data_15m.loc[high_idx, 'high']
-            swing_low = data_15m.loc[low_idx, 'low']
-            diff = swing_high - swing_low
-            levels = {
-                'swing_high': swing_high,
-                'swing_low': swing_low,
-                'direction': 'bullish' if high_idx > low_idx else 'bearish',
-                'retracements': {},
-                'extensions': {}
-            }
-            for level in Config.FIBONACCI_LEVELS['retracement']:
-                levels['retracements'][level] = (
-                    swing_high - diff * level if high_idx > low_idx else swing_low + diff * level
-                )
-            for level in Config.FIBONACCI_LEVELS['extension']:
-                levels['extensions'][level] = (
-                    swing_high + diff * (level - 1) if high_idx > low_idx else swing_low - diff * (level - 1)
+            # La dernière bougie est encore en formation : seuls les pivots clôturés comptent
+            detector = self._update_swing_detector(symbol, data_15m.iloc[:-1])
+            swing_pairs = detector.swing_pairs()
+            if swing_pairs:
+                latest = swing_pairs[0]
+                levels = compute_fibonacci_levels(latest['swing_high'], latest['swing_low'], latest['direction'])
+            else:
+                # Pas encore de swing confirmé : extrêmes de la fenêtre
+                high_idx = data_15m['high'].idxmax()
+                low_idx = data_15m['low'].idxmin()
+                levels = compute_fibonacci_levels(
+                    data_15m.loc[high_idx, 'high'], data_15m.loc[low_idx, 'low'],
+                    'bullish' if high_idx > low_idx else 'bearish'
                 )
+            levels['swings'] = swing_pairs
             return levels
         except Exception as e:
             logging.error(f"Erreur calcul Fibonacci pour {symbol}: {e}")
             return {}
     
-    def scan_symbol(self, symbol: str) -> Optional[Dict]:
-        """Scanne un symbol spécifique"""
+    def check_data_quality(self, symbols: List[str]) -> List[str]:
+        """Contrôle groupé des séries de base ; retourne les symbols hors quarantaine"""
+        frames = {symbol: self.candle_store.get(symbol, Config.TIMEFRAME_BASE) for symbol in symbols}
+        healthy = self.quality_guard.check(frames, now_ms=self.exchange.milliseconds())
+        return [symbol for symbol in symbols if symbol in healthy]
+    
+    def scan_symbol(self, symbol: str, refresh: bool = True) -> Optional[Dict]:
+        """Scanne un symbol spécifique (refresh=False : bougies déjà mises à jour et contrôlées)"""
         try:
             if symbol not in self.futures_symbols:
                 return None
-            data_4h = self.get_ohlcv_data(symbol, Config.TIMEFRAME_MAIN, 50)
+            if refresh:
+                if not self.refresh_base_candles(symbol):
+                    return None
+                if Config.QUALITY_GUARD_ENABLED and not self.check_data_quality([symbol]):
+                    return None
+            data_4h = self.get_timeframe_data(symbol, Config.TIMEFRAME_MAIN, 50)
             if data_4h is None or len(data_4h) < Config.EMA_PERIOD + 2:
                 return None
-            if not self.check_ema_crossover(data_4h):
+            ctx = SignalContext(symbol, Config.TIMEFRAME_MAIN, data_4h, self.indicator_cache)
+            if not self.signal_rule(ctx):
                 return None
-            volume_ok, volume_increase = self.check_volume_increase(data_4h)
-            if not volume_ok:
+            ema = self.calculate_ema(data_4h, Config.EMA_PERIOD, symbol, Config.TIMEFRAME_MAIN)
+            volume_increase = ctx.values.get('volume_increase')
+            if volume_increase is None:
+                _, volume_increase = self.check_volume_increase(data_4h)
+            confirmations = self.check_timeframe_confirmations(symbol)
+            if Config.MTF_REQUIRE_CONFIRMATION and not all(confirmations.values()):
                 return None
             fibonacci_levels = self.calculate_fibonacci_levels(symbol)
             signal = {
                 'symbol': symbol,
                 'timestamp': datetime.now(),
+                'bar_timestamp': data_4h.index[-1],
                 'price': float(data_4h['close'].iloc[-1]),
                 'volume_increase': round(volume_increase, 2),
-                'ema_value': float(self.calculate_ema(data_4h)[-1]),
+                'ema_value': float(ema[-1]),
                 'fibonacci_levels': fibonacci_levels,
+                'confirmations': confirmations,
+                'indicators': ctx.values,
                 'market_info': self.markets_info.get(symbol, {}),
-                'signal_strength': self._calculate_signal_strength(data_4h, volume_increase)
+                'signal_strength': self._calculate_signal_strength(data_4h, volume_increase, confirmations, ema)
             }
-            logging.info(f"Signal détecté pour {symbol}: Prix={signal['price']}, Volume+{volume_increase:.1f}%")
-            logging.info(f"Force du signal pour {symbol}: {signal['signal_strength']}")
             return signal
+        except ccxt.NetworkError:
+            raise
         except Exception as e:
             logging.error(f"Erreur lors du scan de {symbol}: {e}")
             return None
     
-    def _calculate_signal_strength(self, data: pd.DataFrame, volume_increase: float) -> str:
+    def _calculate_signal_strength(self, data: pd.DataFrame, volume_increase: float,
+                                   confirmations: Dict = None, ema: np.ndarray = None) -> str:
         """Calcule la force du signal"""
         score = 0
         if volume_increase > 100:
@@ -182,10 +307,13 @@ class KuCoinScanner:
                 score += 2
             elif recent_closes.tail(3).is_monotonic_increasing:
                 score += 1
-        ema = self.calculate_ema(data)
+        if ema is None:
+            ema = self.calculate_ema(data)
         current_price = data['close'].iloc[-1]
         if current_price > ema[-1] * 1.02:
             score += 1
+        if confirmations and all(confirmations.values()):
+            score += 1
         return "FORTE" if score >= 5 else "MOYENNE" if score >= 3 else "FAIBLE"
     
     def scan_all_symbols(self) -> List[Dict]:
@@ -201,26 +329,137 @@ class KuCoinScanner:
             if symbol in self.markets_info and self.markets_info[symbol].get('active', False)
         ]
         logging.info(f"Scan de {len(futures_active_symbols)} symbols...")
-        for i, symbol in enumerate(futures_active_symbols):
-            try:
-                signal = self.scan_symbol(symbol)
-                if signal:
-                    signals.append(signal)
-                if i % 10 == 0:
-                    time.sleep(1)
-            except Exception as e:
-                logging.error(f"Erreur lors du scan de {symbol}: {e}")
-                continue
+        start = time.time()
+        pending = futures_active_symbols
+        retried = 0
+        detected = 0
+        for attempt in range(Config.SCAN_MAX_RETRIES + 1):
+            if not pending:
+                break
+            if attempt:
+                retried += len(pending)
+                logging.info(f"Nouvelle tentative ({attempt}/{Config.SCAN_MAX_RETRIES}) pour {len(pending)} symbols")
+            pending, found, count = self._scan_batch(pending)
+            signals.extend(found)
+            detected += count
+        if pending:
+            logging.warning(f"{len(pending)} symbols non scannés après {Config.SCAN_MAX_RETRIES} tentatives: {pending}")
+        if Config.RANKING_ENABLED:
+            # Les nouveaux signaux sont diffusés du meilleur au moins bon
+            signals = self.rank_signals(signals)
+            for listener in self.batch_listeners:
+                try:
+                    listener(signals)
+                except Exception as e:
+                    logging.error(f"Erreur lors de la diffusion du lot de signaux: {e}")
+            for signal in signals:
+                self._notify(signal)
+        self.last_scan_stats = {
+            'symbols': len(futures_active_symbols),
+            'failed': len(pending),
+            'retried': retried,
+            'repeated': detected - len(signals),
+            'quarantined': len(self.quality_guard.quarantine),
+            'duration': round(time.time() - start, 2),
+            'governor': self.governor.stats()
+        }
         self.detected_signals = signals
-        logging.info(f"Scan terminé. {len(signals)} signaux détectés.")
+        if 'first_scan_s' not in self.startup_metrics:
+            self.startup_metrics['first_scan_s'] = round(time.perf_counter() - self.started_at, 2)
+        logging.info(f"Scan terminé. {len(signals)} nouveaux signaux ({detected} détectés).",
+                     extra={'event': 'scan', 'stats': self.last_scan_stats})
         return signals
     
+    def rank_signals(self, signals: List[Dict]) -> List[Dict]:
+        """Classe les signaux d'après les statistiques de tout l'univers scanné"""
+        if not signals:
+            return signals
+        start = time.perf_counter()
+        self.universe_table = universe_features(self.universe_frames(), benchmark=Config.RANKING_BENCHMARK)
+        ranked = rank_candidates(signals, self.universe_table)
+        logging.info(f"Classement de {len(ranked)} signaux sur {len(self.universe_table)} symbols "
+                     f"en {(time.perf_counter() - start) * 1000:.1f} ms")
+        return ranked
+    
+    def universe_frames(self) -> Dict[str, pd.DataFrame]:
+        """Bougies principales des symbols scannés hors quarantaine (base du classement)"""
+        return {symbol: self.candle_store.get(symbol, Config.TIMEFRAME_MAIN) for symbol in self.futures_symbols
+                if not self.quality_guard.is_quarantined(symbol)}
+    
+    def top_signals(self, k: int = None) -> List[Dict]:
+        """Les K meilleurs signaux du dernier scan"""
+        return self.detected_signals[:k or Config.RANKING_TOP_K]
+    
+    def _notify(self, signal: Dict):
+        for listener in self.signal_listeners:
+            try:
+                listener(signal)
+            except Exception as e:
+                logging.error(f"Erreur lors de la diffusion du signal {signal['symbol']}: {e}")
+    
+    def _publish(self, signal: Dict, notify: bool = True) -> bool:
+        """Filtre les répétitions et notifie les abonnés d'un nouveau signal"""
+        # Seuls les nouveaux événements sont transmis à l'exécution et à l'interface
+        if not self.signal_store.add(signal):
+            return False
+        if 'first_signal_s' not in self.startup_metrics:
+            self.startup_metrics['first_signal_s'] = round(time.perf_counter() - self.started_at, 2)
+            logging.info(f"Premier signal {self.startup_metrics['first_signal_s']:.2f}s après le démarrage")
+        logging.info(f"Signal détecté pour {signal['symbol']}: Prix={signal['price']}, "
+                     f"Volume+{signal['volume_increase']:.1f}%, Force={signal['signal_strength']}",
+                     extra={'event': 'signal', 'symbol': signal['symbol']})
+        if notify:
+            self._notify(signal)
+        return True
+    
+    def _scan_batch(self, symbols: List[str]) -> tuple:
+        """Scanne un lot de symbols en parallèle sous contrôle du régulateur de débit"""
+        signals = []
+        detected = 0
+        transient_failures = []
+        with ThreadPoolExecutor(max_workers=self.governor.max_concurrency) as pool:
+            # Bougies de tout le lot d'abord, puis un seul contrôle qualité avant les indicateurs
+            futures = {pool.submit(self.refresh_base_candles, symbol): symbol for symbol in symbols}
+            refreshed = []
+            for future in as_completed(futures):
+                symbol = futures[future]
+                try:
+                    if future.result():
+                        refreshed.append(symbol)
+                except ccxt.NetworkError as e:
+                    logging.debug(f"Erreur transitoire pour {symbol}, nouvelle tentative prévue: {e}")
+                    transient_failures.append(symbol)
+                except Exception as e:
+                    logging.error(f"Erreur lors de la mise à jour de {symbol}: {e}")
+            if Config.QUALITY_GUARD_ENABLED and refreshed:
+                refreshed = self.check_data_quality(refreshed)
+            futures = {pool.submit(self.scan_symbol, symbol, False): symbol for symbol in refreshed}
+            for future in as_completed(futures):
+                symbol = futures[future]
+                try:
+                    signal = future.result()
+                    if signal:
+                        detected += 1
+                        if self._publish(signal, notify=not Config.RANKING_ENABLED):
+                            signals.append(signal)
+                except ccxt.NetworkError as e:
+                    logging.debug(f"Erreur transitoire pour {symbol}, nouvelle tentative prévue: {e}")
+                    transient_failures.append(symbol)
+                except Exception as e:
+                    logging.error(f"Erreur lors du scan de {symbol}: {e}")
+        return transient_failures, signals, detected
+    
     def get_new_listings(self) -> List[str]:
         """Détecte les nouveaux coins listés"""
+        if not self.markets_info:
+            # Premier passage : marchés de référence (instantané disque si récent), aucun listing nouveau
+            self.load_markets()
+            return []
         try:
             current_symbols = set(self.markets_info.keys())
-            self.exchange.load_markets()
+            self.exchange.load_markets(reload=True)
             new_markets = self.exchange.markets
+            save_snapshot(self.exchange, new_markets)
             new_symbols = set(new_markets.keys())
             truly_new = new_symbols - current_symbols
             if truly_new:
@@ -231,3 +470,77 @@ class KuCoinScanner:
         except Exception as e:
             logging.error(f"Erreur lors de la détection des nouveaux listings: {e}")
             return []
+
+
+class ScanLoop:
+    """Boucle de scan périodique partagée par l'interface, le daemon et l'API de contrôle.
+
+    Un seul scan à la fois : un scan manuel demandé pendant un scan en cours
+    attend sa fin (ou est refusé en mode non bloquant). L'arrêt prend effet
+    immédiatement entre deux scans, sans attendre la fin de l'intervalle.
+    """
+
+    def __init__(self, scanner: KuCoinScanner, after_scan: Callable[[List[Dict]], None] = None):
+        self.scanner = scanner
+        self.after_scan = after_scan
+        self._scan_lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._stopped.set()
+        self._thread: Optional[threading.Thread] = None
+        self.stats = {'scans': 0, 'errors': 0, 'last_scan_at': None}
+
+    @property
+    def running(self) -> bool:
+        return not self._stopped.is_set()
+
+    @property
+    def scanning(self) -> bool:
+        return self._scan_lock.locked()
+
+    def start(self) -> bool:
+        """Démarre la boucle ; False si elle tourne déjà"""
+        if self.running:
+            return False
+        # Chaque boucle a son propre signal d'arrêt : une ancienne boucle encore
+        # en fin de scan ne repart pas après un arrêt suivi d'un redémarrage
+        self._stopped = stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, args=(stopped,), name="scan-loop", daemon=True)
+        self._thread.start()
+        logging.info(f"Boucle de scan démarrée (toutes les {Config.SCAN_INTERVAL}s)")
+        return True
+
+    def stop(self) -> bool:
+        """Arrête la boucle après le scan en cours ; False si elle était arrêtée"""
+        if not self.running:
+            return False
+        self._stopped.set()
+        logging.info("Boucle de scan arrêtée")
+        return True
+
+    def run_once(self, blocking: bool = True) -> Optional[List[Dict]]:
+        """Nouveaux listings puis scan complet ; None si un scan est déjà en cours (non bloquant)"""
+        if not self._scan_lock.acquire(blocking=blocking):
+            return None
+        try:
+            new_listings = self.scanner.get_new_listings()
+            if new_listings:
+                logging.info(f"Nouveaux listings: {new_listings}")
+            signals = self.scanner.scan_all_symbols()
+            self.stats['scans'] += 1
+            self.stats['last_scan_at'] = time.time()
+        finally:
+            self._scan_lock.release()
+        if self.after_scan:
+            self.after_scan(signals)
+        return signals
+
+    def _run(self, stopped: threading.Event):
+        while not stopped.is_set():
+            delay = Config.SCAN_INTERVAL
+            try:
+                self.run_once()
+            except Exception as e:
+                self.stats['errors'] += 1
+                logging.error(f"Erreur dans la boucle de scan: {e}")
+                delay = 30  # Pause en cas d'erreur
+            stopped.wait(delay)
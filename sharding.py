@@ -0,0 +1,230 @@
+import json
+import logging
+import multiprocessing as mp
+import queue
+import time
+import zlib
+import pandas as pd
+from typing import Dict, List, Optional
+from config import Config
+from ranking import raw_features, rank_candidates, score_features
+from signal_store import SignalStore
+
+
+def shard_for_symbol(symbol: str, n_shards: int) -> int:
+    """Affectation stable d'un symbol à un shard"""
+    return zlib.crc32(symbol.encode()) % n_shards
+
+
+def parse_credentials(raw: str) -> List[Dict]:
+    """Identifiants par shard depuis KUCOIN_SHARD_CREDENTIALS (liste JSON, vide = identifiants communs)"""
+    if not raw:
+        return []
+    try:
+        credentials = json.loads(raw)
+    except ValueError as e:
+        raise ValueError(f"KUCOIN_SHARD_CREDENTIALS n'est pas du JSON valide: {e}") from None
+    if not isinstance(credentials, list) or not all(isinstance(c, dict) for c in credentials):
+        raise ValueError("KUCOIN_SHARD_CREDENTIALS doit être une liste d'objets "
+                         "{\"apiKey\": ..., \"secret\": ..., \"password\": ...}")
+    return credentials
+
+
+def _shard_worker(shard_id: int, symbols: List[str], markets: Dict, credentials: Optional[Dict],
+                  tasks: mp.Queue, results: mp.Queue):
+    """Boucle d'un worker : un KuCoinScanner dédié à une tranche de l'univers"""
+    if credentials:
+        Config.KUCOIN_API_KEY = credentials.get('apiKey', Config.KUCOIN_API_KEY)
+        Config.KUCOIN_API_SECRET = credentials.get('secret', Config.KUCOIN_API_SECRET)
+        Config.KUCOIN_PASSPHRASE = credentials.get('password', Config.KUCOIN_PASSPHRASE)
+
+    # Un rang calculé sur une tranche de l'univers n'est pas comparable : le coordinateur classe
+    Config.RANKING_ENABLED = False
+    from scanner import KuCoinScanner
+    scanner = KuCoinScanner()
+    scanner.markets_info = markets
+    scanner.futures_symbols = set(symbols)
+
+    while True:
+        task = tasks.get()
+        if task is None:
+            break
+        command, payload = task
+        if command == 'add_symbols':
+            scanner.markets_info.update(payload)
+            scanner.futures_symbols.update(payload)
+            continue
+        if not scanner.futures_symbols:
+            # Shard sans symbol : un scan rechargerait les marchés et couvrirait tout l'univers
+            results.put({'shard_id': shard_id, 'sweep': payload, 'signals': [], 'features': None, 'stats': {},
+                         'error': None})
+            continue
+        try:
+            signals = scanner.scan_all_symbols()
+            # Statistiques brutes de toute la tranche, pour le classement transversal du coordinateur
+            features = raw_features(scanner.universe_frames())
+            results.put({'shard_id': shard_id, 'sweep': payload, 'signals': signals, 'features': features,
+                         'stats': scanner.last_scan_stats, 'error': None})
+        except Exception as e:
+            results.put({'shard_id': shard_id, 'sweep': payload, 'signals': [], 'features': None,
+                         'stats': {}, 'error': str(e)})
+
+
+class ShardedScanner:
+    """Coordinateur d'un scan réparti sur plusieurs processus.
+
+    Chaque shard est un processus persistant qui conserve son propre
+    KuCoinScanner (bougies en cache, régulateur de débit, identifiants API
+    éventuellement distincts). Le coordinateur diffuse les sweeps, fusionne
+    et déduplique les signaux, les classe sur les statistiques de tout
+    l'univers et suit la santé de chaque shard.
+    """
+
+    def __init__(self, n_shards: int = None, credentials: List[Dict] = None):
+        self.n_shards = n_shards or Config.SHARD_COUNT
+        self.credentials = credentials if credentials is not None else parse_credentials(Config.SHARD_CREDENTIALS)
+        self.markets_info = {}
+        self.futures_symbols = set()
+        self.detected_signals = []
+        self.universe_table = pd.DataFrame()  # Statistiques transversales du dernier sweep, tous shards
+        self.signal_store = SignalStore()
+        self.shard_health: Dict[int, Dict] = {}
+        self._workers: Dict[int, mp.Process] = {}
+        self._tasks: Dict[int, mp.Queue] = {}
+        self._results = mp.Queue()
+        self._assignments: Dict[int, List[str]] = {}
+        self._sweep = 0
+        self._scanner = None
+
+    def _coordinator_scanner(self):
+        """Scanner local utilisé uniquement pour les métadonnées de marché"""
+        if self._scanner is None:
+            from scanner import KuCoinScanner
+            self._scanner = KuCoinScanner()
+        return self._scanner
+
+    def start(self):
+        """Charge les marchés, répartit l'univers et démarre les workers"""
+        scanner = self._coordinator_scanner()
+        scanner.load_markets()
+        self.markets_info = scanner.markets_info
+        self.futures_symbols = set(scanner.futures_symbols)
+        self._assignments = {i: [] for i in range(self.n_shards)}
+        for symbol in sorted(self.futures_symbols):
+            self._assignments[shard_for_symbol(symbol, self.n_shards)].append(symbol)
+        for shard_id in range(self.n_shards):
+            self._start_worker(shard_id)
+        logging.info(f"Scan réparti sur {self.n_shards} shards ({len(self.futures_symbols)} symbols)")
+
+    def _start_worker(self, shard_id: int):
+        symbols = self._assignments[shard_id]
+        markets = {s: self.markets_info[s] for s in symbols}
+        credentials = self.credentials[shard_id % len(self.credentials)] if self.credentials else None
+        self._tasks[shard_id] = mp.Queue()
+        process = mp.Process(
+            target=_shard_worker,
+            args=(shard_id, symbols, markets, credentials, self._tasks[shard_id], self._results),
+            name=f"scan-shard-{shard_id}",
+            daemon=True
+        )
+        process.start()
+        self._workers[shard_id] = process
+        self.shard_health[shard_id] = {
+            'symbols': len(symbols), 'alive': True, 'restarts': self.shard_health.get(shard_id, {}).get('restarts', -1) + 1,
+            'last_sweep': None, 'duration': None, 'failed': 0, 'signals': 0, 'error': None
+        }
+
+    def add_new_listings(self) -> List[str]:
+        """Détecte les nouveaux listings et les affecte à leur shard"""
+        scanner = self._coordinator_scanner()
+        new_symbols = scanner.get_new_listings()
+        new_futures = [s for s in new_symbols if s in scanner.futures_symbols]
+        self.markets_info = scanner.markets_info
+        by_shard: Dict[int, Dict] = {}
+        for symbol in new_futures:
+            shard_id = shard_for_symbol(symbol, self.n_shards)
+            self._assignments[shard_id].append(symbol)
+            by_shard.setdefault(shard_id, {})[symbol] = self.markets_info[symbol]
+            self.futures_symbols.add(symbol)
+        for shard_id, markets in by_shard.items():
+            self._tasks[shard_id].put(('add_symbols', markets))
+        return new_futures
+
+    def scan_all_symbols(self, timeout: float = None) -> List[Dict]:
+        """Lance un sweep sur tous les shards, fusionne et déduplique les signaux"""
+        if not self._workers:
+            self.start()
+        timeout = timeout or Config.SHARD_SWEEP_TIMEOUT
+        self._sweep += 1
+        sweep = self._sweep
+
+        for shard_id, process in self._workers.items():
+            if not process.is_alive():
+                logging.warning(f"Shard {shard_id} arrêté (code {process.exitcode}), redémarrage")
+                self._start_worker(shard_id)
+            self._tasks[shard_id].put(('scan', sweep))
+
+        start = time.time()
+        pending = set(self._workers)
+        merged: Dict[str, Dict] = {}
+        features: List[pd.DataFrame] = []
+        while pending:
+            remaining = timeout - (time.time() - start)
+            if remaining <= 0:
+                break
+            try:
+                result = self._results.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if result['sweep'] != sweep:
+                continue  # Réponse tardive d'un sweep précédent
+            shard_id = result['shard_id']
+            pending.discard(shard_id)
+            stats = result['stats']
+            self.shard_health[shard_id].update({
+                'alive': True, 'last_sweep': sweep, 'duration': stats.get('duration'),
+                'failed': stats.get('failed', 0), 'signals': len(result['signals']),
+                'error': result['error'], 'governor': stats.get('governor')
+            })
+            if result['features'] is not None and not result['features'].empty:
+                features.append(result['features'])
+            for signal in result['signals']:
+                current = merged.get(signal['symbol'])
+                if current is None or signal['timestamp'] > current['timestamp']:
+                    merged[signal['symbol']] = signal
+
+        for shard_id in pending:
+            self.shard_health[shard_id].update({
+                'alive': self._workers[shard_id].is_alive(),
+                'error': f"Pas de réponse après {timeout:.0f}s"
+            })
+            logging.warning(f"Shard {shard_id} sans réponse pour le sweep {sweep}")
+
+        signals = list(merged.values())
+        if Config.RANKING_ENABLED:
+            # Scores et rangs calculés une seule fois, sur l'univers complet
+            raw = pd.concat(features) if features else pd.DataFrame()
+            self.universe_table = score_features(raw, benchmark=Config.RANKING_BENCHMARK)
+            signals = rank_candidates(signals, self.universe_table)
+        self.detected_signals = self.signal_store.add_many(signals)
+        logging.info(
+            f"Sweep {sweep} terminé en {time.time() - start:.1f}s: {len(self.detected_signals)} nouveaux signaux, "
+            f"{self.n_shards - len(pending)}/{self.n_shards} shards"
+        )
+        return self.detected_signals
+
+    def top_signals(self, k: int = None) -> List[Dict]:
+        """Les K meilleurs signaux du dernier sweep"""
+        return self.detected_signals[:k or Config.RANKING_TOP_K]
+
+    def stop(self):
+        """Arrête proprement les workers"""
+        for shard_id, process in self._workers.items():
+            if process.is_alive():
+                self._tasks[shard_id].put(None)
+        for process in self._workers.values():
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
+        self._workers.clear()
+
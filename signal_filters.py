@@ -0,0 +1,130 @@
+import numpy as np
+import pandas as pd
+from typing import Callable, Dict, List
+from config import Config
+from indicators import IndicatorCache
+
+# Registre des filtres disponibles : nom -> fabrique(**params) -> SignalFilter
+FILTERS: Dict[str, Callable] = {}
+
+
+class SignalContext:
+    """Contexte d'évaluation d'un symbol : données, cache d'indicateurs et valeurs calculées"""
+
+    def __init__(self, symbol: str, timeframe: str, data: pd.DataFrame, cache: IndicatorCache):
+        self.symbol = symbol
+        self.timeframe = timeframe
+        self.data = data
+        self.cache = cache
+        self.values = {}
+
+    def indicator(self, name: str, **params) -> np.ndarray:
+        """Retourne une série d'indicateur depuis le cache partagé"""
+        return self.cache.get(self.symbol, self.timeframe, name, self.data, **params)
+
+
+class SignalFilter:
+    """Règle de signal composable avec &, | et ~ (évaluation court-circuitée)"""
+
+    def __init__(self, name: str, func: Callable[[SignalContext], bool]):
+        self.name = name
+        self.func = func
+
+    def __call__(self, ctx: SignalContext) -> bool:
+        return bool(self.func(ctx))
+
+    def __and__(self, other: 'SignalFilter') -> 'SignalFilter':
+        return SignalFilter(f"({self.name} & {other.name})", lambda ctx: self(ctx) and other(ctx))
+
+    def __or__(self, other: 'SignalFilter') -> 'SignalFilter':
+        return SignalFilter(f"({self.name} | {other.name})", lambda ctx: self(ctx) or other(ctx))
+
+    def __invert__(self) -> 'SignalFilter':
+        return SignalFilter(f"~{self.name}", lambda ctx: not self(ctx))
+
+    def __repr__(self):
+        return f"SignalFilter({self.name})"
+
+
+def register_filter(name: str):
+    """Décorateur d'enregistrement d'une fabrique de filtre"""
+    def decorator(factory: Callable) -> Callable:
+        FILTERS[name] = factory
+        return factory
+    return decorator
+
+
+@register_filter('ema_crossover')
+def ema_crossover(period: int = None) -> SignalFilter:
+    """Le prix vient de franchir l'EMA à la hausse"""
+    def check(ctx: SignalContext) -> bool:
+        ema_period = period or Config.EMA_PERIOD
+        if len(ctx.data) < ema_period + 2:
+            return False
+        ema = ctx.indicator('ema', period=ema_period)
+        close = ctx.data['close'].values
+        ctx.values['ema_value'] = float(ema[-1])
+        return close[-2] <= ema[-2] and close[-1] > ema[-1]
+    return SignalFilter('ema_crossover', check)
+
+
+@register_filter('volume_increase')
+def volume_increase(threshold: float = None) -> SignalFilter:
+    """Le volume de la dernière bougie dépasse le seuil d'augmentation"""
+    def check(ctx: SignalContext) -> bool:
+        volume = ctx.data['volume'].values
+        if len(volume) < 2 or volume[-2] == 0:
+            return False
+        increase = (volume[-1] - volume[-2]) / volume[-2] * 100
+        ctx.values['volume_increase'] = float(increase)
+        return increase >= (threshold if threshold is not None else Config.VOLUME_THRESHOLD)
+    return SignalFilter('volume_increase', check)
+
+
+@register_filter('rsi_below')
+def rsi_below(maximum: float = 70, period: int = 14) -> SignalFilter:
+    """Le RSI n'est pas en zone de surachat"""
+    def check(ctx: SignalContext) -> bool:
+        value = ctx.indicator('rsi', period=period)[-1]
+        ctx.values['rsi'] = float(value)
+        return not np.isnan(value) and value < maximum
+    return SignalFilter('rsi_below', check)
+
+
+@register_filter('above_vwap')
+def above_vwap(window: int = 20) -> SignalFilter:
+    """La clôture est au-dessus du VWAP glissant"""
+    def check(ctx: SignalContext) -> bool:
+        value = ctx.indicator('vwap', window=window)[-1]
+        return not np.isnan(value) and ctx.data['close'].values[-1] > value
+    return SignalFilter('above_vwap', check)
+
+
+@register_filter('volume_zscore_above')
+def volume_zscore_above(minimum: float = 2.0, window: int = 20) -> SignalFilter:
+    """Le volume est anormalement élevé par rapport à sa moyenne récente"""
+    def check(ctx: SignalContext) -> bool:
+        value = ctx.indicator('volume_zscore', window=window)[-1]
+        ctx.values['volume_zscore'] = float(value)
+        return not np.isnan(value) and value >= minimum
+    return SignalFilter('volume_zscore_above', check)
+
+
+@register_filter('atr_percent_below')
+def atr_percent_below(maximum: float = 10.0, period: int = 14) -> SignalFilter:
+    """La volatilité (ATR en % du prix) reste sous un plafond"""
+    def check(ctx: SignalContext) -> bool:
+        value = ctx.indicator('atr', period=period)[-1]
+        ctx.values['atr'] = float(value)
+        return not np.isnan(value) and value / ctx.data['close'].values[-1] * 100 < maximum
+    return SignalFilter('atr_percent_below', check)
+
+
+def build_rule(specs: List) -> SignalFilter:
+    """Construit une règle (ET logique) à partir de noms ou de (nom, paramètres)"""
+    rule = None
+    for spec in specs:
+        name, params = (spec, {}) if isinstance(spec, str) else spec
+        current = FILTERS[name](**params)
+        rule = current if rule is None else rule & current
+    return rule or SignalFilter('always', lambda ctx: True)
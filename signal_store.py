@@ -0,0 +1,97 @@
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Dict, List, Optional
+from config import Config
+
+
+class SignalStore:
+    """Mémoire des signaux entre les cycles de scan.
+
+    Un signal est identifié par (symbol, timestamp de la bougie). Un signal
+    déjà vu, ou un nouveau signal sur un symbol encore en cooldown, est
+    ignoré : seules les nouvelles occurrences sont transmises à l'exécution
+    et à l'interface. Toutes les opérations sont en temps constant et
+    l'historique est borné.
+    """
+
+    def __init__(self, cooldown: float = None, expiry: float = None, history_size: int = None):
+        self.cooldown = cooldown if cooldown is not None else Config.SIGNAL_COOLDOWN
+        self.expiry = expiry if expiry is not None else Config.SIGNAL_EXPIRY
+        self._seen: OrderedDict = OrderedDict()  # (symbol, bar) -> instant d'enregistrement
+        self._last_by_symbol: Dict[str, float] = {}
+        self.history = deque(maxlen=history_size or Config.SIGNAL_HISTORY_SIZE)
+        self._lock = threading.Lock()
+        self.suppressed = 0
+
+    @staticmethod
+    def key(signal: Dict) -> tuple:
+        """Clé d'identité d'un signal"""
+        return signal['symbol'], signal.get('bar_timestamp')
+
+    def _purge(self, now: float):
+        # Les entrées sont ordonnées par date d'insertion : on retire les plus anciennes
+        while self._seen:
+            key, seen_at = next(iter(self._seen.items()))
+            if now - seen_at < self.expiry:
+                break
+            self._seen.popitem(last=False)
+            if self._last_by_symbol.get(key[0]) == seen_at:
+                del self._last_by_symbol[key[0]]
+
+    def add(self, signal: Dict, now: float = None) -> bool:
+        """Enregistre un signal ; retourne True s'il s'agit d'un nouvel événement"""
+        now = now if now is not None else time.time()
+        key = self.key(signal)
+        with self._lock:
+            self._purge(now)
+            if key in self._seen:
+                self.suppressed += 1
+                return False
+            last = self._last_by_symbol.get(signal['symbol'])
+            if last is not None and now - last < self.cooldown:
+                self.suppressed += 1
+                return False
+            self._seen[key] = now
+            self._last_by_symbol[signal['symbol']] = now
+            self.history.append(signal)
+            return True
+
+    def add_many(self, signals: List[Dict], now: float = None) -> List[Dict]:
+        """Filtre une liste de signaux et retourne uniquement les nouveaux"""
+        return [signal for signal in signals if self.add(signal, now)]
+
+    def in_cooldown(self, symbol: str, now: float = None) -> bool:
+        """Indique si un symbol est encore en période de cooldown"""
+        now = now if now is not None else time.time()
+        with self._lock:
+            last = self._last_by_symbol.get(symbol)
+            return last is not None and now - last < self.cooldown
+
+    def recent(self, limit: Optional[int] = None) -> List[Dict]:
+        """Derniers signaux enregistrés (du plus récent au plus ancien)"""
+        with self._lock:
+            signals = list(reversed(self.history))
+        return signals[:limit] if limit else signals
+
+    def clear(self):
+        """Réinitialise la mémoire des signaux"""
+        with self._lock:
+            self._seen.clear()
+            self._last_by_symbol.clear()
+            self.history.clear()
+            self.suppressed = 0
+
+    def export(self) -> Dict:
+        """Copie de l'état (clés vues, cooldowns, historique) pour l'instantané disque"""
+        with self._lock:
+            return {'seen': list(self._seen.items()), 'last_by_symbol': dict(self._last_by_symbol),
+                    'history': list(self.history)}
+
+    def restore(self, state: Dict):
+        """Recharge un état exporté par `export`"""
+        with self._lock:
+            self._seen = OrderedDict(state.get('seen', []))
+            self._last_by_symbol = dict(state.get('last_by_symbol', {}))
+            self.history.clear()
+            self.history.extend(state.get('history', []))
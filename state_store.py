@@ -0,0 +1,223 @@
+import copy
+import logging
+import os
+import pickle
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+from config import Config
+
+
+def state_dir() -> Path:
+    """Répertoire d'état propre au mode (un état simulé ne doit jamais être restauré en réel)"""
+    mode = 'mock' if Config.KUCOIN_MOCK else 'sandbox' if Config.KUCOIN_SANDBOX else 'live'
+    return Path(Config.STATE_DIR) / mode
+
+
+def stable_copy(obj, attempts: int = 5):
+    """Copie profonde d'un objet que d'autres threads peuvent modifier pendant la copie"""
+    for attempt in range(attempts):
+        try:
+            return copy.deepcopy(obj)
+        except RuntimeError:
+            # « changed size during iteration » : une clé a été ajoutée pendant la copie
+            if attempt == attempts - 1:
+                raise
+
+
+class StateStore:
+    """Instantané compact de l'état + journal d'ajout des événements survenus depuis.
+
+    Chaque événement reçoit un numéro de séquence. Un instantané enregistre le
+    dernier numéro qu'il couvre : au chargement, seuls les événements
+    postérieurs du journal sont rejoués. Le journal est découpé en segments ;
+    les segments couverts par un instantané écrit sont supprimés.
+    """
+
+    def __init__(self, root: str = None):
+        self.root = Path(root) if root else state_dir()
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.snapshot_path = self.root / 'snapshot.pkl'
+        self._lock = threading.Lock()
+        self._journal = None
+        self.seq = 0
+
+    def _segments(self) -> List[Path]:
+        return sorted(self.root.glob('journal-*.pkl'))
+
+    def _open_segment(self):
+        # Appelé sous verrou : le nom du segment porte le dernier numéro qui le précède
+        if self._journal is not None:
+            self._journal.close()
+        self._journal = open(self.root / f"journal-{self.seq:012d}.pkl", 'ab')
+
+    def append(self, kind: str, payload):
+        """Ajoute un événement au journal (écrit immédiatement, sans attendre le disque)"""
+        with self._lock:
+            if self._journal is None:
+                self._open_segment()
+            self.seq += 1
+            pickle.dump((self.seq, kind, payload), self._journal, protocol=pickle.HIGHEST_PROTOCOL)
+            self._journal.flush()
+
+    def load(self) -> Optional[Dict]:
+        """Instantané le plus récent et événements du journal qui le suivent"""
+        state, events = None, []
+        if self.snapshot_path.exists():
+            with open(self.snapshot_path, 'rb') as f:
+                state = pickle.load(f)
+        covered = state['seq'] if state else 0
+        last = covered
+        for segment in self._segments():
+            with open(segment, 'rb') as f:
+                while True:
+                    try:
+                        seq, kind, payload = pickle.load(f)
+                    except EOFError:
+                        break
+                    except Exception:
+                        # Dernier enregistrement tronqué par l'arrêt brutal
+                        logging.warning(f"Fin de journal illisible ignorée: {segment.name}")
+                        break
+                    last = max(last, seq)
+                    if seq > covered:
+                        events.append((kind, payload))
+        with self._lock:
+            self.seq = last
+        if state is None and not events:
+            return None
+        return {'snapshot': state or {}, 'events': events}
+
+    def rotate(self) -> int:
+        """Démarre un nouveau segment et retourne le dernier numéro couvert par le précédent"""
+        with self._lock:
+            covered = self.seq
+            self._open_segment()
+            return covered
+
+    def write_snapshot(self, state: Dict, covered: int):
+        """Écrit l'instantané de façon atomique puis supprime les segments qu'il couvre"""
+        state['seq'] = covered
+        tmp = self.snapshot_path.with_name(self.snapshot_path.name + '.tmp')
+        with open(tmp, 'wb') as f:
+            pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.snapshot_path)
+        with self._lock:
+            current = self._journal.name if self._journal else None
+            for segment in self._segments():
+                if str(segment) != current and int(segment.stem.split('-')[1]) < covered:
+                    segment.unlink()
+
+    def close(self):
+        with self._lock:
+            if self._journal is not None:
+                self._journal.close()
+                self._journal = None
+
+
+class StateManager:
+    """Sauvegarde périodique et restauration à chaud de l'état du scanner et du trader"""
+
+    def __init__(self, scanner, trader, store: StateStore = None, interval: float = None):
+        self.scanner = scanner
+        self.trader = trader
+        self.store = store or StateStore()
+        self.interval = interval or Config.STATE_SNAPSHOT_INTERVAL
+        self._stop = threading.Event()
+        self._thread = None
+        self.stats = {'snapshots': 0, 'last_snapshot_ms': 0.0, 'restore_ms': 0.0, 'restored_trades': 0,
+                      'restored_signals': 0, 'restored_series': 0}
+        scanner.signal_listeners.append(self.on_signal)
+        trader.trade_listeners.append(self.on_trade)
+
+    def on_signal(self, signal: Dict):
+        self.store.append('signal', signal)
+
+    def on_trade(self, trade: Dict):
+        # Copie d'abord : la gestion des sorties peut modifier le trade pendant l'écriture
+        self.store.append('trade', stable_copy(trade))
+
+    def capture(self) -> Dict:
+        """Copie de l'état courant (prise sous les verrous des structures partagées, sans bloquer le scan)"""
+        return {
+            'saved_at': time.time(),
+            'trades': self.trader.snapshot_trades(),
+            'signal_store': self.scanner.signal_store.export(),
+            'detected_signals': list(self.scanner.detected_signals),
+            'futures_symbols': sorted(stable_copy(self.scanner.futures_symbols)),
+            'candles': self.scanner.candle_store.snapshot(),
+            'ledger': self.trader.ledger.export(),
+        }
+
+    def snapshot(self):
+        """Écrit un instantané de l'état courant"""
+        start = time.perf_counter()
+        covered = self.store.rotate()
+        self.store.write_snapshot(self.capture(), covered)
+        self.stats['snapshots'] += 1
+        self.stats['last_snapshot_ms'] = round((time.perf_counter() - start) * 1000, 1)
+
+    def restore(self) -> bool:
+        """Reconstruit l'état en mémoire depuis le disque puis rattache les ordres ouverts"""
+        start = time.perf_counter()
+        try:
+            loaded = self.store.load()
+        except Exception as e:
+            logging.error(f"Impossible de relire l'état sauvegardé: {e}")
+            return False
+        if not loaded:
+            return False
+        state = loaded['snapshot']
+        trades = {trade['trade_id']: trade for trade in state.get('trades', []) if 'trade_id' in trade}
+        signals = self.scanner.signal_store
+        signals.restore(state.get('signal_store', {}))
+        for kind, payload in loaded['events']:
+            if kind == 'trade':
+                trades[payload['trade_id']] = payload
+            elif kind == 'signal':
+                signals.add(payload, now=payload['timestamp'].timestamp())
+        # Registre P&L d'abord : seules les exécutions postérieures à l'instantané sont relues
+        self.trader.ledger.restore(state.get('ledger'))
+        self.trader.restore_trades([trades[trade_id] for trade_id in sorted(trades)])
+        self.scanner.detected_signals = state.get('detected_signals', [])
+        self.scanner.futures_symbols.update(state.get('futures_symbols', []))
+        self.scanner.candle_store.restore(state.get('candles', {}))
+        self.stats.update({
+            'restore_ms': round((time.perf_counter() - start) * 1000, 1),
+            'restored_trades': len(trades),
+            'restored_signals': len(signals.history),
+            'restored_series': len(state.get('candles', {})),
+        })
+        logging.info(f"État restauré en {self.stats['restore_ms']:.0f} ms: {len(trades)} trades, "
+                     f"{len(signals.history)} signaux, {self.stats['restored_series']} séries de bougies")
+        self.trader.reattach_orders()
+        return True
+
+    def start(self):
+        """Lance la sauvegarde périodique en arrière-plan"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True, name="state-checkpoint")
+        self._thread.start()
+
+    def stop(self):
+        """Arrête la sauvegarde périodique après un dernier instantané"""
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=self.interval)
+        try:
+            self.snapshot()
+        except Exception as e:
+            logging.error(f"Erreur lors de l'instantané d'état final: {e}")
+        self.store.close()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.snapshot()
+            except Exception as e:
+                logging.error(f"Erreur lors de l'instantané d'état: {e}")
@@ -0,0 +1,202 @@
+import numpy as np
+from collections import deque
+from typing import Dict, List, Optional
+from config import Config
+
+
+class SwingDetector:
+    """Détecteur incrémental de pivots (swing high / swing low).
+
+    Un pivot haut est confirmé à la barre i lorsque high[i] est le maximum
+    de la fenêtre [i - strength, i + strength] (premier maximum en cas
+    d'égalité). Les maxima/minima glissants sont tenus dans des deques
+    monotones : chaque barre entre et sort au plus une fois, soit O(n).
+    """
+
+    def __init__(self, strength: int = None, max_pivots: int = 50):
+        self.strength = strength or Config.FIBONACCI_SWING_STRENGTH
+        self.window = 2 * self.strength + 1
+        self.index = -1
+        self.last_timestamp = None
+        self.timestamps = deque(maxlen=self.window)
+        self._max_deque = deque()  # (index, high) décroissants
+        self._min_deque = deque()  # (index, low) croissants
+        self.pivots = deque(maxlen=max_pivots)
+
+    def update(self, high: float, low: float, timestamp=None) -> List[Dict]:
+        """Ajoute une barre clôturée et retourne les pivots nouvellement confirmés"""
+        self.index += 1
+        i = self.index
+        self.timestamps.append(timestamp)
+        self.last_timestamp = timestamp
+
+        # Inégalité stricte : le premier maximum/minimum reste en tête
+        while self._max_deque and self._max_deque[-1][1] < high:
+            self._max_deque.pop()
+        self._max_deque.append((i, high))
+        while self._min_deque and self._min_deque[-1][1] > low:
+            self._min_deque.pop()
+        self._min_deque.append((i, low))
+
+        start = i - self.window + 1
+        while self._max_deque[0][0] < start:
+            self._max_deque.popleft()
+        while self._min_deque[0][0] < start:
+            self._min_deque.popleft()
+
+        if start < 0:
+            return []
+
+        center = i - self.strength
+        center_ts = self.timestamps[self.strength]
+        confirmed = []
+        if self._max_deque[0][0] == center:
+            confirmed.append(append_pivot(self.pivots, 'high', center, self._max_deque[0][1], center_ts))
+        if self._min_deque[0][0] == center:
+            confirmed.append(append_pivot(self.pivots, 'low', center, self._min_deque[0][1], center_ts))
+        return [p for p in confirmed if p]
+
+    def update_many(self, highs, lows, timestamps=None) -> List[Dict]:
+        """Ajoute une série de barres clôturées"""
+        if timestamps is None:
+            timestamps = [None] * len(highs)
+        confirmed = []
+        for high, low, ts in zip(highs, lows, timestamps):
+            confirmed.extend(self.update(float(high), float(low), ts))
+        return confirmed
+
+    def swing_pairs(self, count: int = None) -> List[Dict]:
+        """Retourne les paires de swings les plus récentes (la plus récente en premier)"""
+        return build_swing_pairs(list(self.pivots), count or Config.FIBONACCI_SWING_PAIRS)
+
+
+def append_pivot(pivots: deque, kind: str, index: int, price: float, timestamp) -> Optional[Dict]:
+    """Ajoute un pivot en respectant l'alternance haut/bas (zigzag)"""
+    pivot = {'type': kind, 'index': index, 'price': price, 'timestamp': timestamp}
+    if pivots and pivots[-1]['type'] == kind:
+        last = pivots[-1]
+        better = price > last['price'] if kind == 'high' else price < last['price']
+        if not better:
+            return None
+        pivots[-1] = pivot
+        return pivot
+    pivots.append(pivot)
+    return pivot
+
+
+def build_swing_pairs(pivots: List[Dict], count: int) -> List[Dict]:
+    """Construit les paires (haut, bas) à partir d'une liste de pivots alternés"""
+    pairs = []
+    for i in range(len(pivots) - 1, 0, -1):
+        if len(pairs) >= count:
+            break
+        first, last = pivots[i - 1], pivots[i]
+        if first['type'] == last['type']:
+            continue
+        high, low = (first, last) if first['type'] == 'high' else (last, first)
+        pairs.append({
+            'swing_high': high['price'],
+            'swing_low': low['price'],
+            'high_timestamp': high['timestamp'],
+            'low_timestamp': low['timestamp'],
+            'direction': 'bullish' if last['type'] == 'high' else 'bearish'
+        })
+    return pairs
+
+
+def detect_swing_pivots(highs: np.ndarray, lows: np.ndarray, strength: int = None) -> tuple:
+    """Détecte les pivots pour plusieurs symbols à la fois.
+
+    `highs` et `lows` sont des matrices (n_symbols, n_barres), alignées à
+    droite et complétées par NaN pour les historiques plus courts. Retourne
+    deux masques booléens de même forme (pivots hauts, pivots bas).
+    """
+    strength = strength or Config.FIBONACCI_SWING_STRENGTH
+    window = 2 * strength + 1
+    highs = np.atleast_2d(np.asarray(highs, dtype=float))
+    lows = np.atleast_2d(np.asarray(lows, dtype=float))
+    pivot_highs = np.zeros(highs.shape, dtype=bool)
+    pivot_lows = np.zeros(lows.shape, dtype=bool)
+    if highs.shape[1] < window:
+        return pivot_highs, pivot_lows
+
+    valid_highs = np.where(np.isnan(highs), -np.inf, highs)
+    valid_lows = np.where(np.isnan(lows), np.inf, lows)
+    high_windows = np.lib.stride_tricks.sliding_window_view(valid_highs, window, axis=1)
+    low_windows = np.lib.stride_tricks.sliding_window_view(valid_lows, window, axis=1)
+    # argmax/argmin retournent la première occurrence, comme le détecteur incrémental
+    pivot_highs[:, strength:-strength] = (high_windows.argmax(axis=2) == strength) & ~np.isnan(highs[:, strength:-strength])
+    pivot_lows[:, strength:-strength] = (low_windows.argmin(axis=2) == strength) & ~np.isnan(lows[:, strength:-strength])
+    return pivot_highs, pivot_lows
+
+
+def pivots_from_masks(highs, lows, pivot_highs, pivot_lows, timestamps=None) -> List[Dict]:
+    """Convertit les masques d'un symbol en liste de pivots alternés (zigzag)"""
+    pivots = deque()
+    for i in np.flatnonzero(pivot_highs | pivot_lows):
+        ts = timestamps[i] if timestamps is not None else None
+        if pivot_highs[i]:
+            append_pivot(pivots, 'high', int(i), float(highs[i]), ts)
+        if pivot_lows[i]:
+            append_pivot(pivots, 'low', int(i), float(lows[i]), ts)
+    return list(pivots)
+
+
+def compute_fibonacci_levels(swing_high: float, swing_low: float, direction: str) -> Dict:
+    """Calcule les retracements et extensions de Fibonacci pour un swing"""
+    bullish = direction == 'bullish'
+    diff = swing_high - swing_low
+    levels = {
+        'swing_high': swing_high,
+        'swing_low': swing_low,
+        'direction': direction,
+        'retracements': {},
+        'extensions': {}
+    }
+    for level in Config.FIBONACCI_LEVELS['retracement']:
+        levels['retracements'][level] = (
+            swing_high - diff * level if bullish else swing_low + diff * level
+        )
+    for level in Config.FIBONACCI_LEVELS['extension']:
+        levels['extensions'][level] = (
+            swing_high + diff * (level - 1) if bullish else swing_low - diff * (level - 1)
+        )
+    return levels
+
+
+def fibonacci_levels_batch(frames: Dict, strength: int = None, pairs: int = None) -> Dict[str, Dict]:
+    """Calcule les niveaux de Fibonacci pour plusieurs symbols en une passe vectorisée.
+
+    `frames` associe un symbol à un DataFrame OHLCV (barres clôturées).
+    Utilisable aussi bien en scan live qu'en backtest.
+    """
+    pairs = pairs or Config.FIBONACCI_SWING_PAIRS
+    symbols = [s for s, df in frames.items() if df is not None and len(df) > 0]
+    if not symbols:
+        return {}
+    width = max(len(frames[s]) for s in symbols)
+    highs = np.full((len(symbols), width), np.nan)
+    lows = np.full((len(symbols), width), np.nan)
+    for row, symbol in enumerate(symbols):
+        df = frames[symbol]
+        highs[row, width - len(df):] = df['high'].values
+        lows[row, width - len(df):] = df['low'].values
+
+    pivot_highs, pivot_lows = detect_swing_pivots(highs, lows, strength)
+    results = {}
+    for row, symbol in enumerate(symbols):
+        df = frames[symbol]
+        offset = width - len(df)
+        pivots = pivots_from_masks(
+            highs[row, offset:], lows[row, offset:],
+            pivot_highs[row, offset:], pivot_lows[row, offset:],
+            df.index
+        )
+        swing_pairs = build_swing_pairs(pivots, pairs)
+        if not swing_pairs:
+            continue
+        latest = swing_pairs[0]
+        levels = compute_fibonacci_levels(latest['swing_high'], latest['swing_low'], latest['direction'])
+        levels['swings'] = swing_pairs
+        results[symbol] = levels
+    return results
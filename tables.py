@@ -0,0 +1,68 @@
+import numpy as np
+import pandas as pd
+from typing import Dict, List, Optional, Tuple
+
+TRADE_COLUMNS = ['trade_id', 'opened', 'symbol', 'status', 'entry', 'size', 'value_usdt', 'stop_loss', 'tp1', 'tp2', 'tp3']
+SIGNAL_COLUMNS = ['rank', 'detected', 'symbol', 'price', 'volume_increase', 'ema_value', 'strength', 'score']
+
+
+def trades_columns(trades: List[Dict]) -> pd.DataFrame:
+    """Colonnes statiques des trades (une ligne par trade, sans appel réseau)"""
+    if not trades:
+        return pd.DataFrame(columns=TRADE_COLUMNS)
+    take_profits = [(t['levels'].get('take_profits', []) + [np.nan] * 3)[:3] for t in trades]
+    return pd.DataFrame({
+        'trade_id': np.arange(len(trades)),
+        'opened': [t['timestamp'] for t in trades],
+        'symbol': [t['symbol'] for t in trades],
+        'status': [t.get('status', '') for t in trades],
+        'entry': [t['levels'].get('entry_price', np.nan) for t in trades],
+        'size': [t['position_info'].get('size', np.nan) for t in trades],
+        'value_usdt': [t['position_info'].get('value_usdt', np.nan) for t in trades],
+        'stop_loss': [t['levels'].get('stop_loss', np.nan) for t in trades],
+        'tp1': [tp[0] for tp in take_profits],
+        'tp2': [tp[1] for tp in take_profits],
+        'tp3': [tp[2] for tp in take_profits],
+    })
+
+
+def with_pnl(frame: pd.DataFrame, pnl: Dict[int, Dict]) -> pd.DataFrame:
+    """Ajoute prix de marque et P&L net (frais et funding compris) du registre P&L, par trade_id"""
+    frame = frame.copy()
+    frame['price'] = frame['trade_id'].map(lambda i: pnl.get(i, {}).get('mark')).astype(float)
+    frame['pnl_usdt'] = frame['trade_id'].map(lambda i: pnl.get(i, {}).get('net')).astype(float)
+    frame['pnl_percent'] = frame['pnl_usdt'] / frame['value_usdt'] * 100
+    return frame
+
+
+def signals_columns(signals: List[Dict]) -> pd.DataFrame:
+    """Colonnes brutes des signaux (le formatage est laissé à l'affichage)"""
+    if not signals:
+        return pd.DataFrame(columns=SIGNAL_COLUMNS)
+    return pd.DataFrame({
+        'rank': [s.get('rank', np.nan) for s in signals],
+        'detected': [s['timestamp'] for s in signals],
+        'symbol': [s['symbol'] for s in signals],
+        'price': [s['price'] for s in signals],
+        'volume_increase': [s['volume_increase'] for s in signals],
+        'ema_value': [s['ema_value'] for s in signals],
+        'strength': [s['signal_strength'] for s in signals],
+        'score': [s.get('rank_score', np.nan) for s in signals],
+    })
+
+
+def paginate(frame: pd.DataFrame, page: int = 1, page_size: int = 50, sort_by: Optional[str] = None,
+             ascending: bool = True, search: str = '', filters: Dict[str, List] = None) -> Tuple[pd.DataFrame, int, int]:
+    """Filtre, trie et découpe une page ; retourne (page, nombre de lignes filtrées, nombre de pages)"""
+    if search:
+        frame = frame[frame['symbol'].str.contains(search, case=False, regex=False)]
+    for column, values in (filters or {}).items():
+        if values:
+            frame = frame[frame[column].isin(values)]
+    total = len(frame)
+    pages = max(1, -(-total // page_size))
+    page = min(max(1, page), pages)
+    if sort_by and sort_by in frame.columns:
+        frame = frame.sort_values(sort_by, ascending=ascending, kind='stable', na_position='last')
+    start = (page - 1) * page_size
+    return frame.iloc[start:start + page_size], total, pages
@@ -0,0 +1,145 @@
+import threading
+import pandas as pd
+from typing import Dict, List, Optional
+from config import Config
+
+OHLCV_COLUMNS = ['timestamp', 'open', 'high', 'low', 'close', 'volume']
+OHLCV_AGGREGATION = {'open': 'first', 'high': 'max', 'low': 'min', 'close': 'last', 'volume': 'sum'}
+TIMEFRAME_UNITS = {'m': 60, 'h': 3600, 'd': 86400}
+
+
+def timeframe_to_seconds(timeframe: str) -> int:
+    """Convertit une timeframe ccxt ('15m', '4h', '1d') en secondes"""
+    unit = timeframe[-1]
+    if unit not in TIMEFRAME_UNITS:
+        raise ValueError(f"Timeframe non supportée: {timeframe}")
+    return int(timeframe[:-1]) * TIMEFRAME_UNITS[unit]
+
+
+def can_resample(base_timeframe: str, timeframe: str) -> bool:
+    """Indique si une timeframe peut être construite à partir de la base"""
+    try:
+        base, target = timeframe_to_seconds(base_timeframe), timeframe_to_seconds(timeframe)
+    except ValueError:
+        return False
+    return target >= base and target % base == 0
+
+
+def ohlcv_to_dataframe(ohlcv: List[list]) -> pd.DataFrame:
+    """Convertit une réponse fetch_ohlcv en DataFrame indexé par timestamp"""
+    df = pd.DataFrame(ohlcv, columns=OHLCV_COLUMNS)
+    df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
+    df.set_index('timestamp', inplace=True)
+    return df
+
+
+def resample_ohlcv(data: pd.DataFrame, timeframe: str) -> pd.DataFrame:
+    """Agrège des bougies OHLCV vers une timeframe supérieure (buckets alignés UTC)"""
+    rule = f"{timeframe_to_seconds(timeframe)}s"
+    resampled = data.resample(rule, origin='epoch', label='left', closed='left').agg(OHLCV_AGGREGATION)
+    return resampled.dropna(subset=['open'])
+
+
+class CandleStore:
+    """Série de base par symbol et ses agrégations locales multi-timeframes.
+
+    Seule la timeframe de base est récupérée sur l'exchange ; les timeframes
+    supérieures sont recalculées uniquement à partir du premier bucket
+    touché par les nouvelles bougies (agrégation incrémentale).
+
+    Les symbols sont mis à jour depuis plusieurs threads de scan : l'ajout et
+    le retrait de clés se font sous verrou, et les parcours portent sur une
+    copie des clés prise sous ce même verrou.
+    """
+
+    def __init__(self, base_timeframe: str = None, max_bars: int = None):
+        self.base_timeframe = base_timeframe or Config.TIMEFRAME_BASE
+        self.max_bars = max_bars or Config.MTF_BASE_BARS
+        self.base: Dict[str, pd.DataFrame] = {}
+        self.derived: Dict[tuple, pd.DataFrame] = {}
+        self._lock = threading.Lock()
+
+    def last_timestamp(self, symbol: str) -> Optional[int]:
+        """Timestamp (ms) de la dernière bougie de base connue"""
+        data = self.base.get(symbol)
+        if data is None or data.empty:
+            return None
+        return int(data.index[-1].value // 10**6)
+
+    def update(self, symbol: str, ohlcv: List[list]) -> int:
+        """Fusionne de nouvelles bougies de base et met à jour les agrégations"""
+        if not ohlcv:
+            return 0
+        new_data = ohlcv_to_dataframe(ohlcv)
+        new_data = new_data[~new_data.index.duplicated(keep='last')].sort_index()
+        first_new = new_data.index[0]
+
+        current = self.base.get(symbol)
+        if current is not None and not current.empty:
+            # La dernière bougie connue était en formation : les nouvelles données la remplacent
+            merged = pd.concat([current[current.index < first_new], new_data])
+        else:
+            merged = new_data
+        with self._lock:
+            self.base[symbol] = merged.tail(self.max_bars)
+            keys = [k for k in self.derived if k[0] == symbol]
+
+        for key in keys:
+            self._update_derived(symbol, key[1], first_new)
+        return len(new_data)
+
+    def _update_derived(self, symbol: str, timeframe: str, first_new: pd.Timestamp):
+        """Recalcule une timeframe dérivée à partir du bucket contenant `first_new`"""
+        key = (symbol, timeframe)
+        base = self.base[symbol]
+        derived = self.derived.get(key)
+        bucket_start = first_new.floor(f"{timeframe_to_seconds(timeframe)}s")
+        if derived is None or derived.empty or bucket_start < base.index[0]:
+            self.derived[key] = self._resample_full(base, timeframe)
+            return
+        tail = resample_ohlcv(base[base.index >= bucket_start], timeframe)
+        self.derived[key] = pd.concat([derived[derived.index < bucket_start], tail]).tail(self.max_bars)
+
+    def get(self, symbol: str, timeframe: str) -> Optional[pd.DataFrame]:
+        """Retourne les bougies d'un symbol dans la timeframe demandée"""
+        base = self.base.get(symbol)
+        if base is None or base.empty:
+            return None
+        if timeframe == self.base_timeframe:
+            return base
+        key = (symbol, timeframe)
+        derived = self.derived.get(key)
+        if derived is None:
+            derived = self._resample_full(base, timeframe)
+            with self._lock:
+                self.derived[key] = derived
+        return derived
+
+    @staticmethod
+    def _resample_full(base: pd.DataFrame, timeframe: str) -> pd.DataFrame:
+        """Agrège toute la série de base en écartant un premier bucket incomplet"""
+        resampled = resample_ohlcv(base, timeframe)
+        if not resampled.empty and resampled.index[0] != base.index[0]:
+            resampled = resampled.iloc[1:]
+        return resampled
+
+    def clear(self, symbol: str = None):
+        """Vide le cache d'un symbol ou de tous les symbols"""
+        with self._lock:
+            if symbol is None:
+                self.base.clear()
+                self.derived.clear()
+                return
+            self.base.pop(symbol, None)
+            for key in [k for k in self.derived if k[0] == symbol]:
+                del self.derived[key]
+
+    def snapshot(self) -> Dict[str, pd.DataFrame]:
+        """Copie cohérente des séries de base (points de sauvegarde)"""
+        with self._lock:
+            return dict(self.base)
+
+    def restore(self, base: Dict[str, pd.DataFrame]):
+        """Recharge des séries de base sauvegardées"""
+        with self._lock:
+            self.base.update(base)
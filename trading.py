@@ -1,33 +1,76 @@
 import ccxt
 import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
 from typing import Dict, List, Optional
 from datetime import datetime
 from config import Config
+from mock_exchange import MockKuCoinFutures
+from risk import RiskEngine
+from account_stream import AccountStream
+from markets_snapshot import apply_snapshot
+from liquidity import LiquidityGuard
+from execution import ExecutionEngine, summarize
+from ledger import PnLLedger
+from state_store import stable_copy
+from rate_limit import track_response_headers
+from recorder import record_exchange, replay_exchange
 
 class KuCoinTrader:
-    def __init__(self):
-        self.exchange = self._init_exchange()
+    def __init__(self, exchange=None):
+        self.exchange = exchange or self._init_exchange()
         self.positions = {}
         self.orders_history = []
+        self.trade_listeners = []  # Appelés à chaque ouverture ou modification d'un trade
+        self._history_lock = threading.Lock()
+        self.risk_engine = RiskEngine(self.exchange)
+        self.liquidity = LiquidityGuard(self.exchange)
+        self.execution = ExecutionEngine(self.exchange)
+        self.pending_entries: Dict[str, Dict] = {}  # Entrées algorithmiques en cours, par symbole
+        # SL/TP posés hors de la boucle d'exécution, à la fin de chaque entrée algorithmique
+        self._bracket_pool = ThreadPoolExecutor(max_workers=Config.PIPELINE_WORKERS, thread_name_prefix="brackets")
+        self.ledger = PnLLedger(self.exchange, price_source=self.get_price_snapshot)
+        self.trade_listeners.append(self.ledger.register)
+        self.account_state = None  # Alimenté par le flux privé (start_account_stream)
         
     def _init_exchange(self):
         """Initialise la connexion à KuCoin pour le trading"""
         try:
-            exchange = ccxt.kucoinfutures({
+            if Config.EXCHANGE_REPLAY_FILE:
+                return replay_exchange('trader')
+            if Config.KUCOIN_MOCK:
+                return record_exchange(MockKuCoinFutures.shared(), 'trader')
+            exchange = track_response_headers(ccxt.kucoinfutures({
                 'apiKey': Config.KUCOIN_API_KEY,
                 'secret': Config.KUCOIN_API_SECRET,
                 'password': Config.KUCOIN_PASSPHRASE,
                 'sandbox': Config.KUCOIN_SANDBOX,
                 'enableRateLimit': True,
-            })
+            }))
+            # Marchés depuis l'instantané disque : pas de load_markets bloquant au démarrage
+            exchange = record_exchange(exchange, 'trader')
+            apply_snapshot(exchange)
             return exchange
         except Exception as e:
             logging.error(f"Erreur lors de l'initialisation du trader: {e}")
             return None
     
+    def start_account_stream(self) -> bool:
+        """Branche le trader sur le flux privé du compte (solde, positions, exécutions)"""
+        if not self.exchange or not Config.ACCOUNT_STREAM_ENABLED:
+            return False
+        if not Config.KUCOIN_MOCK and not Config.KUCOIN_API_KEY:
+            return False
+        self.account_state = AccountStream.shared(self.exchange).state
+        self.risk_engine.account_state = self.account_state
+        return True
+    
     def get_account_balance(self) -> Dict:
         """Récupère le solde du compte"""
         try:
+            if self.account_state is not None and self.account_state.is_live():
+                return {'USDT': self.account_state.get_balance()}
+            
             if not self.exchange:
                 return {}
             
@@ -147,14 +190,61 @@ class KuCoinTrader:
             )
             
             logging.info(f"Ordre au marché placé: {side} {amount} {symbol}")
-            return order
+            return self._with_request(order, symbol=symbol, type='market', side=side, amount=amount)
             
         except Exception as e:
             logging.error(f"Erreur placement ordre marché {symbol}: {e}")
             return None
     
-    def place_limit_order(self, symbol: str, side: str, amount: float, price: float) -> Optional[Dict]:
-        """Place un ordre limite"""
+    def enter_position(self, symbol: str, position_info: Dict, arrival_price: float) -> Optional[Dict]:
+        """Ordre d'entrée au marché, avec son rapport d'exécution"""
+        try:
+            if not self.exchange:
+                logging.error("Exchange non initialisé")
+                return None
+            order = self.place_market_order(symbol, 'buy', position_info['size'])
+            if not order:
+                return None
+            # La réponse de création ne contient que l'identifiant : quantité et prix relus sur l'exchange
+            confirmed = self.get_order_status(order['id'], symbol)
+            if confirmed and confirmed.get('filled') is not None:
+                order = confirmed
+            else:
+                order['filled'] = position_info['size']  # État illisible : ordre au marché supposé exécuté
+            if not order['filled']:
+                logging.error(f"Ordre d'entrée {order['id']} {symbol} non exécuté ({order.get('status')})")
+                return None
+            order['execution'] = summarize([order], 'buy', position_info['size'], arrival_price)
+            order['execution']['algo'] = 'market'
+            return order
+        except Exception as e:
+            logging.error(f"Erreur exécution de l'entrée {symbol}: {e}")
+            return None
+    
+    @staticmethod
+    def _entry_from_report(symbol: str, algo: str, report: Dict) -> Optional[Dict]:
+        """Ordre d'entrée agrégé (quantité exécutée, prix moyen) à partir d'un rapport d'exécution"""
+        if not report['filled']:
+            return None
+        children = report.pop('orders')
+        filled_ids = [o['id'] for o in children if o.get('filled')]
+        return {
+            'id': filled_ids[0], 'symbol': symbol, 'side': 'buy', 'type': algo, 'status': 'closed',
+            'amount': report['filled'], 'filled': report['filled'], 'average': report['average_price'],
+            'child_order_ids': [o['id'] for o in children], 'execution': report,
+        }
+    
+    @staticmethod
+    def _with_request(order: Dict, **request) -> Dict:
+        """Complète la réponse de création (souvent l'identifiant seul) avec les paramètres envoyés"""
+        for key, value in request.items():
+            if order.get(key) is None:
+                order[key] = value
+        return order
+    
+    def place_limit_order(self, symbol: str, side: str, amount: float, price: float,
+                          reduce_only: bool = False) -> Optional[Dict]:
+        """Place un ordre limite (reduce_only : ne peut que réduire la position, jamais l'inverser)"""
         try:
             if not self.exchange:
                 logging.error("Exchange non initialisé")
@@ -164,11 +254,12 @@ class KuCoinTrader:
                 symbol=symbol,
                 side=side,
                 amount=amount,
-                price=price
+                price=price,
+                params={'reduceOnly': True} if reduce_only else {}
             )
             
             logging.info(f"Ordre limite placé: {side} {amount} {symbol} @ {price}")
-            return order
+            return self._with_request(order, symbol=symbol, type='limit', side=side, amount=amount, price=price)
             
         except Exception as e:
             logging.error(f"Erreur placement ordre limite {symbol}: {e}")
@@ -187,11 +278,12 @@ class KuCoinTrader:
                 type='stop',
                 side=side,
                 amount=amount,
-                params={'stopPrice': stop_price}
+                params={'stopPrice': stop_price, 'reduceOnly': True}  # Jamais d'ouverture en sens inverse
             )
             
             logging.info(f"Ordre stop placé: {side} {amount} {symbol} @ stop {stop_price}")
-            return order
+            return self._with_request(order, symbol=symbol, type='stop', side=side, amount=amount,
+                                      stopPrice=stop_price)
             
         except Exception as e:
             logging.error(f"Erreur placement ordre stop {symbol}: {e}")
@@ -212,30 +304,96 @@ class KuCoinTrader:
             if not position_info:
                 return {'success': False, 'error': 'Impossible de calculer la taille de position'}
             
+            # Réduire la taille à la marge disponible au niveau du portefeuille
+            self.risk_engine.refresh_if_stale()
+            available = self.risk_engine.available_notional(symbol)
+            if 0 < available < position_info['value_usdt']:
+                self._scale_position(position_info, available / position_info['value_usdt'])
+            
+            # Limiter la taille à la profondeur du carnet (slippage estimé de l'ordre au marché)
+            if Config.LIQUIDITY_FILTER_ENABLED:
+                liquidity = self.liquidity.assess(symbol, 'buy', position_info['size'])
+                if not liquidity['allowed']:
+                    return {'success': False, 'error': f"Liquidité insuffisante: {liquidity['reason']}"}
+                if liquidity['amount'] < position_info['size']:
+                    logging.info(f"Liquidité {symbol}: {liquidity['reason']}")
+                    self._scale_position(position_info, liquidity['amount'] / position_info['size'])
+                position_info['estimated_slippage_percent'] = liquidity['slippage_percent']
+            
             # Calculer les niveaux SL/TP
             levels = self.calculate_sl_tp_levels(symbol, entry_price, fibonacci_levels)
             
             if not levels:
                 return {'success': False, 'error': 'Impossible de calculer les niveaux SL/TP'}
             
-            # Placer l'ordre d'achat principal
-            main_order = self.place_market_order(symbol, 'buy', position_info['size'])
+            # Vérification pré-trade et réservation de l'exposition (en mémoire)
+            risk_reason = self.risk_engine.reserve(
+                symbol, position_info['value_usdt'], position_info['margin_required']
+            )
+            if risk_reason:
+                return {'success': False, 'error': f'Refus du moteur de risque: {risk_reason}'}
+            
+            # Entrée algorithmique : lancée en tâche de fond, SL/TP posés à la fin de l'exécution
+            algo = self.execution.choose_algo(position_info['value_usdt'])
+            if algo != 'market':
+                self.pending_entries[symbol] = signal
+                future = self.execution.submit(algo, symbol, 'buy', position_info['size'], entry_price)
+                future.add_done_callback(lambda done: self._bracket_pool.submit(
+                    self._complete_entry, done, signal, algo, position_info, levels))
+                logging.info(f"Entrée {algo} lancée pour {symbol}")
+                return {'success': True, 'pending': True, 'message': f'Entrée {algo} lancée pour {symbol}'}
+            
+            main_order = self.enter_position(symbol, position_info, entry_price)
+            return self._open_trade(signal, main_order, position_info, levels)
+            
+        except Exception as e:
+            logging.error(f"Erreur lors de l'exécution du signal {signal.get('symbol', 'unknown')}: {e}")
+            return {'success': False, 'error': str(e)}
+    
+    def _complete_entry(self, future: Future, signal: Dict, algo: str, position_info: Dict, levels: Dict):
+        """Fin d'une entrée algorithmique : SL/TP sur la quantité exécutée (même partielle)"""
+        symbol = signal['symbol']
+        try:
+            report = future.result()
+            if report.get('error'):
+                logging.warning(f"Entrée {algo} {symbol} interrompue ({report['error']}), "
+                                f"{report['filled']} exécutés sur {report['amount']}")
+            result = self._open_trade(signal, self._entry_from_report(symbol, algo, report), position_info, levels)
+            if not result['success']:
+                logging.error(f"Entrée {algo} {symbol}: {result['error']}")
+        except Exception as e:
+            logging.error(f"Erreur à la fin de l'entrée {algo} {symbol}: {e}")
+        finally:
+            self.pending_entries.pop(symbol, None)
+    
+    def _open_trade(self, signal: Dict, main_order: Optional[Dict], position_info: Dict, levels: Dict) -> Dict:
+        """Pose SL/TP sur l'entrée exécutée et enregistre le trade"""
+        try:
+            symbol = signal['symbol']
+            entry_price = signal['price']
+            requested = dict(position_info)
             
             if not main_order:
+                self.risk_engine.on_close(symbol, position_info['value_usdt'], position_info['margin_required'])
                 return {'success': False, 'error': 'Échec placement ordre principal'}
+            if main_order['filled'] < requested['size']:
+                # Exécution partielle : SL/TP et exposition ramenés à la quantité obtenue
+                self._scale_position(position_info, main_order['filled'] / requested['size'])
+                self.risk_engine.on_close(symbol, requested['value_usdt'] - position_info['value_usdt'],
+                                          requested['margin_required'] - position_info['margin_required'])
             
             # Placer le Stop Loss
             sl_order = self.place_stop_order(
                 symbol, 'sell', position_info['size'], levels['stop_loss']
             )
             
-            # Placer les Take Profits (1/3 de la position chacun)
+            # Placer les Take Profits (1/3 de la position chacun, sans ouverture en sens inverse)
             tp_size = position_info['size'] / 3
             tp_orders = []
             
             for i, tp_price in enumerate(levels['take_profits']):
                 tp_order = self.place_limit_order(
-                    symbol, 'sell', tp_size, tp_price
+                    symbol, 'sell', tp_size, tp_price, reduce_only=True
                 )
                 if tp_order:
                     tp_orders.append(tp_order)
@@ -250,10 +408,14 @@ class KuCoinTrader:
                 'take_profit_orders': tp_orders,
                 'position_info': position_info,
                 'levels': levels,
+                'execution': main_order.get('execution'),
                 'status': 'active'
             }
             
-            self.orders_history.append(trade_record)
+            with self._history_lock:
+                trade_record['trade_id'] = len(self.orders_history)
+                self.orders_history.append(trade_record)
+            self.notify_trade(trade_record)
             
             logging.info(f"Signal exécuté pour {symbol}: Entry={entry_price}, SL={levels['stop_loss']}, TPs={levels['take_profits']}")
             
@@ -267,9 +429,90 @@ class KuCoinTrader:
             logging.error(f"Erreur lors de l'exécution du signal {signal.get('symbol', 'unknown')}: {e}")
             return {'success': False, 'error': str(e)}
     
+    @staticmethod
+    def _scale_position(position_info: Dict, ratio: float):
+        """Réduit une position calculée (taille, valeur, marge) d'un facteur donné"""
+        position_info['size'] = round(position_info['size'] * ratio, 6)
+        position_info['value_usdt'] = round(position_info['value_usdt'] * ratio, 2)
+        position_info['margin_required'] = round(position_info['margin_required'] * ratio, 2)
+    
+    def notify_trade(self, trade: Dict):
+        """Signale aux abonnés (journal d'état) qu'un trade a été ouvert ou modifié"""
+        for listener in self.trade_listeners:
+            try:
+                listener(trade)
+            except Exception as e:
+                logging.error(f"Erreur lors de la diffusion du trade {trade['symbol']}: {e}")
+    
+    def snapshot_trades(self) -> List[Dict]:
+        """Copie profonde de l'historique, indépendante des trades modifiés pendant la sauvegarde"""
+        with self._history_lock:
+            trades = list(self.orders_history)
+        return [stable_copy(trade) for trade in trades]
+    
+    def restore_trades(self, trades: List[Dict]):
+        """Remplace l'historique des trades par un historique restauré"""
+        with self._history_lock:
+            self.orders_history[:] = trades
+        for trade in trades:
+            self.ledger.register(trade, backfill=True)
+    
+    def reattach_orders(self) -> Dict:
+        """Rattache les trades actifs restaurés aux ordres encore ouverts sur l'exchange"""
+        stats = {'active': 0, 'reattached': 0, 'closed': 0, 'orphans': 0}
+        active = [t for t in self.orders_history if t.get('status') == 'active']
+        stats['active'] = len(active)
+        if not active or not self.exchange:
+            return stats
+        try:
+            # KuCoin Futures liste les ordres stop à part : une requête groupée pour chaque type
+            open_orders = {}
+            for params in ({}, {'stop': True}):
+                for order in self.exchange.fetch_open_orders(params=params):
+                    open_orders[order['id']] = order
+        except Exception as e:
+            logging.error(f"Erreur récupération des ordres ouverts: {e}")
+            return stats
+        
+        owned = set()
+        for trade in active:
+            symbol = trade['symbol']
+            stop = trade.get('stop_loss_order')
+            if not stop or stop['id'] not in open_orders:
+                # Stop déplacé juste avant l'arrêt : on reprend le plus haut stop ouvert du symbol
+                stops = [o for o in open_orders.values()
+                         if o['symbol'] == symbol and (o.get('stopPrice') or o.get('triggerPrice'))]
+                stop = max(stops, key=lambda o: o.get('stopPrice') or o.get('triggerPrice')) if stops else None
+                if stop:
+                    stop_price = stop.get('stopPrice') or stop.get('triggerPrice')
+                    trade['levels']['stop_loss'] = stop_price
+                    if trade.get('exit'):
+                        trade['exit']['stop'] = stop_price
+            take_profits = [open_orders[o['id']] for o in trade.get('take_profit_orders', []) if o['id'] in open_orders]
+            if not stop and not take_profits:
+                # Plus aucun ordre ouvert : le trade a été clôturé pendant l'arrêt
+                trade['status'] = 'closed'
+                trade['close_reason'] = 'offline'
+                stats['closed'] += 1
+            else:
+                if stop:
+                    trade['stop_loss_order'] = open_orders[stop['id']]
+                    owned.add(stop['id'])
+                owned.update(o['id'] for o in take_profits)
+                stats['reattached'] += 1
+            self.notify_trade(trade)
+        
+        stats['orphans'] = len(set(open_orders) - owned)
+        logging.info(f"Ordres rattachés: {stats['reattached']} trades actifs, {stats['closed']} clôturés pendant l'arrêt, "
+                     f"{stats['orphans']} ordres ouverts sans trade connu")
+        return stats
+    
     def get_open_positions(self) -> List[Dict]:
         """Récupère les positions ouvertes"""
         try:
+            if self.account_state is not None and self.account_state.is_live():
+                return self.account_state.get_positions()
+            
             if not self.exchange:
                 return []
             
@@ -282,6 +525,25 @@ class KuCoinTrader:
             logging.error(f"Erreur récupération positions ouvertes: {e}")
             return []
     
+    def get_price_snapshot(self, symbols: List[str]) -> Dict[str, float]:
+        """Prix courants de plusieurs symbols : flux privé si disponible, sinon une seule requête groupée"""
+        prices = {}
+        try:
+            if self.account_state is not None and self.account_state.is_live():
+                for symbol in symbols:
+                    position = self.account_state.get_position(symbol)
+                    if position and position.get('markPrice'):
+                        prices[symbol] = position['markPrice']
+            missing = [s for s in symbols if s not in prices]
+            if missing and self.exchange:
+                for symbol, ticker in self.exchange.fetch_tickers(missing).items():
+                    if ticker.get('last'):
+                        prices[symbol] = ticker['last']
+            self.ledger.mark_prices(prices)
+        except Exception as e:
+            logging.error(f"Erreur récupération des prix: {e}")
+        return prices
+    
     def get_order_status(self, order_id: str, symbol: str) -> Optional[Dict]:
         """Récupère le statut d'un ordre"""
         try:
@@ -328,27 +590,29 @@ class KuCoinTrader:
             return {'maker': 0.001, 'taker': 0.001}
     
     def calculate_pnl(self, trade_record: Dict) -> Dict:
-        """Calcule le P&L d'un trade"""
+        """P&L net d'un trade tenu par le registre (sorties partielles, frais et funding compris)"""
         try:
             symbol = trade_record['symbol']
-            entry_price = trade_record['levels']['entry_price']
-            position_size = trade_record['position_info']['size']
-            
-            # Récupérer le prix actuel
-            ticker = self.exchange.fetch_ticker(symbol)
-            current_price = ticker['last']
-            
-            # Calculer P&L
-            pnl_points = current_price - entry_price
-            pnl_percent = (pnl_points / entry_price) * 100
-            pnl_usdt = pnl_points * position_size
+            pnl = self.ledger.trade_pnl(trade_record.get('trade_id'))
+            if not pnl or not pnl['fills']:
+                return {}
+            if pnl['qty'] and not pnl['mark']:
+                # Pas encore de prix de marque pour ce symbol : un instantané le fournit au registre
+                self.get_price_snapshot([symbol])
+                pnl = self.ledger.trade_pnl(trade_record['trade_id'])
+            entry_price = pnl['avg_price'] or trade_record['levels']['entry_price']
+            value = trade_record['position_info']['value_usdt']
             
             return {
-                'current_price': current_price,
+                'current_price': pnl['mark'],
                 'entry_price': entry_price,
-                'pnl_points': round(pnl_points, 6),
-                'pnl_percent': round(pnl_percent, 2),
-                'pnl_usdt': round(pnl_usdt, 2)
+                'pnl_points': round(pnl['mark'] - entry_price, 6) if pnl['mark'] else None,
+                'pnl_percent': round(pnl['net'] / value * 100, 2) if value else None,
+                'pnl_usdt': round(pnl['net'], 2),
+                'realized_usdt': round(pnl['realized'], 2),
+                'unrealized_usdt': round(pnl['unrealized'], 2),
+                'fees_usdt': round(pnl['fees'], 2),
+                'funding_usdt': round(pnl['funding'], 2),
             }
             
         except Exception as e: